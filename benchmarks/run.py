@@ -0,0 +1,350 @@
+"""
+Benchmarks for the SDK's hot paths. These run offline, API calls go to a local
+FakeGuruServer and everything else uses generated data. Run them like this:
+
+```
+python -m benchmarks.run
+python -m benchmarks.run --scale large --output results.json
+python -m benchmarks.run --only find_cards board_load
+```
+
+Each benchmark reports its wall time, peak memory (measured in a separate run
+on a fresh client with tracemalloc, since tracing slows things down), and the number of API calls
+it made. To catch regressions, save the results from a release and compare
+a later run against them:
+
+```
+python -m benchmarks.run --output baseline.json
+python -m benchmarks.run --compare baseline.json --threshold 1.25
+```
+
+The compare run exits with a non-zero status if any benchmark's wall time or
+peak memory grew by more than the threshold.
+"""
+
+import gc
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import tracemalloc
+
+import guru
+
+from guru.bundle import clean_up_html
+from guru.testing import FakeDataset, FakeGuruServer
+
+# the sizes each benchmark runs at. "quick" is for checking that the benchmarks
+# still work, the other two are for measuring.
+SCALES = {
+    "quick": {
+        "cards": 500,
+        "board_cards": 120,
+        "folders": 10,
+        "nodes": 200,
+        "html_paragraphs": 200,
+        "card_objects": 200,
+        "publish_cards": 100
+    },
+    "default": {
+        "cards": 10000,
+        "board_cards": 500,
+        "folders": 100,
+        "nodes": 10000,
+        "html_paragraphs": 5000,
+        "card_objects": 5000,
+        "publish_cards": 1000
+    },
+    "large": {
+        "cards": 100000,
+        "board_cards": 2000,
+        "folders": 500,
+        "nodes": 20000,
+        "html_paragraphs": 20000,
+        "card_objects": 20000,
+        "publish_cards": 5000
+    }
+}
+
+BENCHMARKS = []
+
+
+def benchmark(name):
+  """
+  Registers a benchmark. The function does any setup, takes the scale settings,
+  and returns (server, func) where func is what gets timed and server is the
+  FakeGuruServer it uses (or None).
+  """
+  def wrapper(func):
+    BENCHMARKS.append((name, func))
+    return func
+  return wrapper
+
+
+def make_bundle_nodes(bundle, count, clean_html=True):
+  """Adds `count` card nodes to the bundle, grouped into folders of 50, with links between them."""
+  for i in range(count):
+    folder = bundle.node(id="folder%s" % (i // 50), title="Folder %s" % (i // 50))
+    content = (
+        "<p>Page %s has a <a href=\"https://www.example.com/docs/page-%s\">link to another page</a>, "
+        "a <a href=\"https://www.example.com/outside\">link to an outside page</a>, and an image.</p>"
+        "<p><img src=\"https://www.example.com/images/%s.png\"></p>"
+    ) % (i, (i * 7) % count, i % 100)
+    node = bundle.node(
+        id="page%s" % i,
+        url="https://www.example.com/docs/page-%s" % i,
+        title="Page %s" % i,
+        content=content,
+        clean_html=clean_html
+    )
+    node.add_to(folder)
+
+
+@benchmark("find_cards")
+def bench_find_cards(scale):
+  server = FakeGuruServer(FakeDataset(cards=scale["cards"], content_size=500, folders=1, boards=1)).start()
+  g = server.make_guru()
+  return server, lambda: g.find_cards()
+
+
+@benchmark("board_load")
+def bench_board_load(scale):
+  server = FakeGuruServer(FakeDataset(cards=scale["board_cards"], folders=1, boards=1)).start()
+  g = server.make_guru()
+  board_id = server.dataset.boards[0]["id"]
+  return server, lambda: g.get_board(board_id)
+
+
+@benchmark("folder_traversal")
+def bench_folder_traversal(scale):
+  server = FakeGuruServer(FakeDataset(cards=scale["folders"] * 20, folders=scale["folders"], boards=1)).start()
+  g = server.make_guru()
+
+  def traverse():
+    return sum(len(folder.cards) for folder in g.get_folders())
+
+  return server, traverse
+
+
+@benchmark("bundle_node")
+def bench_bundle_node(scale):
+  folder = tempfile.mkdtemp() + "/"
+  g = guru.Guru("user@example.com", "fake-token", silent=True)
+
+  def add_nodes():
+    bundle = g.bundle("bench_nodes", folder=folder)
+    make_bundle_nodes(bundle, scale["nodes"], clean_html=False)
+    return bundle
+
+  return None, add_nodes
+
+
+@benchmark("bundle_zip")
+def bench_bundle_zip(scale):
+  folder = tempfile.mkdtemp() + "/"
+  g = guru.Guru("user@example.com", "fake-token", silent=True)
+
+  def make_zip():
+    bundle = g.bundle("bench_zip", folder=folder, clear=True)
+    make_bundle_nodes(bundle, scale["nodes"])
+    bundle.zip()
+    return bundle
+
+  return None, make_zip
+
+
+@benchmark("clean_up_html")
+def bench_clean_up_html(scale):
+  html = "".join(
+      "<div class=\"section\" style=\"color: red; margin: 0\"><p>Paragraph %s with <b>bold</b> text, "
+      "a <a href=\"https://www.example.com/%s\" target=\"_blank\">link</a> and "
+      "<span style=\"font-weight: bold\">more text</span>.</p></div>" % (i, i)
+      for i in range(scale["html_paragraphs"])
+  )
+  return None, lambda: clean_up_html(html)
+
+
+@benchmark("card_text_and_urls")
+def bench_card_text_and_urls(scale):
+  dataset = FakeDataset(cards=scale["card_objects"], folders=1, boards=1)
+  cards = [guru.Card(data) for data in dataset.cards.values()]
+
+  def scan():
+    matches = [card for card in cards if card.has_text("related")]
+    urls = [card.find_urls() for card in cards]
+    return matches, urls
+
+  return None, scan
+
+
+class BenchmarkPublisher(guru.PublisherFolders):
+  """A publisher whose external calls do nothing, so we only measure the SDK's side."""
+
+  def __init__(self, g):
+    super().__init__(g, metadata={}, silent=True, skip_unverified_cards=False)
+    self.next_id = 0
+
+  def __make_id(self):
+    self.next_id += 1
+    return "external-%s" % self.next_id
+
+  def create_external_collection(self, collection):
+    return self.__make_id()
+
+  def create_external_folder(self, folder, collection):
+    return self.__make_id()
+
+  def create_external_card(self, card, changes, folder, collection):
+    return self.__make_id()
+
+  def update_external_card(self, external_id, card, changes, folder, collection):
+    return True
+
+
+@benchmark("publish_collection")
+def bench_publish_collection(scale):
+  server = FakeGuruServer(FakeDataset(
+      cards=scale["publish_cards"], collections=1, folders=max(scale["publish_cards"] // 50, 1), boards=1
+  )).start()
+  g = server.make_guru()
+  collection_id = server.dataset.collections[0]["id"]
+
+  # the publisher writes its metadata file to the working directory.
+  folder = tempfile.mkdtemp()
+
+  def publish():
+    cwd = os.getcwd()
+    os.chdir(folder)
+    try:
+      BenchmarkPublisher(g).publish_collection(collection_id)
+    finally:
+      os.chdir(cwd)
+
+  return server, publish
+
+
+def run_one(name, func, scale, measure_memory=True):
+  """Runs one benchmark and returns a dict with its results."""
+  server, timed_func = func(scale)
+  try:
+    gc.collect()
+    if server:
+      server.reset_calls()
+    start = time.perf_counter()
+    timed_func()
+    wall_time = time.perf_counter() - start
+    requests = server.get_call_count() if server else 0
+
+    return {
+        "wall_time": wall_time,
+        "peak_memory": measure_peak_memory(func, scale) if measure_memory else None,
+        "requests": requests
+    }
+  finally:
+    if server:
+      server.stop()
+
+
+def measure_peak_memory(func, scale):
+  """
+  Runs the benchmark again on a fresh server and client with tracemalloc on. Running
+  it a second time on the same client would mostly measure cache hits.
+  """
+  server, timed_func = func(scale)
+  try:
+    gc.collect()
+    tracemalloc.start()
+    try:
+      timed_func()
+      return tracemalloc.get_traced_memory()[1]
+    finally:
+      tracemalloc.stop()
+  finally:
+    if server:
+      server.stop()
+
+
+# changes smaller than these are ignored when comparing results, so very fast
+# benchmarks don't get flagged because of timing noise.
+MIN_CHANGES = {
+    "wall_time": 0.05,
+    "peak_memory": 1024 * 1024,
+    "requests": 0
+}
+
+
+def compare(results, baseline, threshold):
+  """Returns a list of (name, metric, old, new) for each metric that regressed by more than the threshold."""
+  regressions = []
+  for name, result in results.items():
+    previous = baseline.get("results", {}).get(name)
+    if not previous:
+      continue
+    for metric, min_change in MIN_CHANGES.items():
+      old = previous.get(metric)
+      new = result.get(metric)
+      if old is None or new is None:
+        continue
+      if new > old * threshold and new - old > min_change:
+        regressions.append((name, metric, old, new))
+  return regressions
+
+
+def format_bytes(value):
+  if value is None:
+    return "-"
+  return "%.1f MB" % (value / 1024 / 1024)
+
+
+def main(args=None):
+  parser = argparse.ArgumentParser(description="Run the SDK's benchmarks.")
+  parser.add_argument("--scale", choices=sorted(SCALES), default="default")
+  parser.add_argument("--only", nargs="*", help="the names of the benchmarks to run")
+  parser.add_argument("--output", help="a path to write the results to as JSON")
+  parser.add_argument("--compare", help="a JSON results file to compare against")
+  parser.add_argument("--threshold", type=float, default=1.25,
+                      help="how much bigger (as a ratio) a value can get before it's a regression")
+  parser.add_argument("--no-memory", action="store_true", help="skip the peak memory measurement")
+  args = parser.parse_args(args)
+
+  scale = SCALES[args.scale]
+  results = {}
+  for name, func in BENCHMARKS:
+    if args.only and name not in args.only:
+      continue
+    result = run_one(name, func, scale, measure_memory=not args.no_memory)
+    results[name] = result
+    print("%-22s %8.3fs %10s %6s calls" % (
+        name, result["wall_time"], format_bytes(result["peak_memory"]), result["requests"]))
+
+  output = {
+      "scale": args.scale,
+      "python": platform.python_version(),
+      "platform": platform.platform(),
+      "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+      "results": results
+  }
+  if args.output:
+    with open(args.output, "w") as file_out:
+      json.dump(output, file_out, indent=2)
+
+  if args.compare:
+    with open(args.compare) as file_in:
+      baseline = json.load(file_in)
+    if baseline.get("scale") != args.scale:
+      print("warning: the baseline was run at scale '%s'" % baseline.get("scale"))
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, metric, old, new in regressions:
+      print("REGRESSION: %s %s went from %s to %s" % (name, metric, old, new))
+    if regressions:
+      return 1
+
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -1,5 +1,6 @@
 from guru.core import (
     Guru,
+    PaginationError,
     # collection colors:
     MAROON,
     RED,
@@ -23,6 +24,35 @@ from guru.core import (
     UNVERIFIED,
 )
 
+from guru.aio import (
+    AsyncGuru
+)
+
+from guru.cache import (
+    CachedResponse,
+    DiskCache,
+    IdentityMap,
+    ResponseCache
+)
+
+from guru.tags import TagRegistry
+
+from guru.bulkop import (
+    BulkOperation,
+    BulkOperationTracker
+)
+
+from guru.metrics import (
+    Metrics,
+    RequestInfo
+)
+
+from guru.ratelimit import (
+    RateLimiter,
+    TokenBucket,
+    FileTokenBucket
+)
+
 from guru.publish import (
     Publisher
 )
@@ -45,6 +75,8 @@ from guru.data_objects import (
 
 from guru.util import (
     MAX_FILE_SIZE,
+    LookupIndex,
+    RetryPolicy,
     load_html,
     http_get,
     http_post,
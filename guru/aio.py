@@ -0,0 +1,152 @@
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from guru.core import Guru
+
+
+class AsyncGuru:
+  """
+  The AsyncGuru object gives you awaitable versions of the Guru object's
+  read calls so you can load lots of things at once from asyncio code:
+
+  ```
+  import asyncio
+  from guru.aio import AsyncGuru
+
+  async def main():
+    async with AsyncGuru() as g:
+      cards = await g.find_cards(collection="General")
+      comments = await asyncio.gather(*[g.get_card_comments(card) for card in cards])
+
+  asyncio.run(main())
+  ```
+
+  Calls are run on a pool of worker threads that share the Guru object's
+  connection pool, so at most `max_concurrency` calls are in flight at once
+  no matter how many you await together. Calls that would make requests in
+  parallel on their own, like `get_cards`, make them one at a time on their
+  worker thread so they stay within that limit too. The results are the same Card, Folder,
+  Board, etc. objects the Guru object returns and they're tied to the underlying
+  Guru object (`g.guru`), so you can still call methods like `card.save()` on them.
+
+  Args:
+    username (str, optional): Your Guru username, same as the Guru object.
+    api_token (str, optional): Your Guru API token, same as the Guru object.
+    max_concurrency (int, optional): The maximum number of calls to run at once. Defaults to 10.
+    guru (Guru, optional): An existing Guru object to use instead of creating a new one.
+            We don't close a Guru object you pass in, that's up to you.
+    **kwargs: Any other options for the Guru object we create, like retry, rate_limiter,
+            response_cache, disk_cache, or identity_map.
+  """
+
+  def __init__(self, username="", api_token="", silent=False, dry_run=False, qa=False, max_concurrency=10, guru=None,
+               **kwargs):
+    self.__owns_guru = guru is None
+    kwargs.setdefault("pool_maxsize", max_concurrency)
+    self.guru = guru or Guru(
+        username, api_token, silent=silent, dry_run=dry_run, qa=qa, **kwargs
+    )
+    self.max_concurrency = max_concurrency
+    self.__executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+  async def __aenter__(self):
+    return self
+
+  async def __aexit__(self, exc_type, exc_value, traceback):
+    # shutting down waits for calls that are still running, so we do it off
+    # the event loop's thread to not block other tasks.
+    await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+  def close(self):
+    """
+    Stops the worker threads and, if we created the Guru object, closes its connections.
+    """
+    self.__executor.shutdown(wait=True)
+    if self.__owns_guru:
+      self.guru.close()
+
+  def __call(self, func, *args, **kwargs):
+    """internal"""
+    loop = asyncio.get_running_loop()
+    return loop.run_in_executor(self.__executor, partial(func, *args, **kwargs))
+
+  # cards
+  def get_card(self, card, is_archived=False):
+    return self.__call(self.guru.get_card, card, is_archived=is_archived)
+
+  def get_cards(self, card_ids, return_statuses=False):
+    # the batches are loaded one at a time on our worker thread rather than
+    # on another thread pool, so this counts as one call towards max_concurrency.
+    return self.__call(self.guru.get_cards, card_ids, max_workers=1, return_statuses=return_statuses)
+
+  def get_card_version(self, card, version):
+    return self.__call(self.guru.get_card_version, card, version)
+
+  def find_cards(self, **kwargs):
+    return self.__call(self.guru.find_cards, **kwargs)
+
+  def get_card_comments(self, card, status=None):
+    return self.__call(self.guru.get_card_comments, card, status=status)
+
+  def get_folders_for_card(self, card):
+    return self.__call(self.guru.get_folders_for_card, card)
+
+  # folders
+  def get_folder(self, folder, collection=None, cache=True):
+    return self.__call(self.guru.get_folder, folder, collection=collection, cache=cache)
+
+  def get_folders(self, collection=None, folder=None, cache=False):
+    return self.__call(self.guru.get_folders, collection=collection, folder=folder, cache=cache)
+
+  def get_folder_items(self, folder_id, cache=True, cardDetail="FULL"):
+    return self.__call(self.guru.get_folder_items, folder_id, cache=cache, cardDetail=cardDetail)
+
+  # boards
+  def get_board(self, board, collection=None, board_group=None, cache=True):
+    return self.__call(self.guru.get_board, board, collection=collection, board_group=board_group, cache=cache)
+
+  def get_boards(self, collection=None, board_group=None, cache=False):
+    return self.__call(self.guru.get_boards, collection=collection, board_group=board_group, cache=cache)
+
+  def get_home_board(self, collection):
+    return self.__call(self.guru.get_home_board, collection)
+
+  # collections and groups
+  def get_collection(self, collection, cache=False):
+    return self.__call(self.guru.get_collection, collection, cache=cache)
+
+  def get_collections(self, cache=False):
+    return self.__call(self.guru.get_collections, cache=cache)
+
+  def get_group(self, group, cache=False):
+    return self.__call(self.guru.get_group, group, cache=cache)
+
+  def get_groups(self, cache=False):
+    return self.__call(self.guru.get_groups, cache=cache)
+
+  # tags
+  def get_tag(self, tag, cache=False):
+    return self.__call(self.guru.get_tag, tag, cache=cache)
+
+  def get_tags(self, cache=False):
+    return self.__call(self.guru.get_tags, cache=cache)
+
+  # members
+  def get_members(self, search="", cache=False):
+    return self.__call(self.guru.get_members, search=search, cache=cache)
+
+  def get_group_members(self, group):
+    return self.__call(self.guru.get_group_members, group)
+
+  # events
+  def get_events(self, start="", end="", max_pages=10):
+    return self.__call(self.guru.get_events, start=start, end=end, max_pages=max_pages)
+
+  # questions
+  def get_questions_inbox(self, cache=False):
+    return self.__call(self.guru.get_questions_inbox, cache=cache)
+
+  def get_questions_sent(self, cache=False):
+    return self.__call(self.guru.get_questions_sent, cache=cache)
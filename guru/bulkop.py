@@ -0,0 +1,166 @@
+import time
+import threading
+
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+
+class BulkOperation(Future):
+  """
+  A handle for an asynchronous bulk operation, like moving a card to another
+  collection. It's a `concurrent.futures.Future` whose result is True once the
+  operation finishes, or False if it didn't finish before its timeout (or the
+  tracker's default timeout or poll limit, if it wasn't given one):
+
+  ```
+  ops = [g.move_card_to_collection(card, "Archive", wait=False) for card in cards]
+  for op in concurrent.futures.as_completed(ops):
+    print(op.id, op.result())
+  ```
+
+  Attributes:
+    id (str): The bulk operation's ID, or None if the call finished right away.
+    url (str): The url we poll to check on the operation.
+    polls (int): The number of times we've checked on it.
+    status (dict): The JSON from the most recent poll.
+  """
+
+  def __init__(self, url=None, id=None, timeout=None):
+    super().__init__()
+    self.url = url
+    self.id = id
+    self.polls = 0
+    self.status = None
+    self.started = time.monotonic()
+    self.deadline = self.started + timeout if timeout else None
+    self.next_poll = None
+    self.interval = None
+    self.__progress_callbacks = []
+
+  def on_progress(self, callback):
+    """Registers a function that's called with this object after each time we poll the operation."""
+    self.__progress_callbacks.append(callback)
+    return callback
+
+  def _report_progress(self):
+    """internal"""
+    for callback in self.__progress_callbacks:
+      callback(self)
+
+  @classmethod
+  def finished(cls, result):
+    """Returns a handle for an operation that already finished (e.g. the API didn't run it asynchronously)."""
+    operation = cls()
+    operation.set_result(result)
+    return operation
+
+
+class BulkOperationTracker:
+  """
+  Polls any number of bulk operations from one background thread. Each operation
+  is first checked after `min_interval` seconds and the time between checks grows
+  by `backoff` each time, up to `max_interval`, so short operations finish quickly
+  and long ones don't make a lot of calls. The Guru object has one of these as
+  `g.bulk_operations`.
+
+  Operations tracked without a timeout use `default_timeout` and we stop checking
+  an operation after `max_polls` checks, so one that never finishes doesn't get
+  polled forever. In either case its result is False.
+
+  Args:
+    poll (function): Called with an operation's url, returns (status_code, json).
+    min_interval (float, optional): Seconds before the first check. Defaults to 0.5.
+    max_interval (float, optional): The most seconds between checks. Defaults to 10.
+    backoff (float, optional): How much the wait grows after each check. Defaults to 1.5.
+    max_workers (int, optional): The most operations we'll check at once. Defaults to 4.
+    default_timeout (float, optional): Seconds we wait for operations that were tracked
+      without a timeout. Defaults to 3600. Pass None to wait as long as it takes.
+    max_polls (int, optional): The most times we check one operation. Defaults to 1000.
+      Pass None for no limit.
+  """
+
+  def __init__(self, poll, min_interval=0.5, max_interval=10, backoff=1.5, max_workers=4,
+               default_timeout=3600, max_polls=1000):
+    self.poll = poll
+    self.min_interval = min_interval
+    self.max_interval = max_interval
+    self.backoff = backoff
+    self.max_workers = max_workers
+    self.default_timeout = default_timeout
+    self.max_polls = max_polls
+    self.__pending = []
+    self.__condition = threading.Condition()
+    self.__thread = None
+
+  def __len__(self):
+    with self.__condition:
+      return len(self.__pending)
+
+  def track(self, url, id=None, timeout=None):
+    """Starts polling an operation and returns its BulkOperation handle."""
+    operation = BulkOperation(url, id=id, timeout=timeout or self.default_timeout)
+    operation.interval = self.min_interval
+    operation.next_poll = operation.started + self.min_interval
+
+    with self.__condition:
+      self.__pending.append(operation)
+      if self.__thread is None:
+        self.__thread = threading.Thread(target=self.__run, name="guru-bulkops", daemon=True)
+        self.__thread.start()
+      self.__condition.notify()
+    return operation
+
+  def wait(self, operations, timeout=None):
+    """Waits for all of the operations to finish and returns their results in the same order."""
+    operations = list(operations)
+    wait(operations, timeout=timeout)
+    return [op.result() if op.done() else False for op in operations]
+
+  def __run(self):
+    """internal"""
+    with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+      while True:
+        with self.__condition:
+          if not self.__pending:
+            self.__thread = None
+            return
+
+          now = time.monotonic()
+          due = [op for op in self.__pending if op.next_poll <= now]
+          if not due:
+            self.__condition.wait(min(op.next_poll for op in self.__pending) - now)
+            continue
+
+        for operation, outcome in zip(due, executor.map(self.__check, due)):
+          if outcome is None:
+            continue
+          with self.__condition:
+            self.__pending.remove(operation)
+          operation.set_result(outcome)
+
+  def __check(self, operation):
+    """internal: polls one operation and returns True or False if it's done, None if it isn't."""
+    try:
+      status_code, operation.status = self.poll(operation.url)
+    except Exception:
+      status_code = None
+    operation.polls += 1
+
+    # a callback raising an exception shouldn't stop us from tracking the other operations.
+    try:
+      operation._report_progress()
+    except Exception:
+      pass
+
+    if status_code == 200:
+      return True
+
+    now = time.monotonic()
+    if operation.deadline is not None and now >= operation.deadline:
+      return False
+    if self.max_polls and operation.polls >= self.max_polls:
+      return False
+
+    operation.interval = min(operation.interval * self.backoff, self.max_interval)
+    operation.next_poll = now + operation.interval
+    if operation.deadline is not None:
+      operation.next_poll = min(operation.next_poll, operation.deadline)
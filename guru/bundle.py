@@ -9,14 +9,17 @@ import zipfile
 import requests
 import webbrowser
 
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
 from bs4 import BeautifulSoup
 
 if sys.version_info.major >= 3:
-  from urllib.parse import urljoin
+  from urllib.parse import urljoin, urlparse
 else:
-  from urlparse import urljoin
+  from urlparse import urljoin, urlparse
 
-from guru.util import clear_dir, write_file, copy_file, download_file, to_yaml, http_post, http_get, load_html
+from guru.util import RetryPolicy, parse_retry_after, clear_dir, make_dir, write_file, copy_file, download_file, to_yaml, http_post, http_get, load_html
 
 # node types
 NONE = "NONE"
@@ -52,6 +55,35 @@ def _is_local(url_or_path):
   else:
     return True
 
+def _download_status(download_result):
+  """
+  internal:
+  download_func can return True or False, or a tuple whose first item is the http
+  status code. Returns whether the download was successful and the status code.
+  """
+  if type(download_result) == type(True):
+    return download_result, None
+  elif download_result and isinstance(download_result[0], int):
+    return int(download_result[0] / 100) == 2, download_result[0]
+  return False, None
+
+def _find_resource_urls(content, url):
+  """
+  internal:
+  Returns the absolute urls of the images and files the html references, in the
+  order html_cleanup would check them, and whether each one came from a link.
+  """
+  doc = BeautifulSoup(content, "html.parser")
+  elements = [(el.attrs.get("src", ""), False) for el in doc.select("[src]")]
+  elements += [(el.attrs.get("href", ""), True) for el in doc.select("a[href]")]
+
+  result = []
+  for element_url, is_link in elements:
+    if not element_url or element_url.startswith("data:") or element_url.startswith("mailto:"):
+      continue
+    result.append((urljoin(url, element_url), is_link))
+  return result
+
 def _parse_style(text):
   result = {}
   pairs = text.split(";")
@@ -465,6 +497,168 @@ def insert_nodes(node, parent, depth):
     node.add_child(content_node, first=True)
     node.url = ""
 
+def _resolve_html_urls(content, url, resource_path, bundle_id, resources, find_node, download=None, log=None,
+                       copy_resource=copy_file):
+  """
+  internal:
+  Does the work for BundleNode.html_cleanup without needing the bundle or node
+  objects, so it can also run in a worker process. `find_node` takes a URL and
+  returns the (type, id) of the node it refers to, or None. `download` is called
+  with the URL and filename of each resource we haven't seen yet and when we're
+  not downloading, `copy_resource` is called to copy local files we haven't seen
+  yet. Resources we add are put in the `resources` dict. Returns the new html.
+  """
+  if log is None:
+    log = lambda **kwargs: None
+
+  doc = BeautifulSoup(content, "html.parser")
+  url_map = {}
+
+  # this function can work on image and link URLs.
+  def check_element(element, attr):
+    element_url = element.attrs.get(attr, "")
+
+    if element_url.startswith("data:") or element_url.startswith("mailto:"):
+      return
+
+    # remember this value so we can later check if it changed.
+    initial_value = element.attrs[attr]
+
+    # if we've already seen this URL, update this element in the same way.
+    # this way if they have two links to the same file we only download it once.
+    if initial_value in url_map:
+      element.attrs[attr] = url_map[initial_value]
+      return
+
+    absolute_url = urljoin(url, element_url)
+    resource_id = _url_to_id(absolute_url)
+
+    # download_func is responsible for deciding if we need to download the file
+    # and for doing the download too (since you probably need auth headers for
+    # the download to work).
+    if download:
+
+      # if we've already downloaded this file, update the src/href.
+      if resource_id in resources:
+        element.attrs[attr] = resources[resource_id]
+      else:
+        filename = resource_path % (bundle_id, resource_id)
+        log(message="checking if we should download attachment", url=absolute_url, file=filename)
+
+        # you can either return True or return a tuple, with the http status code as the first item.
+        # if the file didn't download, you would get a return of False or None.
+        # if the file was downloaded we need to update the src/href.
+        download_result = download(absolute_url, filename)
+
+        if _download_status(download_result)[0]:
+          log(message="download successful", url=absolute_url, file=filename)
+          resources[resource_id] = "resources/%s" % resource_id
+          element.attrs[attr] = "resources/%s" % resource_id
+        else:
+          # returning False means it didn't download so we make the url absolute.
+          log(message="did not download", url=absolute_url, file=filename)
+          element.attrs[attr] = absolute_url
+    else:
+      # if we're not downloading files we still need to do some cleanup.
+      #  - move referenced attachments into the resources/ folder.
+      #  - make urls absolute.
+
+      # if it's a local html file and the src is relative,
+      # add the attachment as a resource and update the url.
+      if _is_local(url) and _is_local(element_url):
+        # if url is:            /Users/rmiller/export/something.html
+        # and element_url is:   images/bullet.gif
+        # then absolute_url is: /Users/rmiller/export/images/bullet.gif
+        # and filename is:      /tmp/{job_id}/resources/{hash}.gif
+        filename = resource_path % (bundle_id, resource_id)
+        if resource_id in resources or copy_resource(absolute_url, filename):
+          resources[resource_id] = "resources/%s" % resource_id
+          element.attrs[attr] = "resources/%s" % resource_id
+        else:
+          # the element could be a link or an image.
+          # if it's a link we unwrap its text, if it's an image we just remove it.
+          log(message="resource doesn't exist", file=filename)
+          if attr == "href":
+            element.unwrap()
+          else:
+            element.decompose()
+      elif _is_local(element_url):
+        # this means url is _not_ local but element_url is, so make it absolute.
+        element.attrs[attr] = absolute_url
+      # add protocols to image urls that are lacking them.
+      # i'm pretty sure this is required but i forget why.
+      elif element_url.startswith("//"):
+        element.attrs[attr] = "https:" + element_url
+
+    # we want to return True if the value changed.
+    if element.attrs and element.attrs[attr] != initial_value:
+      url_map[initial_value] = element.attrs[attr]
+  
+  # images and iframes can both have src attributes that might reference files we need
+  # to download or we may need to adjust ther urls (e.g. make them absolute).
+  for el in doc.select("[src]"):
+    check_element(el, "src")
+  
+  # look for links to files that need to be downloaded.
+  # also convert doc-to-doc links to be card-to-card.
+  for link in doc.select("a[href]"):
+    href = link.attrs.get("href", "")
+    if not href:
+      continue
+
+    check_as_attachment = True
+    absolute_url = urljoin(url, href)
+
+    other_node = find_node(absolute_url)
+    if other_node:
+      node_type, node_id = other_node
+      if node_type == FOLDER:
+        link.attrs["href"] = "folders/%s" % node_id
+      elif node_type == CARD:
+        link.attrs["href"] = "cards/%s" % node_id
+      check_as_attachment = False
+
+    # find links to local files and add these files as resources.
+    if check_as_attachment:
+      check_element(link, "href")
+    
+  return str(doc)
+
+# the url index a worker process looks links up in, used by Bundle.zip(workers=N),
+# and the resources that were downloaded or copied before the workers started.
+_worker_url_index = {}
+_worker_resources = {}
+_worker_downloaded = False
+
+def _init_cleanup_worker(url_index, resources, downloaded=False):
+  """internal"""
+  global _worker_url_index, _worker_resources, _worker_downloaded
+  _worker_url_index = url_index
+  _worker_resources = resources
+  _worker_downloaded = downloaded
+
+def _clean_up_in_worker(task):
+  """internal: returns the new html, the resources it added, and the log events."""
+  content, url, resource_path, bundle_id = task
+  resources = dict(_worker_resources)
+  events = []
+
+  # the downloads or copies were already done, so anything that's not a resource
+  # didn't download or doesn't exist.
+  download = None
+  if _worker_downloaded:
+    download = lambda url, filename: False
+
+  content = _resolve_html_urls(
+    content, url, resource_path, bundle_id, resources,
+    find_node=_worker_url_index.get,
+    download=download,
+    log=lambda **kwargs: events.append(kwargs),
+    copy_resource=lambda url, filename: False
+  )
+  added = {key: value for key, value in resources.items() if key not in _worker_resources}
+  return content, added, events
+
 class BundleNode:
   def __init__(self, id, bundle, url="", title="", desc="", content="", tags=None, alt_urls=None, index=None, node_type=None):
     self.id = id
@@ -713,146 +907,47 @@ class BundleNode:
     This will eventually have the ability to download images.
     """
     # we only need to clean up the html for cards that have content.
-    if not self.content or self.type != CARD or self.removed:
+    if not self.needs_html_cleanup():
       return
 
-    doc = BeautifulSoup(self.content, "html.parser")
-    url_map = {}
-
-    # this function can work on image and link URLs.
-    def check_element(element, attr):
-      url = element.attrs.get(attr, "")
-
-      if url.startswith("data:") or url.startswith("mailto:"):
-        return
-
-      # remember this value so we can later check if it changed.
-      initial_value = element.attrs[attr]
-
-      # if we've already seen this URL, update this element in the same way.
-      # this way if they have two links to the same file we only download it once.
-      if initial_value in url_map:
-        element.attrs[attr] = url_map[initial_value]
-        return
-
-      absolute_url = urljoin(self.url, url)
-      resource_id = _url_to_id(absolute_url)
-
-      # download_func is responsible for deciding if we need to download the file
-      # and for doing the download too (since you probably need auth headers for
-      # the download to work).
-      if download_func:
-
-        # if we've already downloaded this file, update the src/href.
-        if resource_id in self.bundle.resources:
-          element.attrs[attr] = self.bundle.resources[resource_id]
-        else:
-          filename = self.bundle.RESOURCE_PATH % (self.bundle.id, resource_id)
-          self.bundle.log(message="checking if we should download attachment", url=absolute_url, file=filename)
-
-          # you can either return True or return a tuple, with the http status code as the first item.
-          # if the file didn't download, you would get a return of False or None.
-          # if the file was downloaded we need to update the src/href.
-          download_result = download_func(absolute_url, filename, self.bundle, self)
-
-          is_successful = False
-          if type(download_result) == type(True):
-            is_successful = download_result
-          elif download_result and isinstance(download_result[0], int):
-            if int(download_result[0] / 100) == 2:
-              is_successful = True
-
-          if is_successful:
-            self.bundle.log(message="download successful", url=absolute_url, file=filename)
-            self.bundle.resources[resource_id] = "resources/%s" % resource_id
-            element.attrs[attr] = "resources/%s" % resource_id
-          else:
-            # returning False means it didn't download so we make the url absolute.
-            self.bundle.log(message="did not download", url=absolute_url, file=filename)
-            element.attrs[attr] = absolute_url
-      else:
-        # if we're not downloading files we still need to do some cleanup.
-        #  - move referenced attachments into the resources/ folder.
-        #  - make urls absolute.
-
-        # if it's a local html file and the src is relative,
-        # add the attachment as a resource and update the url.
-        if _is_local(self.url) and _is_local(url):
-          # if self.url is:       /Users/rmiller/export/something.html
-          # and url is:           images/bullet.gif
-          # then absolute_url is: /Users/rmiller/export/images/bullet.gif
-          # and filename is:      /tmp/{job_id}/resources/{hash}.gif
-          filename = self.bundle.RESOURCE_PATH % (self.bundle.id, resource_id)
-          if copy_file(absolute_url, filename):
-            self.bundle.resources[resource_id] = "resources/%s" % resource_id
-            element.attrs[attr] = "resources/%s" % resource_id
-          else:
-            # the element could be a link or an image.
-            # if it's a link we unwrap its text, if it's an image we just remove it.
-            self.bundle.log(message="resource doesn't exist", file=filename)
-            if attr == "href":
-              element.unwrap()
-            else:
-              element.decompose()
-        elif _is_local(url):
-          # this means self.url is _not_ local but the url is, so make it absolute.
-          element.attrs[attr] = absolute_url
-        # add protocols to image urls that are lacking them.
-        # i'm pretty sure this is required but i forget why.
-        elif url.startswith("//"):
-          element.attrs[attr] = "https:" + url
-  
-      # we want to return True if the value changed.
-      if element.attrs and element.attrs[attr] != initial_value:
-        url_map[initial_value] = element.attrs[attr]
-    
-    # images and iframes can both have src attributes that might reference files we need
-    # to download or we may need to adjust ther urls (e.g. make them absolute).
-    for el in doc.select("[src]"):
-      check_element(el, "src")
-    
-    # look for links to files that need to be downloaded.
-    # also convert doc-to-doc links to be card-to-card.
-    for link in doc.select("a[href]"):
-      href = link.attrs.get("href", "")
-      if not href:
-        continue
-
-      check_as_attachment = True
-      absolute_url = urljoin(self.url, href)
-
-      for other_node in self.bundle.nodes:
-        if other_node.removed:
-          continue
-        if (compare_links and compare_links(other_node, absolute_url)) or \
-            other_node.url == absolute_url or \
-            (other_node.alt_urls and absolute_url in other_node.alt_urls):
-          if other_node.type == FOLDER:
-            link.attrs["href"] = "folders/%s" % other_node.id
-          elif other_node.type == CARD:
-            link.attrs["href"] = "cards/%s" % other_node.id
-          check_as_attachment = False
-          break
+    def find_node(url):
+      node = self.bundle.find_node_by_url(url, compare_links)
+      if node:
+        return node.type, node.id
+
+    download = None
+    if download_func:
+      download = lambda url, filename: download_func(url, filename, self.bundle, self)
+
+    self.content = _resolve_html_urls(
+      self.content,
+      self.url,
+      self.bundle.RESOURCE_PATH,
+      self.bundle.id,
+      self.bundle.resources,
+      find_node,
+      download=download,
+      log=self.bundle.log
+    )
 
-      # find links to local files and add these files as resources.
-      if check_as_attachment:
-        check_element(link, "href")
-      
-    self.content = str(doc)
+  def needs_html_cleanup(self):
+    """internal"""
+    return bool(self.content) and self.type == CARD and not self.removed
 
-  def write_files(self):
+  def write_files(self, archive=None, keep_files=True):
     """
     internal:
     Writes the files needed for this object. For cards that's a .yaml
-    and .html file. For Folders it's just a .yaml file.
+    and .html file. For Folders it's just a .yaml file. If you pass a
+    zip archive the files are also written into it.
     """
     if self.removed:
       return
     if self.type == CARD:
-        write_file(self.bundle.CARD_YAML_PATH % (self.bundle.id, _id_to_filename(self.id)), self.make_yaml())
-        write_file(self.bundle.CARD_HTML_PATH % (self.bundle.id, _id_to_filename(self.id)), self.content.strip() or "")
+        self.bundle.write_output(self.bundle.CARD_YAML_PATH % (self.bundle.id, _id_to_filename(self.id)), self.make_yaml(), archive, keep_files)
+        self.bundle.write_output(self.bundle.CARD_HTML_PATH % (self.bundle.id, _id_to_filename(self.id)), self.content.strip() or "", archive, keep_files)
     elif self.type == FOLDER:
-        write_file(self.bundle.FOLDER_YAML_PATH % (self.bundle.id, _id_to_filename(self.id)), self.make_yaml())
+        self.bundle.write_output(self.bundle.FOLDER_YAML_PATH % (self.bundle.id, _id_to_filename(self.id)), self.make_yaml(), archive, keep_files)
 
   def make_yaml(self):
     """internal: Generates the yaml content for this node."""
@@ -908,6 +1003,8 @@ class Bundle:
   def __init__(self, guru, id="", clear=False, folder="/tmp/", verbose=False, skip_empty_folders=False):
     self.guru = guru
     self.id = slugify(id) if id else str(int(time.time()))
+    self.__node_index = {}
+    self.__url_index = None
     self.nodes = []
     self.resources = {}
     self.verbose = verbose
@@ -953,16 +1050,83 @@ class Bundle:
             row.append("")
         csv_out.writerow(row)
 
+  @property
+  def nodes(self):
+    """
+    The list of nodes. Use node() and remove_node() to add and remove nodes, or
+    assign a new list, so the index we use to look nodes up by ID stays current.
+    """
+    return self.__nodes
+
+  @nodes.setter
+  def nodes(self, nodes):
+    self.__nodes = nodes
+    self.__reindex_nodes()
+
+  def __reindex_nodes(self):
+    """internal: rebuilds the index we use to look up nodes by ID."""
+    # each ID maps to its nodes in list order, the first one is the one we use.
+    self.__node_index = {}
+    for node in self.__nodes:
+      self.__node_index.setdefault(node.id, []).append(node)
+
+  def __find_node(self, id):
+    """internal"""
+    nodes = self.__node_index.get(id)
+    return nodes[0] if nodes else None
+
+  def __normalize_id(self, id, url=""):
+    """internal"""
+    id = str(id)
+    if url and not id:
+      id = _url_to_id(url, False)
+    elif id:
+      # some characters aren't allowed in IDs, like `/`
+      id = id.replace("/", "_")
+    return id
+
   def has_node(self, id):
-    for n in self.nodes:
-      if n.id == id:
-        return True
-    return False
+    return self.__find_node(self.__normalize_id(id)) is not None
   
   def remove_node(self, node):
     node.detach()
-    if node in self.nodes:
-      self.nodes.remove(node)
+    if node in self.__nodes:
+      self.__nodes.remove(node)
+
+    nodes = self.__node_index.get(node.id)
+    if nodes and node in nodes:
+      nodes.remove(node)
+      if not nodes:
+        del self.__node_index[node.id]
+
+  def __make_url_index(self):
+    """internal: maps each node's url and alt_urls to the node."""
+    url_index = {}
+    for node in self.__nodes:
+      if node.removed:
+        continue
+      if node.url:
+        url_index.setdefault(node.url, node)
+      alt_urls = [node.alt_urls] if isinstance(node.alt_urls, str) else node.alt_urls
+      for alt_url in alt_urls or []:
+        url_index.setdefault(alt_url, node)
+    return url_index
+
+  def find_node_by_url(self, url, compare_links=None):
+    """
+    Finds the node whose `url` or `alt_urls` match the given URL. If none do
+    and you pass a `compare_links` function, we call it with each node and
+    the URL and return the first node it returns True for.
+    """
+    # zip() builds the index once for all of the links it rewrites.
+    url_index = self.__url_index if self.__url_index is not None else self.__make_url_index()
+    node = url_index.get(url)
+    if node or not compare_links:
+      return node
+
+    for node in self.__nodes:
+      if not node.removed and compare_links(node, url):
+        return node
 
   def url_to_id(self, url):
     return _url_to_id(url, False)
@@ -985,18 +1149,8 @@ class Bundle:
     parent/child relationship, then call bundle.node() again later to set the
     child node's content.
     """
-    id = str(id)
-    if url and not id:
-      id = _url_to_id(url, False)
-    elif id:
-      # some characters aren't allowed in IDs, like `/`
-      id = id.replace("/", "_")
-    
-    node = None
-    for n in self.nodes:
-      if n.id == id:
-        node = n
-        break
+    id = self.__normalize_id(id, url)
+    node = self.__find_node(id)
     
     if title:
       title = str(title).strip()
@@ -1005,7 +1159,8 @@ class Bundle:
 
     if not node:
       node = BundleNode(id, bundle=self, title=title, desc=desc, content=content, tags=tags, alt_urls=alt_urls, index=index, node_type=node_type)
-      self.nodes.append(node)
+      self.__nodes.append(node)
+      self.__node_index[id] = [node]
     
     if url:
       node.url = url
@@ -1034,15 +1189,31 @@ class Bundle:
     else:
         traverse_tree(self, print_node)
 
-  def __wait_and_retry(self, status_code, wait):
-    """internal"""
-    if status_code == 429:
-      # todo: use the response headers to check if they tell us how long to wait.
-      self.log(message="got a 429 response", status_code=status_code, wait=wait)
-      time.sleep(wait)
-      return True
+  def __wait_and_retry(self, status_code, headers, attempt, retry, start_time, timeout=0):
+    """
+    internal:
+    If the call was rate limited (429) and the retry policy lets us try again,
+    this waits (for as long as the Retry-After header says, if there is one)
+    and returns True.
+    """
+    if status_code != 429 or not retry.should_retry(attempt, status_code):
+      return False
+
+    wait = parse_retry_after(headers.get("Retry-After"))
+    if wait is None:
+      wait = retry.get_wait(attempt)
 
-  def load_html(self, url, cache=False, make_links_absolute=True, headers=None, wait=5, timeout=0):
+    # if waiting again would go past the timeout or the policy's limit, we give up.
+    elapsed = time.time() - start_time
+    if (timeout and elapsed + wait > timeout) or elapsed + wait > retry.max_total_wait:
+      self.log(message="giving up after 429 responses", status_code=status_code, timeout=timeout, attempts=attempt + 1)
+      return False
+
+    self.log(message="got a 429 response", status_code=status_code, wait=wait)
+    time.sleep(wait)
+    return True
+
+  def load_html(self, url, cache=False, make_links_absolute=True, headers=None, wait=5, timeout=0, retry=None):
     """
     Makes an HTTP get call to load a URL, parse its content as HTML, and return a Beautiful
     Soup document object representing it.
@@ -1051,21 +1222,28 @@ class Bundle:
     through the bundle object then it automatically logs this call and its response to its .csv
     log file. It's also easily cacheable so if your scripts can run faster by storing the HTTP
     responses to disk so subsequent runs can use the cached data.
+
+    Calls that get a 429 response are retried based on `retry` (a RetryPolicy, by
+    default one whose backoff is `wait` seconds), for up to `timeout` seconds if
+    you pass one.
     """
     # todo: figure out if we should log the headers. these could be helpful to have later
     #       but they could also contain an API key or other sensitive data.
     self.log(message="calling load_html", url=url, cache=cache, make_links_absolute=make_links_absolute)
+    retry = retry or RetryPolicy(backoff=wait)
+    start_time = time.time()
+    attempt = 0
     while True:
-      doc, status_code = load_html(url, cache, make_links_absolute, headers)
+      doc, status_code, response_headers = load_html(
+          url, cache, make_links_absolute, headers, session=self.guru.session, return_headers=True)
       self.log(message="load_html response", url=url, status_code=status_code)
 
-      if self.__wait_and_retry(status_code, wait):
-        # todo: check if we've timed out.
-        continue
+      if self.__wait_and_retry(status_code, response_headers, attempt, retry, start_time, timeout):
+        attempt += 1
       else:
         return doc
 
-  def http_get(self, url, cache=False, headers=None, wait=5, timeout=0):
+  def http_get(self, url, cache=False, headers=None, wait=5, timeout=0, retry=None):
     """
     Makes an HTTP get call to load the specified URL and returns its response content as a string.
 
@@ -1073,20 +1251,27 @@ class Bundle:
     through the bundle object then it automatically logs this call and its response to its .csv
     log file. It's also easily cacheable so if your scripts can run faster by storing the HTTP
     responses to disk so subsequent runs can use the cached data.
+
+    Calls that get a 429 response are retried based on `retry` (a RetryPolicy, by
+    default one whose backoff is `wait` seconds), for up to `timeout` seconds if
+    you pass one.
     """
     self.log(message="calling http_get", url=url, cache=cache, timeout=timeout)
 
+    retry = retry or RetryPolicy(backoff=wait)
+    start_time = time.time()
+    attempt = 0
     while True:
-      content, status_code = http_get(url, cache, headers)
+      content, status_code, response_headers = http_get(
+          url, cache, headers, session=self.guru.session, return_headers=True)
       self.log(message="http_get response", url=url, status_code=status_code)
 
-      if self.__wait_and_retry(status_code, wait):
-        # todo: check if we've timed out.
-        continue
+      if self.__wait_and_retry(status_code, response_headers, attempt, retry, start_time, timeout):
+        attempt += 1
       else:
         return content
 
-  def http_post(self, url, data=None, cache=False, headers=None, wait=5, timeout=0):
+  def http_post(self, url, data=None, cache=False, headers=None, wait=5, timeout=0, retry=None):
     """
     Makes an HTTP post call to the specified URL and returns the response content as a string.
 
@@ -1094,36 +1279,50 @@ class Bundle:
     through the bundle object then it automatically logs this call and its response to its .csv
     log file. It's also easily cacheable so if your scripts can run faster by storing the HTTP
     responses to disk so subsequent runs can use the cached data.
+
+    Calls that get a 429 response are retried based on `retry` (a RetryPolicy, by
+    default one whose backoff is `wait` seconds), for up to `timeout` seconds if
+    you pass one.
     """
     self.log(message="calling http_post", url=url, cache=cache, timeout=timeout)
+    retry = retry or RetryPolicy(backoff=wait)
+    start_time = time.time()
+    attempt = 0
     while True:
-      content, status_code = http_post(url, data, cache, headers)
+      content, status_code, response_headers = http_post(
+          url, data, cache, headers, session=self.guru.session, return_headers=True)
       self.log(message="http_post response", url=url, status_code=status_code)
 
-      if self.__wait_and_retry(status_code, wait):
-        # todo: check if we've timed out.
-        continue
+      if self.__wait_and_retry(status_code, response_headers, attempt, retry, start_time, timeout):
+        attempt += 1
       else:
         return content
 
-  def download_file(self, url, filename, headers=None, cache=False, wait=5, timeout=0):
+  def download_file(self, url, filename, headers=None, cache=False, wait=5, timeout=0, retry=None):
     """
     Makes an HTTP get call to load a remote file and save it to a local file.
 
     You can do this yourself using the `requests` module directly but if you do it
     through the bundle object then it automatically logs this call and its response to its .csv
     log file.
+
+    Calls that get a 429 response are retried based on `retry` (a RetryPolicy, by
+    default one whose backoff is `wait` seconds), for up to `timeout` seconds if
+    you pass one.
     """
     # todo: make this have a 'cache' parameter.
     self.log(message="calling download_file", url=url, filename=filename)
 
+    retry = retry or RetryPolicy(backoff=wait)
+    start_time = time.time()
+    attempt = 0
     while True:
-      status_code, file_size = download_file(url, filename, headers, cache=cache)
+      status_code, file_size, response_headers = download_file(
+          url, filename, headers, cache=cache, session=self.guru.session, return_headers=True)
       self.log(message="download_file response", url=url, filename=filename, status_code=status_code, file_size=file_size)
 
-      if self.__wait_and_retry(status_code, wait):
-        # todo: check if we've timed out.
-        continue
+      if self.__wait_and_retry(status_code, response_headers, attempt, retry, start_time, timeout):
+        attempt += 1
       else:
         return status_code, file_size
 
@@ -1175,7 +1374,199 @@ class Bundle:
 
     return to_yaml(data)
 
-  def zip(self, download_func=None, compare_links=None, clean_html=True):
+  def download_resources(self, download_func, compare_links=None, workers=8, per_host=4, retry=None):
+    """
+    Finds all of the images and files the cards reference and downloads them
+    using a pool of threads, instead of one at a time while we clean up each
+    card's html. Each resource is downloaded once, even if many cards use it.
+    `zip(download_workers=N)` calls this for you.
+
+    `download_func` is called the same way `zip()` calls it, with the url,
+    filename, bundle, and the first node that references the file. Calls that
+    return a 429 or 5xx status code or raise an exception are retried with
+    exponential backoff. We log how long each download took in the log.csv file.
+
+    Args:
+      download_func (function): The function that downloads a file.
+      compare_links (function, optional): The same function you'd pass to `zip()`,
+        used to skip links that point to other nodes.
+      workers (int, optional): The most downloads we'll do at once. Defaults to 8.
+      per_host (int, optional): The most downloads we'll do at once from one host. Defaults to 4.
+      retry (RetryPolicy, optional): How failed downloads are retried. Defaults to `RetryPolicy()`.
+
+    Returns:
+      dict: The keys are resource IDs and the values are True if the file was downloaded.
+    """
+    retry = retry or RetryPolicy()
+    url_index = self.__url_index if self.__url_index is not None else self.__make_url_index()
+
+    # collect the resources in the order html_cleanup would've downloaded them. if this
+    # is called before zip() the nodes don't have types yet, so we check all of them.
+    downloads = {}
+    for node in self.nodes:
+      if not node.content or node.removed or node.type not in (CARD, None):
+        continue
+      for absolute_url, is_link in _find_resource_urls(node.content, node.url):
+        if is_link and (url_index.get(absolute_url) or (compare_links and self.find_node_by_url(absolute_url, compare_links))):
+          continue
+        resource_id = _url_to_id(absolute_url)
+        if resource_id not in downloads and resource_id not in self.resources:
+          downloads[resource_id] = (absolute_url, node)
+
+    def download(resource_id, url, node):
+      filename = self.RESOURCE_PATH % (self.id, resource_id)
+      start_time = time.time()
+      attempt = 0
+      total_wait = 0
+      while True:
+        try:
+          is_successful, status_code = _download_status(download_func(url, filename, self, node))
+          can_retry = status_code is not None
+        except Exception as error:
+          self.log(message="error downloading resource", url=url, file=filename, error=str(error))
+          is_successful, status_code, can_retry = False, None, True
+
+        if is_successful or not can_retry or not retry.should_retry(attempt, status_code):
+          break
+
+        wait_time = retry.get_wait(attempt)
+        if total_wait + wait_time > retry.max_total_wait:
+          break
+        self.log(message="retrying resource download", url=url, status_code=status_code, wait=wait_time)
+        time.sleep(wait_time)
+        total_wait += wait_time
+        attempt += 1
+
+      self.log(
+        message="download successful" if is_successful else "did not download",
+        url=url,
+        file=filename,
+        status_code=status_code,
+        attempts=attempt + 1,
+        seconds=time.time() - start_time
+      )
+      return is_successful
+
+    # each host has its own queue and we only hand a download to the pool when its
+    # host has a free slot, so worker threads never sit waiting on a busy host while
+    # downloads from other hosts could be running.
+    queues = {}
+    for resource_id, (url, node) in downloads.items():
+      queues.setdefault(urlparse(url).netloc, deque()).append((resource_id, url, node))
+    active = {host: 0 for host in queues}
+    running = {}
+    futures = {}
+
+    def submit_ready():
+      # take one download from each host with a free slot in turn, so one host
+      # with lots of files doesn't take all of the workers.
+      submitted = True
+      while submitted and len(running) < workers:
+        submitted = False
+        for host, queue in queues.items():
+          if queue and active[host] < per_host and len(running) < workers:
+            resource_id, url, node = queue.popleft()
+            future = executor.submit(download, resource_id, url, node)
+            futures[resource_id] = future
+            running[future] = host
+            active[host] += 1
+            submitted = True
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+      submit_ready()
+      while running:
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+          active[running.pop(future)] -= 1
+        submit_ready()
+
+    # add the resources in the order we found them so the output doesn't depend on timing.
+    result = {}
+    for resource_id in downloads:
+      result[resource_id] = futures[resource_id].result()
+      if result[resource_id]:
+        self.resources[resource_id] = "resources/%s" % resource_id
+    return result
+
+  def __html_cleanup_in_workers(self, workers, downloaded=False):
+    """
+    internal:
+    Cleans up each node's html in a pool of processes. Each process gets a copy
+    of the url index once and we merge the results back in node order, so the
+    resources and log events end up in the same order as doing it serially.
+    Local files are copied here first so each one is copied once, not once per
+    worker that comes across it.
+    """
+    url_index = {url: (node.type, node.id) for url, node in self.__url_index.items()}
+    nodes = [node for node in self.nodes if node.needs_html_cleanup()]
+    if not downloaded:
+      self.__copy_local_resources(nodes, url_index)
+    tasks = [(node.content, node.url, self.RESOURCE_PATH, self.id) for node in nodes]
+    initargs = (url_index, dict(self.resources), downloaded)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_cleanup_worker, initargs=initargs) as executor:
+      results = executor.map(_clean_up_in_worker, tasks, chunksize=max(1, len(tasks) // (workers * 4)))
+
+      count = 0
+      for node in self.nodes:
+        count += 1
+        self.log(message=f"post-processing node {count} / {len(self.nodes)}", node=node.id)
+        if node.needs_html_cleanup():
+          node.content, resources, events = next(results)
+          self.resources.update(resources)
+          for event in events:
+            self.log(**event)
+
+  def __copy_local_resources(self, nodes, url_index):
+    """
+    internal:
+    Copies the local files these nodes' html references into the resources folder,
+    the same way html_cleanup would, and adds the ones that exist to self.resources.
+    """
+    checked = set()
+    for node in nodes:
+      if not _is_local(node.url):
+        continue
+      for absolute_url, is_link in _find_resource_urls(node.content, node.url):
+        if not _is_local(absolute_url) or (is_link and absolute_url in url_index):
+          continue
+        resource_id = _url_to_id(absolute_url)
+        if resource_id in checked or resource_id in self.resources:
+          continue
+        checked.add(resource_id)
+        if copy_file(absolute_url, self.RESOURCE_PATH % (self.id, resource_id)):
+          self.resources[resource_id] = "resources/%s" % resource_id
+
+  def write_output(self, path, content, archive=None, keep_file=True):
+    """
+    internal:
+    Writes one of the bundle's files to its folder, to the zip archive, or both.
+    The path in the archive is the file's path relative to the bundle's folder.
+    """
+    if keep_file:
+      write_file(path, content)
+    if archive:
+      zip_path = os.path.relpath(path, self.CONTENT_PATH % self.id)
+      self.log(message="add file to zip", file=os.path.basename(path), zip_path=zip_path)
+      archive.writestr(zip_path, content)
+
+  def __add_resources_to_zip(self, archive):
+    """internal: streams each resource file from disk into the archive."""
+    for res_id, res_path in self.resources.items():
+      filename = self.RESOURCE_PATH % (self.id, res_id)
+      # local files that weren't copied into the resources folder are read from where they are.
+      if not os.path.isfile(filename) and not res_path.startswith(self.CONTENT_PATH % self.id):
+        filename = res_path.split("?")[0]
+      if not os.path.isfile(filename):
+        self.log(message="resource doesn't exist", file=filename, resource=res_id)
+        continue
+
+      zip_path = "resources/%s" % res_id
+      self.log(message="add file to zip", file=res_id, zip_path=zip_path)
+      archive.write(filename, zip_path)
+
+  def zip(self, download_func=None, compare_links=None, clean_html=True, workers=None, download_workers=None,
+          stream=False, keep_files=True):
     """
     This wraps up the sync process. Calling this lets us know you're
     done adding content so we can do these things:
@@ -1185,6 +1576,22 @@ class Bundle:
     3. Clean up link/image URLs and download resources.
     4. Write the .html and .yaml files.
     5. Make a .zip archive with all the content.
+
+    Step 3 parses every card's html so for large bundles you can pass `workers`
+    to do it in that many processes. The output is the same as doing it in this
+    process. On macOS and Windows new processes start by importing your script, so
+    a script that uses `workers` needs to put its code under an
+    `if __name__ == "__main__":` block, otherwise each process would run the whole
+    script again. `download_func` and `compare_links` are called with the bundle and
+    node objects, so if you pass either of them step 3 is done in this process
+    -- unless you also pass `download_workers`, then we download all resources
+    first (see `download_resources`) using that many threads.
+
+    By default steps 4 and 5 write the files to the bundle's folder, then read
+    them all back to build the .zip file. Passing `stream=True` writes each file
+    into the .zip file as it's generated and reads resources from disk once. If
+    you also pass `keep_files=False` the .yaml and .html files aren't written to
+    the folder at all (so `view_in_browser` won't have them to show).
     """
 
     # todo: sort all nodes children by their 'index'.
@@ -1206,13 +1613,31 @@ class Bundle:
     # these are done for all nodes, the tree structure doesn't matter.
     if clean_html:
       count = 0
-      for node in self.nodes:
-        count += 1
-        self.log(message=f"post-processing node {count} / {len(self.nodes)}", node=node.id)
-        node.html_cleanup(
-          download_func=download_func,
-          compare_links=compare_links
-        )
+      self.__url_index = self.__make_url_index()
+      try:
+        downloaded = False
+        if download_func and download_workers:
+          self.download_resources(download_func, compare_links, workers=download_workers)
+          # everything that downloaded is in self.resources now, so anything else didn't.
+          download_func = lambda url, filename, bundle, node: False
+          downloaded = True
+
+        if workers and workers > 1 and not compare_links and (downloaded or not download_func):
+          self.__html_cleanup_in_workers(workers, downloaded)
+        else:
+          for node in self.nodes:
+            count += 1
+            self.log(message=f"post-processing node {count} / {len(self.nodes)}", node=node.id)
+            node.html_cleanup(
+              download_func=download_func,
+              compare_links=compare_links
+            )
+      finally:
+        self.__url_index = None
+
+    if stream:
+      self.__zip_stream(keep_files)
+      return
 
     for node in self.nodes:
       node.write_files()
@@ -1241,6 +1666,19 @@ class Bundle:
     zip_file.close()
     self.__write_csv()
 
+  def __zip_stream(self, keep_files=True):
+    """internal: writes the .yaml, .html, and resource files straight into the zip file."""
+    zip_path = self.ZIP_PATH % self.id
+    make_dir(zip_path)
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED, allowZip64=True) as zip_file:
+      for node in self.nodes:
+        node.write_files(zip_file, keep_files)
+      self.write_output(self.COLLECTION_YAML_PATH % self.id, self.__make_collection_yaml(), zip_file, keep_files)
+      self.__add_resources_to_zip(zip_file)
+
+    make_dir(self.CSV_PATH % self.id)
+    self.__write_csv()
+
   def upload(self, is_sync=False, name="", color="", desc="", collection_id=""):
     """
     Uploads the zip file you generated to Guru.
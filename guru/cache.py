@@ -0,0 +1,567 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import types
+import hashlib
+import weakref
+import threading
+
+from collections import OrderedDict
+from requests.structures import CaseInsensitiveDict
+
+from guru.util import json_dumps, json_loads
+
+# how long (in seconds) cached API responses are good for, based on the url.
+# the first pattern that matches is used and urls that don't match any of
+# these use the cache's default ttl.
+DEFAULT_TTLS = [
+    (r"/whoami$", 6 * 60 * 60),
+    (r"/frameworks", 60 * 60),
+    (r"/collections", 5 * 60),
+    (r"/groups", 5 * 60),
+    (r"/tagcategories", 5 * 60),
+]
+
+# these are the only response headers we keep in the disk cache. the validators
+# are what let us revalidate an entry and we need the Link header for paging.
+PERSISTED_HEADERS = ["ETag", "Last-Modified", "Link", "Content-Type"]
+
+
+def compile_ttls(ttls):
+  return [(re.compile(pattern), ttl) for pattern, ttl in (DEFAULT_TTLS if ttls is None else ttls)]
+
+
+def find_ttl(ttls, url, default_ttl):
+  for pattern, ttl in ttls:
+    if pattern.search(url):
+      return ttl
+  return default_ttl
+
+
+def get_validators(headers):
+  """Returns the headers for a conditional request that checks if a response with these headers is still current."""
+  validators = {}
+  if headers.get("ETag"):
+    validators["If-None-Match"] = headers["ETag"]
+  if headers.get("Last-Modified"):
+    validators["If-Modified-Since"] = headers["Last-Modified"]
+  return validators
+
+
+class CachedResponse:
+  """
+  This stands in for a requests.Response object when a response comes from
+  the cache. We only keep the status code, headers, and JSON body so the
+  cache doesn't hold on to raw response objects.
+
+  The body is kept as bytes and each call to json() parses it again, so
+  everyone who gets this response from the cache gets their own copy of
+  the data and changing it doesn't change what's in the cache.
+
+  When we look up an item by name in a list response we keep the LookupIndex
+  we built on the response, so it lives exactly as long as the cache entry.
+  """
+
+  def __init__(self, status_code, headers, data, url="", size=0, content=None):
+    self.status_code = status_code
+    self.headers = headers
+    self.url = url
+    self.size = size
+    self.index = None
+    if content is None:
+      content = json_dumps(data) if data is not None else b""
+    self.__content = content
+
+  def json(self):
+    return json_loads(self.__content) if self.__content else None
+
+  @property
+  def text(self):
+    return self.__content.decode("utf-8")
+
+  @property
+  def content(self):
+    return self.__content
+
+
+class ResponseCache:
+  """
+  A size-limited cache for API responses. Entries are evicted in least
+  recently used order once there are more than `max_entries` of them or
+  they add up to more than `max_bytes`. Each entry also expires after a
+  ttl that depends on its url (see DEFAULT_TTLS), so data that rarely
+  changes, like /whoami, is kept longer than lists of collections or groups.
+
+  The Guru object has one of these as `g.response_cache`, you can check
+  how well it's working like this:
+
+  ```
+  print(g.response_cache.stats())
+  ```
+
+  Args:
+    max_entries (int, optional): The most responses we'll keep. Defaults to 1000.
+    max_bytes (int, optional): The most response data (by size of the response bodies)
+      we'll keep. Defaults to 50 MB.
+    default_ttl (float, optional): The number of seconds entries are kept for if their url
+      doesn't match one of the ttl patterns. None means they never expire. Defaults to 10 minutes.
+    ttls (list of (str, float), optional): A list of (regex, seconds) pairs that are checked
+      against each url to pick its ttl. Defaults to DEFAULT_TTLS.
+  """
+
+  def __init__(self, max_entries=1000, max_bytes=50 * 1024 * 1024, default_ttl=10 * 60, ttls=None):
+    self.max_entries = max_entries
+    self.max_bytes = max_bytes
+    self.default_ttl = default_ttl
+    self.ttls = compile_ttls(ttls)
+
+    # each value is a tuple of (value, size, expiration time).
+    self.__entries = OrderedDict()
+    self.__bytes = 0
+    self.__lock = threading.RLock()
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.expirations = 0
+
+  def __len__(self):
+    return len(self.__entries)
+
+  def __contains__(self, key):
+    return self.get(key, count=False) is not None
+
+  def get_ttl(self, key):
+    """Returns the number of seconds an entry for this key is kept for."""
+    return find_ttl(self.ttls, key, self.default_ttl)
+
+  def get(self, key, count=True):
+    """Returns the cached value or None if there isn't one (or it has expired)."""
+    with self.__lock:
+      entry = self.__entries.get(key)
+      if entry is not None and entry[2] is not None and entry[2] <= time.time():
+        self.__remove(key)
+        self.expirations += 1
+        entry = None
+
+      if entry is None:
+        if count:
+          self.misses += 1
+        return
+
+      self.__entries.move_to_end(key)
+      if count:
+        self.hits += 1
+      return entry[0]
+
+  def set(self, key, value, size=0, ttl=None):
+    """Stores a value. `size` is roughly how many bytes it takes up."""
+    if ttl is None:
+      ttl = self.get_ttl(key)
+
+    with self.__lock:
+      self.__remove(key)
+
+      # if this one item is bigger than the whole cache, don't bother.
+      if self.max_bytes and size > self.max_bytes:
+        return
+
+      expires = time.time() + ttl if ttl is not None else None
+      self.__entries[key] = (value, size, expires)
+      self.__bytes += size
+
+      while self.__entries and (
+          (self.max_entries and len(self.__entries) > self.max_entries) or
+          (self.max_bytes and self.__bytes > self.max_bytes)):
+        oldest_key = next(iter(self.__entries))
+        self.__remove(oldest_key)
+        self.evictions += 1
+
+  def delete(self, key):
+    with self.__lock:
+      self.__remove(key)
+
+  def clear(self):
+    with self.__lock:
+      self.__entries.clear()
+      self.__bytes = 0
+
+  def __remove(self, key):
+    """internal"""
+    entry = self.__entries.pop(key, None)
+    if entry is not None:
+      self.__bytes -= entry[1]
+
+  def stats(self):
+    """Returns a dict with the cache's hit, miss, and eviction counts and its current size."""
+    with self.__lock:
+      return {
+          "hits": self.hits,
+          "misses": self.misses,
+          "evictions": self.evictions,
+          "expirations": self.expirations,
+          "entries": len(self.__entries),
+          "bytes": self.__bytes
+      }
+
+
+class SingleFlight:
+  """
+  Makes sure only one call for each key is running at a time. If a thread asks
+  for a key that's already being loaded it waits for that call to finish and
+  gets the same result (or exception) instead of making its own call.
+
+  The Guru object uses this for GET calls so threads that all miss the cache at
+  the same moment share one request, e.g. for /whoami or a team's tag categories.
+  """
+
+  def __init__(self):
+    self.__lock = threading.Lock()
+    self.__calls = {}
+    self.shared = 0
+
+  def do(self, key, func):
+    """Calls func() unless a call for this key is already in flight, then returns its result."""
+    with self.__lock:
+      call = self.__calls.get(key)
+      is_leader = call is None
+      if is_leader:
+        call = self.__calls[key] = _InFlightCall()
+      else:
+        self.shared += 1
+
+    if not is_leader:
+      call.done.wait()
+      if call.error is not None:
+        raise call.error
+      return call.result
+
+    try:
+      call.result = func()
+      return call.result
+    except BaseException as e:
+      call.error = e
+      raise
+    finally:
+      with self.__lock:
+        del self.__calls[key]
+      call.done.set()
+
+
+class _InFlightCall:
+  """internal"""
+
+  def __init__(self):
+    self.done = threading.Event()
+    self.result = None
+    self.error = None
+
+
+class DiskCacheEntry:
+  """A response loaded from the disk cache, along with when it was stored and when it goes stale."""
+
+  def __init__(self, url, status_code, headers, data, stored, expires, size=0):
+    self.url = url
+    self.status_code = status_code
+    self.headers = headers
+    self.data = data
+    self.stored = stored
+    self.expires = expires
+    self.size = size
+
+  def is_fresh(self):
+    return self.expires is None or self.expires > time.time()
+
+  def get_validators(self):
+    """Returns the headers for a conditional request that checks if this entry is still current."""
+    return get_validators(self.headers)
+
+  def to_response(self):
+    return CachedResponse(self.status_code, self.headers, self.data, url=self.url, size=self.size)
+
+
+class DiskCache:
+  """
+  A persistent cache for API responses that's kept in a SQLite file, so
+  data that rarely changes (collections, groups, tags, folders, etc.) doesn't
+  have to be downloaded again every time a script runs:
+
+  ```
+  import guru
+  g = guru.Guru(disk_cache="~/.guru-cache.sqlite")
+  ```
+
+  Entries are keyed by url and by a hash of the credentials they were loaded
+  with, so users who share a cache file never see each other's data. When the
+  API gave us an ETag or Last-Modified header for a response we revalidate it
+  with a conditional request and reuse our copy if we get a 304. Otherwise
+  entries are used until their ttl runs out, same as the in-memory cache.
+  Responses without those headers are only stored when you ask for cached
+  data, since otherwise we'd never use them.
+
+  Args:
+    path (str): The path of the SQLite file. It's created if it doesn't exist.
+    default_ttl (float, optional): The number of seconds entries are used without being
+      revalidated if their url doesn't match one of the ttl patterns. Defaults to 10 minutes.
+    ttls (list of (str, float), optional): A list of (regex, seconds) pairs that are checked
+      against each url to pick its ttl. Defaults to DEFAULT_TTLS.
+    max_entries (int, optional): The most responses we'll keep, the ones that were stored
+      or revalidated longest ago are removed first. Defaults to 10,000.
+  """
+
+  def __init__(self, path, default_ttl=10 * 60, ttls=None, max_entries=10000):
+    self.path = os.path.expanduser(path)
+    self.default_ttl = default_ttl
+    self.ttls = compile_ttls(ttls)
+    self.max_entries = max_entries
+    self.__lock = threading.Lock()
+    self.__db = sqlite3.connect(self.path, check_same_thread=False)
+    with self.__db:
+      self.__db.execute("""
+          CREATE TABLE IF NOT EXISTS responses (
+            identity TEXT NOT NULL,
+            url TEXT NOT NULL,
+            status_code INTEGER NOT NULL,
+            headers TEXT NOT NULL,
+            data TEXT,
+            size INTEGER NOT NULL,
+            stored REAL NOT NULL,
+            expires REAL,
+            used REAL NOT NULL,
+            PRIMARY KEY (identity, url)
+          )""")
+      self.__db.execute("CREATE INDEX IF NOT EXISTS responses_used ON responses (used)")
+
+    # we keep a count of the rows so we only look for entries to remove once
+    # there are too many, rather than on every write.
+    self.__count = self.__db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+  @staticmethod
+  def make_identity(username, api_token):
+    """Returns the key we store entries under for a set of credentials (we never store the token itself)."""
+    return hashlib.sha256(("%s:%s" % (username, api_token)).encode("utf-8")).hexdigest()
+
+  def get_ttl(self, url):
+    """Returns the number of seconds an entry for this url is used without being revalidated."""
+    return find_ttl(self.ttls, url, self.default_ttl)
+
+  def get(self, identity, url):
+    """Returns the DiskCacheEntry for this url, stale or not, or None if we don't have one."""
+    with self.__lock:
+      row = self.__db.execute(
+          "SELECT status_code, headers, data, size, stored, expires FROM responses WHERE identity = ? AND url = ?",
+          (identity, url)
+      ).fetchone()
+    if not row:
+      return
+
+    status_code, headers, data, size, stored, expires = row
+    return DiskCacheEntry(
+        url, status_code, CaseInsensitiveDict(json.loads(headers)),
+        json_loads(data) if data is not None else None, stored, expires, size=size)
+
+  def set(self, identity, url, response):
+    """Stores a successful response (a CachedResponse)."""
+    ttl = self.get_ttl(url)
+    now = time.time()
+    headers = {name: response.headers[name] for name in PERSISTED_HEADERS if response.headers.get(name)}
+    # the response already holds its encoded body so we store that as-is.
+    data = response.text or None
+    with self.__lock, self.__db:
+      exists = self.__db.execute(
+          "SELECT 1 FROM responses WHERE identity = ? AND url = ?", (identity, url)
+      ).fetchone()
+      self.__db.execute(
+          "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+          (identity, url, response.status_code, json.dumps(headers), data, response.size,
+           now, now + ttl if ttl is not None else None, now)
+      )
+      if not exists:
+        self.__count += 1
+      if self.max_entries and self.__count > self.max_entries:
+        self.__evict()
+
+  def __evict(self):
+    """internal"""
+    # another process may be using the same file so we get the real count before removing anything.
+    self.__count = self.__db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+    if self.__count > self.max_entries:
+      self.__db.execute(
+          "DELETE FROM responses WHERE rowid IN (SELECT rowid FROM responses ORDER BY used LIMIT ?)",
+          (self.__count - self.max_entries,)
+      )
+      self.__count = self.max_entries
+
+  def refresh(self, identity, url):
+    """Marks an entry as current again, we call this when revalidating it got a 304."""
+    ttl = self.get_ttl(url)
+    now = time.time()
+    with self.__lock, self.__db:
+      self.__db.execute(
+          "UPDATE responses SET expires = ?, used = ? WHERE identity = ? AND url = ?",
+          (now + ttl if ttl is not None else None, now, identity, url)
+      )
+
+  def delete(self, identity, url):
+    """Removes the entry for this url along with any entries for the same url with a query string."""
+    with self.__lock, self.__db:
+      cursor = self.__db.execute(
+          "DELETE FROM responses WHERE identity = ? AND (url = ? OR substr(url, 1, ?) = ?)",
+          (identity, url, len(url) + 1, url + "?")
+      )
+      self.__count = max(0, self.__count - cursor.rowcount)
+
+  def clear(self):
+    with self.__lock, self.__db:
+      self.__db.execute("DELETE FROM responses")
+      self.__count = 0
+
+  def close(self):
+    with self.__lock:
+      self.__db.close()
+
+  def __len__(self):
+    with self.__lock:
+      return self.__db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+def copy_object_state(source, target):
+  """
+  Copies every attribute of `source` onto `target`, which must be the same type.
+  Slots that aren't set on `source` are cleared on `target`. Attributes that only
+  `target` has in its `__dict__` (ones you set yourself) are kept.
+  """
+  for cls in type(source).__mro__:
+    for value in list(cls.__dict__.values()):
+      if not isinstance(value, types.MemberDescriptorType):
+        continue
+      try:
+        value.__set__(target, value.__get__(source, cls))
+      except AttributeError:
+        try:
+          value.__delete__(target)
+        except AttributeError:
+          pass
+
+  source_dict = getattr(source, "__dict__", None)
+  if source_dict:
+    target.__dict__.update(source_dict)
+
+
+class IdentityMap:
+  """
+  Makes sure there's one object for each card, folder, or board a Guru object
+  loads. When something is loaded again we return the object we already have,
+  so a change made through one reference is visible through all of them:
+
+  ```
+  import guru
+  g = guru.Guru(identity_map=True)
+
+  card = g.get_card("Tbbqo5pc")
+  same_card = g.find_cards(title="Getting Started")[0]
+  print(card is same_card)  # True
+  ```
+
+  If the new data has a different version than our object (for cards that's the
+  `version` field, for folders and boards it's `lastModified`), the existing object
+  is updated in place with the new data. This replaces any changes you've made to
+  the object but haven't saved yet, so save your changes before loading the same
+  card, folder, or board again. Attributes you added yourself are kept. Partial
+  data without a version (like the id-only cards on a large board) never replaces
+  an object we already have the full data for.
+
+  Objects are held with weak references so the map doesn't keep anything alive,
+  once you're done with an object it can be garbage collected like normal.
+
+  Cards that are items on a board, section, or folder also go through the map but
+  there's one object per placement, because their `item_id` is specific to where
+  they appear. Loading the same board again gives you back the same card objects.
+  """
+
+  def __init__(self):
+    self.__objects = weakref.WeakValueDictionary()
+    self.__lock = threading.Lock()
+    self.hits = 0
+    self.refreshes = 0
+
+  def __len__(self):
+    return len(self.__objects)
+
+  def get(self, cls, id, item_id=None):
+    """Returns the object of this type with this ID (and item ID, for cards on a board or folder) if we have one, otherwise None."""
+    return self.__objects.get((cls.__name__, id, item_id))
+
+  def load(self, cls, data, *args, **kwargs):
+    """
+    Returns the object for this data. If we already have one for its ID we return
+    that (updating it first if its version is different), otherwise we create it
+    by calling `cls(data, *args, **kwargs)`.
+    """
+    id = data.get("id") if data else None
+    if not id:
+      return cls(data, *args, **kwargs)
+
+    key = (cls.__name__, id, data.get("itemId"))
+    version = data.get("version") or data.get("lastModified")
+    with self.__lock:
+      obj = self.__objects.get(key)
+      if obj is not None:
+        self.hits += 1
+        if not self.__needs_refresh(obj, version):
+          return obj
+
+    # objects are created outside the lock because creating one can load other
+    # objects (e.g. a board loading its cards on other threads).
+    return self.__store(key, cls(data, *args, **kwargs))
+
+  def adopt(self, obj):
+    """
+    Like load() but for an object you already made. Returns the object we have for
+    its ID (updated from `obj` if its version is different), or `obj` if we didn't
+    have one yet.
+    """
+    if not obj.id:
+      return obj
+    return self.__store((type(obj).__name__, obj.id, getattr(obj, "item_id", None)), obj)
+
+  def __store(self, key, new_obj):
+    """
+    internal:
+    Keeps new_obj for this key, or if we already have an object for it, copies
+    new_obj's state onto that one while holding the lock, so two threads
+    refreshing the same object can't interleave.
+    """
+    with self.__lock:
+      obj = self.__objects.get(key)
+      if obj is None or obj is new_obj:
+        self.__objects[key] = new_obj
+        return new_obj
+
+      if self.__needs_refresh(obj, self.__get_version(new_obj)):
+        self.refreshes += 1
+        copy_object_state(new_obj, obj)
+      return obj
+
+  def __get_version(self, obj):
+    """internal"""
+    return getattr(obj, "version", None) or getattr(obj, "last_modified", None)
+
+  def __needs_refresh(self, obj, version):
+    """internal"""
+    current_version = self.__get_version(obj)
+    if version is None:
+      return current_version is None
+    return version != current_version
+
+  def delete(self, cls, id):
+    """Removes the object of this type with this ID, including its copies on boards and folders."""
+    with self.__lock:
+      for key in list(self.__objects.keys()):
+        if key[:2] == (cls.__name__, id):
+          self.__objects.pop(key, None)
+
+  def clear(self):
+    with self.__lock:
+      self.__objects.clear()
@@ -11,6 +11,7 @@ import requests
 import mimetypes
 
 from requests.auth import HTTPBasicAuth
+from concurrent.futures import ThreadPoolExecutor
 
 if sys.version_info.major >= 3:
   from urllib.parse import quote
@@ -18,6 +19,10 @@ else:
   from urlparse import quote
 
 from guru.bundle import Bundle
+from guru.bulkop import BulkOperation, BulkOperationTracker
+from guru.cache import CachedResponse, DiskCache, IdentityMap, ResponseCache, SingleFlight, get_validators
+from guru.metrics import Metrics, RequestInfo, url_template
+from guru.tags import TagRegistry
 from guru.data_objects import (
   Board,
   BoardGroup, 
@@ -37,7 +42,22 @@ from guru.data_objects import (
   TeamStats, 
   ReviewedAnswer
 )
-from guru.util import clean_slug, download_file, find_by_name_or_id, find_by_email, find_by_id, format_timestamp, TRACKING_HEADERS
+from guru.util import (
+  clean_slug,
+  download_file,
+  find_by_name_or_id,
+  find_by_email,
+  find_by_id,
+  LookupIndex,
+  format_timestamp,
+  json_dumps,
+  json_loads,
+  make_session,
+  RetryPolicy,
+  DEFAULT_POOL_CONNECTIONS,
+  DEFAULT_POOL_MAXSIZE,
+  TRACKING_HEADERS
+)
 
 # collection colors
 # many of the names come from http://chir.ag/projects/name-that-color/
@@ -58,6 +78,12 @@ READ_ONLY = "MEMBER"
 AUTHOR = "AUTHOR"
 COLLECTION_OWNER = "COLL_ADMIN"
 
+# the most card IDs the /cards/bulk endpoint takes in one call.
+BULK_CARD_LIMIT = 50
+
+# the /cards/bulk errors that might be caused by one card ID, so we retry in smaller batches.
+SPLITTABLE_BATCH_STATUSES = (400, 404, 422)
+
 TRUSTED = "TRUSTED"
 VERIFIED = TRUSTED
 NEEDS_VERIFICATION = "NEEDS_VERIFICATION"
@@ -150,6 +176,29 @@ def parse_expression(values, type, key):
   return expression
 
 
+class PaginationError(Exception):
+  """
+  Raised when we're loading a paginated list and one of the pages fails
+  even after retrying. The pages that did load aren't thrown away, they're
+  available as `results`, and `url` is the page that failed so you can tell
+  where the list was cut short.
+  """
+
+  def __init__(self, response, url, results):
+    super().__init__("error response", response)
+    self.response = response
+    self.url = url
+    self.results = results
+
+
+def rewind_files(files):
+  """internal: moves file objects we're uploading back to the start so they can be sent again."""
+  for value in (files or {}).values():
+    file_obj = value[1] if isinstance(value, tuple) else value
+    if hasattr(file_obj, "seek"):
+      file_obj.seek(0)
+
+
 class DummyResponse:
   def __init__(self, status_code=200):
     self.headers = {}
@@ -174,7 +223,9 @@ class Guru:
   to the `Guru()` constructor.
   """
 
-  def __init__(self, username="", api_token="", silent=False, dry_run=False, qa=False):
+  def __init__(self, username="", api_token="", silent=False, dry_run=False, qa=False,
+               pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE, pool_block=False,
+               retry=True, rate_limiter=None, response_cache=None, disk_cache=None, identity_map=False):
     self.username = username or os.environ.get(
         "PYGURU_USER", "") or os.environ.get("GURU_USER", "")
     self.api_token = api_token or os.environ.get(
@@ -182,8 +233,57 @@ class Guru:
 
     self.base_url = "https://qaapi.getguru.com/api/v1" if qa else "https://api.getguru.com/api/v1"
     self.hostname = "qaapi.getguru.com" if qa else "api.getguru.com"
+    # content uploads go to the app's routes rather than the /api/v1 ones.
+    self.app_url = "https://%s/app" % self.hostname
     self.dry_run = dry_run
-    self.__cache = {}
+    self.__auth = None
+
+    # responses are cached as parsed JSON, with LRU eviction and per-endpoint ttls.
+    self.response_cache = response_cache if response_cache is not None else ResponseCache()
+
+    # this is optional, it's a DiskCache (or the path of one) that keeps responses between runs.
+    self.__owns_disk_cache = isinstance(disk_cache, str)
+    if self.__owns_disk_cache:
+      disk_cache = DiskCache(disk_cache)
+    self.disk_cache = disk_cache
+
+    # concurrent identical GET calls share one request.
+    self.__in_flight = SingleFlight()
+
+    # this is optional, it can be True or an IdentityMap and makes repeated loads of the
+    # same card, folder, or board return the same object.
+    # (an empty IdentityMap is falsy so we check for one explicitly.)
+    if isinstance(identity_map, IdentityMap):
+      self.identity_map = identity_map
+    else:
+      self.identity_map = IdentityMap() if identity_map else None
+
+    # the team's tags are loaded once and kept up to date as we add, delete, and merge them.
+    self.tag_registry = TagRegistry(self.__load_tag_categories)
+
+    # asynchronous bulk operations (moves, restores, etc.) are polled from one background thread.
+    self.bulk_operations = BulkOperationTracker(self.__poll_bulkop)
+
+    # all calls made by this object share one session so connections are pooled and
+    # kept alive. the session doesn't hold our credentials because it's also shared
+    # with the bundle's http helpers, which make calls to other hosts.
+    self.session = make_session(pool_connections, pool_maxsize, pool_block)
+
+    # retry can be a RetryPolicy, True to use the default policy, or False to never retry.
+    if retry is True:
+      self.retry = RetryPolicy()
+    else:
+      self.retry = retry or None
+
+    # this is optional, it's a RateLimiter that can be shared with other Guru objects.
+    self.rate_limiter = rate_limiter
+
+    # hooks are called before and after each call we make, the metrics
+    # object is one of them and counts calls per endpoint.
+    self.__request_hooks = []
+    self.__response_hooks = []
+    self.metrics = Metrics()
+    self.on_response(self.metrics.record)
 
     if self.dry_run:
       self.debug = True
@@ -192,6 +292,81 @@ class Guru:
     else:
       self.debug = True
 
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+
+  def close(self):
+    """
+    Closes the connections this object has open. You can also use the
+    Guru object as a context manager to have this done automatically:
+
+    ```
+    with guru.Guru() as g:
+      for card in g.find_cards(collection="General"):
+        print(card.title)
+    ```
+    """
+    self.session.close()
+    if self.__owns_disk_cache:
+      self.disk_cache.close()
+
+  def on_request(self, callback):
+    """
+    Adds a function that's called before each API call is made. It's passed
+    a RequestInfo object with the call's method, url, and endpoint.
+
+    Args:
+      callback (function): The function to call.
+
+    Returns:
+      function: The same function, so you can use this as a decorator.
+    """
+    self.__request_hooks.append(callback)
+    return callback
+
+  def on_response(self, callback):
+    """
+    Adds a function that's called after each API call is done, including any
+    retries. It's passed a RequestInfo object with the call's method, url,
+    endpoint, status code, number of bytes, latency, and retry count:
+
+    ```
+    @g.on_response
+    def log_slow_calls(info):
+      if info.latency > 1:
+        print("%s took %.1f seconds" % (info.key, info.latency))
+    ```
+
+    Args:
+      callback (function): The function to call.
+
+    Returns:
+      function: The same function, so you can use this as a decorator.
+    """
+    self.__response_hooks.append(callback)
+    return callback
+
+  def stats(self):
+    """
+    Returns a snapshot of the calls this object has made. "endpoints" has the
+    counts and latency histograms for each endpoint (see Metrics.snapshot), "cache"
+    has the response cache's stats, and "coalesced" is the number of calls that
+    were saved because an identical call was already in progress.
+
+    ```
+    for endpoint, stats in g.stats()["endpoints"].items():
+      print(endpoint, stats["calls"], stats["total_time"])
+    ```
+    """
+    return {
+        "endpoints": self.metrics.snapshot(),
+        "cache": self.response_cache.stats(),
+        "coalesced": self.__in_flight.shared
+    }
+
   def __is_id(self, value):
     """internal"""
     if re.match("[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", str(value)):
@@ -205,7 +380,10 @@ class Guru:
 
   def __get_auth(self):
     """internal"""
-    return HTTPBasicAuth(self.username, self.api_token)
+    # we only rebuild the auth object if the credentials have changed.
+    if not self.__auth or self.__auth.username != self.username or self.__auth.password != self.api_token:
+      self.__auth = HTTPBasicAuth(self.username, self.api_token)
+    return self.__auth
 
   def __get_basic_auth_value(self):
     auth_string = "%s:%s" % (self.username, self.api_token)
@@ -229,28 +407,191 @@ class Guru:
 
   def __clear_cache(self, url):
     """internal"""
-    if self.__cache.get(url):
-      del self.__cache[url]
+    self.response_cache.delete(url)
+    if self.disk_cache is not None:
+      self.disk_cache.delete(self.__get_identity(), url)
+
+  def __get_index(self, response, make):
+    """
+    internal:
+    Returns a LookupIndex of make(item) for each item in the response. The index is kept
+    on the response, so a cached response is only indexed once and the index goes away
+    when the cache entry does. `response` can also be a list of items we didn't cache.
+    """
+    if isinstance(response, list):
+      return LookupIndex([make(item) for item in response])
+    if not isinstance(response, CachedResponse):
+      return LookupIndex([make(item) for item in response.json()])
+
+    if response.index is None:
+      response.index = LookupIndex([make(item) for item in response.json()])
+    return response.index
 
-  def __get(self, url, cache=False):
+  def __make(self, cls, data, **kwargs):
+    """internal: creates a Card, Folder, or Board, or reuses ours from the identity map."""
+    if self.identity_map is None:
+      return cls(data, guru=self, **kwargs)
+    return self.identity_map.load(cls, data, guru=self, **kwargs)
+
+  def __get_identity(self):
     """internal"""
-    if cache:
-      # if we don't have a response for this call in our cache,
-      # make the call and store the response.
-      if not self.__cache.get(url):
-        self.__log(make_gray("  making a get call:", url))
-        self.__cache[url] = requests.get(
-            url, auth=self.__get_auth(), headers=TRACKING_HEADERS)
+    return DiskCache.make_identity(self.username, self.api_token)
+
+  def __to_cached_response(self, url, response, store=True):
+    """
+    internal:
+    Swaps a successful response for a CachedResponse, which holds just the
+    JSON body, so we can keep it in the cache.
+    """
+    if not status_to_bool(response.status_code):
+      return response
+
+    if response.status_code == 204 or not response.content:
+      data = None
+    else:
+      try:
+        data = json_loads(response.content)
+      except ValueError:
+        return response
+
+    cached_response = CachedResponse(
+        response.status_code, response.headers, data, url=url, size=len(response.content),
+        content=response.content if data is not None else b"")
+    if store:
+      self.response_cache.set(url, cached_response, size=cached_response.size)
+    return cached_response
+
+  def __request(self, method, url, idempotent=None, headers=None, **kwargs):
+    """internal"""
+    # we encode JSON bodies ourselves so they go through the faster encoder.
+    body = kwargs.pop("json", None)
+    if body is not None:
+      kwargs["data"] = json_dumps(body)
+      headers = dict(headers or {}, **{"Content-Type": "application/json"})
+
+    if headers:
+      headers = dict(TRACKING_HEADERS, **headers)
+    else:
+      headers = TRACKING_HEADERS
+
+    if idempotent is None:
+      idempotent = method in ("GET", "PUT", "DELETE")
+
+    info = RequestInfo(method, url, url_template(url, self.base_url))
+    for callback in self.__request_hooks:
+      callback(info)
+
+    start = time.monotonic()
+    try:
+      response = self.__send(method, url, info, idempotent, headers, **kwargs)
+    except Exception as e:
+      info.error = e
+      raise
+    else:
+      if response is not None:
+        info.status_code = response.status_code
+        info.bytes = len(response.content or b"")
+    finally:
+      info.latency = time.monotonic() - start
+      for callback in self.__response_hooks:
+        callback(info)
+    return response
+
+  def __send(self, method, url, info, idempotent, headers, **kwargs):
+    """internal: makes the call, retrying it based on our retry policy."""
+    is_read = method == "GET" or (method == "POST" and idempotent)
+
+    attempt = 0
+    waited = 0
+    while True:
+      if self.rate_limiter:
+        self.rate_limiter.acquire(is_read)
+
+      try:
+        response = self.session.request(
+            method, url, auth=self.__get_auth(), headers=headers, **kwargs)
+        status_code = response.status_code
+      except requests.exceptions.ConnectionError:
+        if not self.retry or not self.retry.should_retry(attempt, None, idempotent):
+          raise
+        response = None
+        status_code = None
+
+      if not self.retry or not self.retry.should_retry(attempt, status_code, idempotent):
+        return response
+
+      # stop once waiting again would put us over the total budget for this call.
+      wait = self.retry.get_wait(attempt, response)
+      if waited + wait > self.retry.max_total_wait:
+        if response is None:
+          raise requests.exceptions.ConnectionError("gave up on %s %s after %s attempts" % (method, url, attempt + 1))
+        return response
+
+      self.__log(make_gray("  got a %s response, retrying in %.1f seconds" % (status_code or "connection error", wait)))
+      if self.rate_limiter and status_code == 429:
+        # pausing the limiter makes everyone sharing it back off, including us
+        # since the next acquire() call is what waits.
+        self.rate_limiter.pause(is_read, wait)
       else:
+        time.sleep(wait)
+      waited += wait
+      attempt += 1
+      info.retries = attempt
+      rewind_files(kwargs.get("files"))
+
+  def __get(self, url, cache=False, store=True):
+    """internal"""
+    # responses are only kept in the cache when you ask for cached data.
+    # store=False skips the in-memory cache entirely, that's for pages that
+    # are cached as one combined list.
+    store = store and cache
+    if store:
+      cached_response = self.response_cache.get(url)
+      if cached_response is not None:
         self.__log(make_gray("  using cached get call:", url))
-      return self.__cache[url]
+        return cached_response
+
+    # if another thread is already loading this url we wait for its response
+    # rather than making the same call again.
+    return self.__in_flight.do(("get", url, cache, store), lambda: self.__load(url, cache, store))
+
+  def __load(self, url, cache=False, store=True):
+    """internal"""
+    # with a disk cache, a fresh entry is used as-is when you ask for cached
+    # data and otherwise we check that our copy is still current.
+    entry = None
+    if self.disk_cache is not None:
+      entry = self.disk_cache.get(self.__get_identity(), url)
+      if entry and cache and entry.is_fresh():
+        self.__log(make_gray("  using disk cached get call:", url))
+        return self.__use_disk_entry(entry, store)
+
+    headers = entry.get_validators() if entry else {}
+    if headers:
+      self.__log(make_gray("  making a conditional get call:", url))
     else:
       self.__log(make_gray("  making a get call:", url))
-      response = requests.get(
-          url, auth=self.__get_auth(), headers=TRACKING_HEADERS)
-      self.__cache[url] = response
-      self.__log_response(response)
-      return response
+    response = self.__request("GET", url, headers=headers)
+    self.__log_response(response)
+
+    if entry and headers and response.status_code == 304:
+      self.disk_cache.refresh(self.__get_identity(), url)
+      return self.__use_disk_entry(entry, store)
+
+    # a response we can't revalidate is only used again when you ask for
+    # cached data, so that's the only time it's worth writing to disk.
+    cached_response = self.__to_cached_response(url, response, store)
+    if (self.disk_cache is not None and isinstance(cached_response, CachedResponse)
+        and (cache or get_validators(cached_response.headers))):
+      self.disk_cache.set(self.__get_identity(), url, cached_response)
+    return cached_response
+
+  def __use_disk_entry(self, entry, store=True):
+    """internal"""
+    cached_response = entry.to_response()
+    if store:
+      self.response_cache.set(entry.url, cached_response, size=cached_response.size)
+    return cached_response
 
   def __put(self, url, data=None):
     """internal"""
@@ -259,8 +600,7 @@ class Guru:
       return DummyResponse()
 
     self.__log(make_gray("  making a put call:", url, data))
-    response = requests.put(
-        url, json=data, auth=self.__get_auth(), headers=TRACKING_HEADERS)
+    response = self.__request("PUT", url, json=data)
     self.__log_response(response)
     return response
 
@@ -271,8 +611,7 @@ class Guru:
       return DummyResponse()
 
     self.__log(make_gray("  making a patch call:", url, data))
-    response = requests.patch(
-        url, json=data, auth=self.__get_auth(), headers=TRACKING_HEADERS)
+    response = self.__request("PATCH", url, json=data)
     self.__log_response(response)
     return response
 
@@ -284,54 +623,117 @@ class Guru:
 
     self.__log(make_gray("  making a post call:", url, data))
     if files:
-      response = requests.post(
-          url, files=files, auth=self.__get_auth(), headers=TRACKING_HEADERS)
+      response = self.__request("POST", url, files=files)
       self.__log_response(response)
       return response
     else:
-      response = requests.post(
-          url, json=data, auth=self.__get_auth(), headers=TRACKING_HEADERS)
+      response = self.__request(
+          "POST", url, idempotent=is_really_get, json=data)
       self.__log_response(response)
+
+      # posts that load data, like searches, are parsed the same way as gets.
+      if is_really_get:
+        return self.__to_cached_response(url, response, store=False)
       return response
 
   def __get_and_get_all(self, url, cache=False, max_pages=500):
     """internal"""
-    if cache and self.__cache.get(url):
-      self.__log(make_gray("  using cached get call:", url))
-      return self.__cache[url]
+    response = self.__get_all_response(url, cache, max_pages)
+    return response.json() if isinstance(response, CachedResponse) else response
+
+  def __get_all_response(self, url, cache=False, max_pages=500):
+    """
+    internal:
+    Returns the cached CachedResponse for the combined list if there is one,
+    otherwise loads every page and returns the list.
+    """
+    if cache:
+      cached_response = self.response_cache.get(url)
+      if cached_response is not None:
+        self.__log(make_gray("  using cached get call:", url))
+        return cached_response
 
+    return self.__in_flight.do(
+        ("get_all", url, cache, max_pages), lambda: self.__load_all(url, cache, max_pages))
+
+  def __load_all(self, url, cache=False, max_pages=500):
+    """internal"""
     original_url = url
     results = []
-    auth = self.__get_auth()
+    size = 0
     page = 0
 
+    # each page is retried on its own, so if a page is rate limited we keep
+    # the pages we already have and pick up from the page that failed.
     while url:
       page += 1
       self.__log("loading page:", page)
-      response = self.__get(url)
+      response = self.__get(url, cache=cache, store=False)
       if status_to_bool(response.status_code):
         if response.status_code != 204:
           results += response.json()
+          size += response.size
       else:
-        raise BaseException("error response", response)
+        raise PaginationError(response, url, results)
       url = get_link_header(response)
 
       if page >= max_pages:
         break
 
-    self.__cache[original_url] = results
+    # we cache the combined list, not the individual pages. the list is only
+    # encoded for the cache when you asked for caching.
+    if cache:
+      self.response_cache.set(
+          original_url, CachedResponse(200, {}, results, url=original_url, size=size), size=size)
     return results
 
+  def __iter_pages(self, url, data=None, max_pages=None):
+    """
+    internal:
+    Yields the results from each page of a GET call, or a POST if there's data.
+    While the caller works through one page the next one is loaded on a
+    background thread, so only two pages are in memory at once.
+    """
+    def load_page(url):
+      if data is None:
+        return self.__get(url, store=False)
+      return self.__post(url, data, is_really_get=True)
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+      page = 1
+      self.__log("loading page:", page)
+      next_page = executor.submit(load_page, url)
+      while next_page:
+        response = next_page.result()
+        if not status_to_bool(response.status_code):
+          raise PaginationError(response, url, [])
+
+        url = get_link_header(response)
+        if url and (not max_pages or page < max_pages):
+          page += 1
+          self.__log("loading page:", page)
+          next_page = executor.submit(load_page, url)
+        else:
+          next_page = None
+
+        if response.status_code != 204:
+          yield response.json()
+    finally:
+      # if the caller stops early we don't wait for the page that's loading.
+      executor.shutdown(wait=False)
+
   def __post_and_get_all(self, url, data):
     """internal"""
     results = []
-    auth = self.__get_auth()
     page = 0
 
     while url:
       page += 1
       self.__log("loading page:", page)
       response = self.__post(url, data, is_really_get=True)
+      if not status_to_bool(response.status_code):
+        raise PaginationError(response, url, results)
       if response.status_code != 204:
         results += response.json()
       url = get_link_header(response)
@@ -345,7 +747,7 @@ class Guru:
       return DummyResponse(204)
 
     self.__log(make_gray("  making a delete call:", url, data))
-    response = requests.delete(url, json=data, auth=self.__get_auth())
+    response = self.__request("DELETE", url, json=data)
     self.__log_response(response)
     return response
 
@@ -400,7 +802,9 @@ class Guru:
     else:
       # we compare the name and ID because you can pass either.
       # and if the names aren't unique, you'll need to pass an ID.
-      return find_by_name_or_id(self.get_frameworks(cache), framework)
+      url = "%s/frameworks" % self.base_url
+      frameworks = self.__get_index(self.__get(url, cache), lambda f: Framework(f, guru=self))
+      return frameworks.find(framework)
 
   def import_framework(self, framework):
     """
@@ -457,7 +861,9 @@ class Guru:
     else:
       # we compare the name and ID because you can pass either.
       # and if the names aren't unique, you'll need to pass an ID.
-      return find_by_name_or_id(self.get_collections(cache), collection)
+      url = "%s/collections" % self.base_url
+      collections = self.__get_index(self.__get(url, cache), lambda c: Collection(c, guru=self))
+      return collections.find(collection)
 
   def get_collections(self, cache=False):
     """
@@ -672,8 +1078,7 @@ class Guru:
 
       # there's a slightly different url for syncs vs. imports.
       route = "contentsyncupload" if is_sync else "contentupload"
-      url = "https://%s/app/%s?collectionId=%s" % (
-          self.hostname, route, collection_obj.id)
+      url = "%s/%s?collectionId=%s" % (self.app_url, route, collection_obj.id)
       response = self.__post(url, files=files)
 
       if not status_to_bool(response.status_code):
@@ -706,8 +1111,9 @@ class Guru:
     if isinstance(group, Group):
       return group
 
-    groups = self.get_groups(cache)
-    return find_by_name_or_id(groups, group)
+    url = "%s/groups" % self.base_url
+    groups = self.__get_index(self.__get(url, cache), lambda g: Group(g, guru=self))
+    return groups.find(group)
 
   def get_groups(self, cache=False):
     """
@@ -835,6 +1241,19 @@ class Guru:
     users = [User(u) for u in users]
     return users
 
+  def iter_members(self, search=""):
+    """
+    Like get_members() but this yields users one page at a time instead of
+    loading the whole list first. The next page is loaded in the background.
+
+    Args:
+            search (str, optional): A text string to search for, same as get_members().
+    """
+    url = "%s/members?search=%s" % (self.base_url, quote(search))
+    for page in self.__iter_pages(url):
+      for user in page:
+        yield User(user)
+
   def __invite_user(self, email, *groups, is_light_user=False):
     """
     Internal
@@ -1273,7 +1692,7 @@ class Guru:
     if status_to_bool(response.status_code):
       # todo: figure out why this is inside a 'try'.
       try:
-        return Card(response.json(), guru=self)
+        return self.__make(Card, response.json())
       except:
         return None
     elif is_archived and response.status_code == 404:
@@ -1282,11 +1701,59 @@ class Guru:
       url = "%s/cards/%s" % (self.base_url, card)
       response = self.__get(url)
       try:
-        return Card(response.json(), guru=self)
+        return self.__make(Card, response.json())
       except:
         return None
 
-  def get_cards(self, card_ids):
+  def get_cards(self, card_ids, max_workers=8, return_statuses=False):
+    """
+    Loads any number of cards by ID. The /cards/bulk endpoint takes 50 IDs
+    at a time so the IDs are split into batches of 50 and the batches are
+    loaded in parallel:
+
+    ```
+    card_ids = set(e["properties"]["cardId"] for e in g.get_events(start="2021-03-01"))
+    cards = g.get_cards(card_ids)
+    ```
+
+    If a batch fails, it's split in half and each half is tried again so one
+    bad ID doesn't keep the rest of its batch from loading.
+
+    Args:
+            card_ids (list of str): The IDs of the cards to load.
+            max_workers (int, optional): The most batches to load at once. Defaults to 8.
+            return_statuses (bool, optional): If True, this also returns a dict with the
+                    status of each ID: the status the API gave for the card, "NOT_FOUND"
+                    if it wasn't in the response, or "FAILED" if its batch couldn't be loaded.
+
+    Returns:
+            dict: A dict where the keys are card IDs and the values are Card objects.
+                    If return_statuses is True, this returns a tuple of (cards, statuses).
+    """
+    # remove duplicates but keep the order.
+    card_ids = list(dict.fromkeys(card_ids))
+    batches = [card_ids[index:index + BULK_CARD_LIMIT] for index in range(0, len(card_ids), BULK_CARD_LIMIT)]
+
+    results = {}
+    statuses = {}
+    if len(batches) > 1 and max_workers > 1:
+      with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+        batch_results = list(executor.map(self.__load_card_batch, batches))
+    else:
+      batch_results = [self.__load_card_batch(batch) for batch in batches]
+
+    for batch_cards, batch_statuses in batch_results:
+      results.update(batch_cards)
+      statuses.update(batch_statuses)
+
+    # return the cards in the same order as the IDs we were given.
+    cards = {id: results[id] for id in card_ids if id in results}
+    if return_statuses:
+      return cards, statuses
+    return cards
+
+  def __load_card_batch(self, card_ids):
+    """internal: loads up to 50 cards, returns (cards, statuses)."""
     url = "%s/cards/bulk" % self.base_url
     data = {
         "ids": card_ids
@@ -1298,9 +1765,29 @@ class Guru:
     # is the card object plus a 'status' field, so we convert the
     # nested card objects to instances of the Card class.
     if status_to_bool(response.status_code):
-      return {id: Card(obj) for id, obj in response.json().items()}
-    else:
-      return {}
+      cards = {}
+      statuses = {}
+      for id, obj in (response.json() or {}).items():
+        cards[id] = self.__make(Card, obj)
+        statuses[id] = obj.get("status") or "OK"
+      for id in card_ids:
+        if id not in statuses:
+          statuses[id] = "NOT_FOUND"
+      return cards, statuses
+
+    # auth, rate limit, and server errors would fail for every smaller batch too (and
+    # have already been retried), so splitting the batch would only make more calls.
+    if len(card_ids) == 1 or response.status_code not in SPLITTABLE_BATCH_STATUSES:
+      self.__log(make_red("could not load cards:", ", ".join(card_ids), response.status_code))
+      return {}, {id: "FAILED" for id in card_ids}
+
+    # a 400, 404, or 422 can be caused by a single bad ID so we split the batch to find it.
+    middle = len(card_ids) // 2
+    first_cards, first_statuses = self.__load_card_batch(card_ids[:middle])
+    second_cards, second_statuses = self.__load_card_batch(card_ids[middle:])
+    first_cards.update(second_cards)
+    first_statuses.update(second_statuses)
+    return first_cards, first_statuses
 
   def get_visible_cards(self):
     """
@@ -1338,6 +1825,7 @@ class Guru:
     )
     response = self.__get(url)
     if status_to_bool(response.status_code):
+      # this is an old version so it doesn't go through the identity map.
       return Card(response.json(), guru=self)
 
   def make_card(self, title, content, collection):
@@ -1418,6 +1906,52 @@ class Guru:
     Returns:
             list of Card: The cards that matched the parameters you provided.
     """
+    data = self.__make_card_query(
+        title, tag, collection, author, verified, unverified, created_before, created_after,
+        last_modified_before, last_modified_after, last_modified_by, archived, board_count, share_status
+    )
+    if data is None:
+      return []
+
+    url = "%s/search/cardmgr" % self.base_url
+    cards = self.__post_and_get_all(url, data)
+    return [self.__make(Card, c) for c in cards]
+
+  def iter_cards(
+      self, title="", tag="", collection="", author="", verified=None, unverified=None,
+      created_before=None, created_after=None, last_modified_before=None, last_modified_after=None,
+      last_modified_by=None, archived=False, board_count=None, share_status=None
+  ):
+    """
+    Like find_cards() but this yields cards one page at a time instead of
+    loading them all into a list first, so you can start working with the
+    first cards right away and memory use stays flat on large teams. The
+    next page is loaded in the background while you work through this one.
+
+    ```
+    for card in g.iter_cards(collection="Engineering"):
+            print(card.url)
+    ```
+
+    Takes the same parameters as find_cards().
+    """
+    data = self.__make_card_query(
+        title, tag, collection, author, verified, unverified, created_before, created_after,
+        last_modified_before, last_modified_after, last_modified_by, archived, board_count, share_status
+    )
+    if data is None:
+      return
+
+    url = "%s/search/cardmgr" % self.base_url
+    for page in self.__iter_pages(url, data=data):
+      for card in page:
+        yield self.__make(Card, card)
+
+  def __make_card_query(
+      self, title, tag, collection, author, verified, unverified, created_before, created_after,
+      last_modified_before, last_modified_after, last_modified_by, archived, board_count, share_status
+  ):
+    """internal: builds the /search/cardmgr query, returns None if the query can't match anything."""
     if archived:
       data = {
           "queryType": "archived",
@@ -1452,7 +1986,7 @@ class Guru:
       tag_obj = self.get_tag(tag)
       if not tag_obj:
         self.__log(make_red("could not find tag:", tag))
-        return []
+        return
 
       nested_expressions.append({
           "type": "tag",
@@ -1552,9 +2086,7 @@ class Guru:
           "type": "grouping"
       }
 
-    url = "%s/search/cardmgr" % self.base_url
-    cards = self.__post_and_get_all(url, data)
-    return [Card(c, guru=self) for c in cards]
+    return data
 
   def upload_file(self, filename):
     """
@@ -1628,7 +2160,7 @@ class Guru:
         "true" if keep_verification else "false"
     )
     response = self.__patch(url, data)
-    return Card(response.json()), status_to_bool(response.status_code)
+    return self.__make(Card, response.json()), status_to_bool(response.status_code)
 
   def save_card(self, card, verify=False):
     """
@@ -1652,7 +2184,7 @@ class Guru:
     if self.dry_run:
       return Card({}, guru=self), True
     else:
-      return Card(response.json(), guru=self), status_to_bool(response.status_code)
+      return self.__make(Card, response.json()), status_to_bool(response.status_code)
 
   def verify_card(self, card_obj):
     """
@@ -1752,7 +2284,7 @@ class Guru:
 
     return self.restore_cards(card_obj.id)
 
-  def restore_cards(self, *card_ids, timeout=0):
+  def restore_cards(self, *card_ids, timeout=0, wait=True):
     """
     Restores many archived cards. This is done as a bulk operation
     so this may be faster than making 10 separate calls to restore
@@ -1786,6 +2318,9 @@ class Guru:
             timeout (int, optional): The maximum number of seconds to wait for the bulk
                     operation to complete. By default, there is no timeout and we won't wait
                     for asynchronous bulk operations at all.
+            wait (bool, optional): Set this to False to get a BulkOperation back right away
+                    instead of waiting. You can pass many of these to `wait_for_bulk_operations`
+                    to wait for them all at once. Defaults to True.
 
     Returns:
             bool: True if it was successful and False otherwise.
@@ -1803,16 +2338,7 @@ class Guru:
     url = "%s/cards/bulkop" % self.base_url
     response = self.__post(url, data)
 
-    # if there's a timeout and the operation is being done async, we wait.
-    if timeout and response.status_code == 202:
-      # poll and wait for the bulk operation to finish.
-      bulk_op_id = response.json().get("id")
-      url = "%s/cards/bulkop/%s" % (self.base_url, bulk_op_id)
-      return self.__wait_for_bulkop(url, timeout)
-    else:
-      # todo: make this return a more detailed status since the operation can
-      #       succeed for some cards and fail for others.
-      return status_to_bool(response.status_code)
+    return self.__finish_bulkop(response, "%s/cards/bulkop/%%s" % self.base_url, timeout, wait)
 
   def archive_card(self, card):
     """
@@ -2002,7 +2528,8 @@ class Guru:
 
   def get_tag(self, tag, cache=False):
     """
-    Gets a tag.
+    Gets a tag. This uses `g.tag_registry` so the team's tags are only loaded
+    the first time you look one up (or when a tag isn't found, in case it's new).
 
     Args:
             tag (str): The tag's ID or text value (without the leading "#").
@@ -2016,17 +2543,15 @@ class Guru:
     if isinstance(tag, Tag):
       return tag
 
-    tags = self.get_tags(cache=cache)
-    for t in tags:
-      if t.value.lower() == tag.lower() or t.id.lower() == tag.lower():
-        return t
+    return self.tag_registry.get(tag)
 
   def get_team_id(self, cache=True):
     url = "%s/whoami" % self.base_url
     response = self.__get(url, cache=cache)
     return response.json().get("team", {}).get("id")
 
-  def get_tags(self, cache=False):
+  def __load_tag_categories(self):
+    """internal"""
     # https://api.getguru.com/api/v1/teams/014dc5f6-9488-43fe-a892-206d276a7a9c/tagcategories/
     url = "%s/teams/%s/tagcategories" % (self.base_url, self.get_team_id())
 
@@ -2037,19 +2562,52 @@ class Guru:
     #     "id": "abcd1234",
     #     "name": "category"
     #   }
-    response = self.__get(url, cache=cache)
+    return self.__get(url).json()
 
-    tags = []
-    for tag_category in response.json():
-      tags += [Tag(t) for t in tag_category.get("tags", [])]
-    return tags
+  def get_tags(self, cache=False):
+    """
+    Loads the list of all tags in all tag categories.
+
+    Args:
+            cache (bool, optional): If True, this uses the tags we already loaded, otherwise
+                    it loads them again. Defaults to False.
+
+    Returns:
+            list of Tag: All of the team's tags.
+    """
+    if not cache or not self.tag_registry.is_loaded:
+      self.tag_registry.load()
+    return self.tag_registry.get_tags()
+
+  def get_tags_by_value(self, *tags, create=False):
+    """
+    Looks up any number of tags at once. The team's tags are loaded at most
+    once, so this is much faster than calling get_tag() for each one:
+
+    ```
+    tags = g.get_tags_by_value("onboarding", "case study", "faq", create=True)
+    ```
+
+    Args:
+            *tags (str): Any number of tag values (without the leading "#") or IDs.
+            create (bool, optional): If True, tags that don't exist yet are created. Defaults to False.
+
+    Returns:
+            dict: The keys are the values you passed in and the values are Tag
+                    objects, or None if the tag wasn't found (and wasn't created).
+    """
+    result = self.tag_registry.resolve(tags)
+    missing = [tag for tag, tag_object in result.items() if not tag_object]
+    if create and missing:
+      with ThreadPoolExecutor(max_workers=min(len(missing), 4)) as executor:
+        for tag, tag_object in zip(missing, executor.map(self.make_tag, missing)):
+          result[tag] = tag_object
+    return result
 
   def get_tag_category_id(self, category="Tags"):
-    url = "%s/teams/%s/tagcategories" % (self.base_url, self.get_team_id())
-    response = self.__get(url, cache=True)
-    for tag_category in response.json():
-      if tag_category["name"].lower() == category.lower():
-        return tag_category.get("id")
+    tag_category = self.tag_registry.get_category(category)
+    if tag_category:
+      return tag_category.get("id")
 
   def get_tag_category(self, category="Tags"):
     url = "%s/teams/%s/tagcategories" % (self.base_url, self.get_team_id())
@@ -2080,7 +2638,13 @@ class Guru:
     url = "%s/teams/%s/tagcategories/tags" % (
         self.base_url, self.get_team_id())
     response = self.__post(url, data)
-    return Tag(response.json())
+    if not status_to_bool(response.status_code):
+      self.__log(make_red("could not create tag:", tag, response.status_code))
+      return
+
+    tag = Tag(response.json())
+    self.tag_registry.add(tag, data["categoryId"])
+    return tag
 
   def delete_tag(self, tag):
     """
@@ -2102,6 +2666,8 @@ class Guru:
         }
     }
     response = self.__post(url, data)
+    if status_to_bool(response.status_code):
+      self.tag_registry.remove(tag_object)
     return status_to_bool(response.status_code)
 
   def merge_tags(self, *tags):
@@ -2115,9 +2681,11 @@ class Guru:
     Returns:
             bool: True if it was successful and False otherwise.
     """
+    # all of the tags are resolved at once so the tag list is loaded at most once.
+    tag_lookup = self.tag_registry.resolve(tags)
     tag_objects = []
     for tag in tags:
-      tag_object = self.get_tag(tag)
+      tag_object = tag_lookup.get(tag)
       if tag_object:
         tag_objects.append(tag_object)
       else:
@@ -2135,6 +2703,9 @@ class Guru:
         }
     }
     response = self.__post(url, data)
+    if status_to_bool(response.status_code):
+      for tag_object in tag_objects[1:]:
+        self.tag_registry.remove(tag_object)
     return status_to_bool(response.status_code)
 
   def add_tag_to_card(self, tag, card, create=False):
@@ -2207,12 +2778,125 @@ class Guru:
     response = self.__delete(url)
     return status_to_bool(response.status_code)
 
-  def get_board(self, board, collection=None, board_group=None, cache=True):
+  def bulk_tag(self, cards, add=(), remove=(), create=False, max_workers=8):
+    """
+    Adds and removes tags on many cards at once:
+
+    ```
+    cards = g.find_cards(collection="Engineering")
+    results = g.bulk_tag(cards, add=["needs review"], remove=["draft"], create=True)
+    ```
+
+    The tags are looked up once, cards that already have a tag we're adding (or
+    don't have a tag we're removing) are skipped based on `card.tags`, and the
+    changes are made in parallel. Each Card object's `tags` list is updated for
+    the changes that worked.
+
+    Args:
+            cards (list of str or Card): Card objects, or card IDs or slugs which will be loaded.
+            add (list of str or Tag, optional): The tags to add to each card.
+            remove (list of str or Tag, optional): The tags to remove from each card.
+            create (bool, optional): If True, tags we're adding that don't exist yet are created.
+                    Defaults to False.
+            max_workers (int, optional): The most changes to make at once. Defaults to 8.
+
+    Returns:
+            dict: The keys are card IDs and each value is a dict with lists of the tag values
+                    that were "added", "removed", "skipped", and "failed". Cards that couldn't
+                    be found are reported under the value you passed in with a "failed" of None.
+    """
+    results = {}
+    card_objects = self.__resolve_cards(cards, results)
+
+    # resolve all the tags up front, each of these is one call at most.
+    add_lookup = self.get_tags_by_value(*add, create=create) if add else {}
+    remove_lookup = self.tag_registry.resolve(remove) if remove else {}
+    # tags that weren't found (or couldn't be created) are reported as failures for every card.
+    unknown_tags = []
+    for tag, tag_object in list(add_lookup.items()) + list(remove_lookup.items()):
+      if not tag_object or not tag_object.id:
+        self.__log(make_red("could not find tag:", tag))
+        unknown_tags.append(tag.value if isinstance(tag, Tag) else tag)
+
+    def unique_tags(lookup):
+      tags = {}
+      for tag_object in lookup.values():
+        if tag_object and tag_object.id:
+          tags.setdefault(tag_object.id, tag_object)
+      return list(tags.values())
+
+    add_tags = unique_tags(add_lookup)
+    remove_tags = unique_tags(remove_lookup)
+
+    # figure out which calls we need to make. a card that's passed in twice is only changed once.
+    changes = []
+    for card in card_objects:
+      if card.id in results:
+        continue
+      result = results[card.id] = {"added": [], "removed": [], "skipped": [], "failed": list(unknown_tags)}
+      card_tag_ids = set(t.id for t in card.tags)
+      for tag in add_tags:
+        if tag.id in card_tag_ids:
+          result["skipped"].append(tag.value)
+        else:
+          changes.append((card, tag, True))
+      for tag in remove_tags:
+        if tag.id in card_tag_ids:
+          changes.append((card, tag, False))
+        else:
+          result["skipped"].append(tag.value)
+
+    def make_change(change):
+      card, tag, is_add = change
+      url = "%s/cards/%s/tags/%s" % (self.base_url, card.id, tag.id)
+      response = self.__put(url) if is_add else self.__delete(url)
+      return status_to_bool(response.status_code)
+
+    if changes:
+      with ThreadPoolExecutor(max_workers=min(max_workers, len(changes))) as executor:
+        outcomes = list(executor.map(make_change, changes))
+    else:
+      outcomes = []
+
+    for (card, tag, is_add), success in zip(changes, outcomes):
+      result = results[card.id]
+      if not success:
+        result["failed"].append(tag.value)
+      elif is_add:
+        result["added"].append(tag.value)
+        card.tags.append(tag)
+      else:
+        result["removed"].append(tag.value)
+        card.tags = [t for t in card.tags if t.id != tag.id]
+
+    return results
+
+  def __resolve_cards(self, cards, results):
+    """internal: turns a list of Cards, IDs, and slugs into Card objects, loading IDs in batches."""
+    card_ids = [c for c in cards if not isinstance(c, Card) and is_uuid(c)]
+    loaded = self.get_cards(card_ids) if card_ids else {}
+
+    card_objects = []
+    for card in cards:
+      card_object = card if isinstance(card, Card) else (loaded.get(card) or self.get_card(card))
+      if card_object:
+        card_objects.append(card_object)
+      else:
+        self.__log(make_red("could not find card:", card))
+        results[card] = {"added": [], "removed": [], "skipped": [], "failed": None}
+    return card_objects
+
+  def get_board(self, board, collection=None, board_group=None, cache=True, lazy=False):
     """
     Loads a board.
 
+    Boards with more than 50 cards come back with only the IDs of the rest of their
+    cards, so we load those cards too. If `lazy` is True, they aren't loaded until
+    you first use the board's items, cards, or sections.
+
     Args:
             id (str): The board's full ID or slug.
+            lazy (bool, optional): Wait until the board's cards are used to load them. Defaults to False.
 
     Returns:
             Board: An object representing the board.
@@ -2227,22 +2911,28 @@ class Guru:
       url = "%s/boards/%s" % (self.base_url, board)
       response = self.__get(url)
       if status_to_bool(response.status_code):
-        return Board(response.json(), guru=self)
+        return self.__make(Board, response.json(), lazy=lazy)
 
     # todo: use the 'collection' parameter as a way to also filter, in case the same board appears
     #       in more than one collection (board titles still aren't unique within a collection though).
 
     # this returns a list of 'lite' objects that don't have the lists of items on the board.
     # once we find the matching board, then we can make the get call to get the complete object.
-    board_obj = find_by_name_or_id(self.get_boards(
-        collection, board_group, cache), board)
+    if collection and board_group:
+      board_obj = find_by_name_or_id(self.get_boards(collection, board_group, cache), board)
+    else:
+      url = self.__get_list_url("boards", collection)
+      if not url:
+        return
+      boards = self.__get_index(self.__get_all_response(url, cache), lambda b: Board(b, guru=self))
+      board_obj = boards.find(board)
 
     if not board_obj:
       return
 
     url = "%s/boards/%s" % (self.base_url, board_obj.id)
     response = self.__get(url)
-    return Board(response.json(), guru=self)
+    return self.__make(Board, response.json(), lazy=lazy)
 
   def get_folder(self, folder, collection=None, cache=True):
     """
@@ -2265,8 +2955,11 @@ class Guru:
     else:
       # this returns a list of 'lite' objects that don't have the lists of items on the folder.
       # once we find the matching folder, then we can make the get call to get the complete object.
-      folder_id = find_by_name_or_id(
-          self.get_folders(collection, folder, cache), folder)
+      url = self.__get_list_url("folders", collection)
+      if not url:
+        return
+      folders = self.__get_index(self.__get_all_response(url, cache), lambda f: Folder(f, guru=self))
+      folder_id = folders.find(folder)
       # got nothing, get out
       if not folder_id:
         return
@@ -2277,7 +2970,7 @@ class Guru:
     url = "%s/folders/%s" % (self.base_url, folder_id)
     folder_response = self.__get(url)
     if status_to_bool(folder_response.status_code):
-      return Folder(folder_response.json(), guru=self)
+      return self.__make(Folder, folder_response.json())
 
   def get_folder_items(self, folder_id, cache=True, cardDetail="FULL"):
     """
@@ -2304,6 +2997,25 @@ class Guru:
     url = f"{self.base_url}/folders/{folder_id}/items?cardDetail={cardDetail}"
     return self.__get_and_get_all(url, cache)
 
+  def iter_folder_items(self, folder_id, cardDetail="FULL"):
+    """
+      Like get_folder_items() but this yields items one page at a time instead of
+      loading them all first. The next page is loaded in the background.
+
+      Args:
+        folder_id (str): Folder ojbect reference.
+        cardDetail (str): FULL == return all card details; BASIC == return min card details.
+    """
+    if is_id(folder_id):
+      if is_slug(folder_id):
+        folder_id = clean_slug(folder_id)
+    else:
+      raise ValueError("folder_id is not a id or slug '%s'" % folder_id)
+
+    url = f"{self.base_url}/folders/{folder_id}/items?cardDetail={cardDetail}"
+    for page in self.__iter_pages(url):
+      yield from page
+
   def get_folders(self, collection=None, folder=None, cache=False):
     """
     Gets a list of folders you can see. You can optionally filter by collection.
@@ -2317,19 +3029,12 @@ class Guru:
       list of Folder: Either all folders you have access to or all folders within the specified collection.
 
     """
-    # optional filter by collection.
-    if collection:
-      collection_obj = self.get_collection(collection, cache=True)
-      if not collection_obj:
-        self.__log(make_red("could not find collection:", collection))
-        return
-      url = "%s/folders?collection=%s" % (self.base_url,
-                                          collection_obj.id)
-    else:
-      url = "%s/folders" % self.base_url
+    url = self.__get_list_url("folders", collection)
+    if not url:
+      return
 
     folders_response = self.__get_and_get_all(url, cache)
-    return [Folder(f, guru=self) for f in folders_response]
+    return [self.__make(Folder, f) for f in folders_response]
 
   def delete_folder(self, deleteFolder, collection=None, remove_type=None):
     """
@@ -2469,7 +3174,7 @@ class Guru:
     # make the call to create the folder and return a Folder object
     response = self.__post(url, data)
     if status_to_bool(response.status_code):
-      return Folder(response.json(), guru=self)
+      return self.__make(Folder, response.json())
 
   def remove_card_from_folder(self, card, folder):
     """
@@ -2589,7 +3294,7 @@ class Guru:
     # we have a legit Card, make the call to get the folder(s)
     url = f"{self.base_url}/cards/{card_obj.id}/folders"
     response = self.__get_and_get_all(url)
-    return [Folder(f, guru=self) for f in response]
+    return [self.__make(Folder, f) for f in response]
 
   def move_card_to_folder(self, card, source_folder, target_folder):
     """
@@ -2724,7 +3429,7 @@ class Guru:
     url = f"{self.base_url}/folders/{folder_slug}/parent"
     response = self.__get(url)
     if status_to_bool(response.status_code):
-      return Folder(response.json(), guru=self)
+      return self.__make(Folder, response.json())
 
   def get_home_folder(self, collection):
     """
@@ -2746,7 +3451,7 @@ class Guru:
         self.base_url, clean_slug(collection_obj.homeFolderSlug))
     response = self.__get(url)
     if status_to_bool(response.status_code):
-      return Folder(response.json(), guru=self)
+      return self.__make(Folder, response.json())
 
   def get_shared_folder_groups(self, folder):
     """
@@ -2842,7 +3547,7 @@ class Guru:
     response = self.__delete(url)
     return status_to_bool(response.status_code)
 
-  def move_folder_to_collection(self, folder, collection, timeout=0):
+  def move_folder_to_collection(self, folder, collection, timeout=0, wait=True):
     """
     Moves a folder to a different collection.
     Args:
@@ -2855,6 +3560,8 @@ class Guru:
               a folder to a new collection then add it to a folder group there. By default this is
               0 so it doesn't wait. If you set a timeout of 10, we'll wait up to 10 seconds to
               see if the move completes.
+      wait (bool, optional): Set this to False to get a BulkOperation back right away instead
+              of waiting. You can pass many of these to `wait_for_bulk_operations`. Defaults to True.
 
     Returns:
       Boolean: True if it was successful and False otherwise. False could mean that there was an error or that you were waiting for the operation to finish and it timed out.
@@ -2888,14 +3595,7 @@ class Guru:
     url = "%s/folders/bulkop" % self.base_url
     response = self.__post(url, data)
 
-    # if there's a timeout and the operation is being done async, we wait.
-    if timeout and response.status_code == 202:
-      # poll and wait for the bulk operation to finish.
-      bulk_op_id = response.json().get("id")
-      url = "%s/folders/bulkop/%s" % (self.base_url, bulk_op_id)
-      return self.__wait_for_bulkop(url, timeout)
-    else:
-      return status_to_bool(response.status_code)
+    return self.__finish_bulkop(response, "%s/folders/bulkop/%%s" % self.base_url, timeout, wait)
 
   def set_item_save_folder(self, folder):
     """
@@ -2953,20 +3653,25 @@ class Guru:
 
       return board_group_obj.items
 
-    # filtering by collection is optional.
-    if collection:
-      collection_obj = self.get_collection(collection, cache=True)
-      if not collection_obj:
-        self.__log(make_red("could not find collection:", collection))
-        return
-      url = "%s/boards?collection=%s" % (self.base_url,
-                                         collection_obj.id)
-    else:
-      url = "%s/boards" % self.base_url
+    url = self.__get_list_url("boards", collection)
+    if not url:
+      return
 
     boards = self.__get_and_get_all(url, cache)
     return [Board(b, guru=self) for b in boards]
 
+  def __get_list_url(self, path, collection=None):
+    """internal: returns the url for listing boards or folders, optionally filtered by collection."""
+    # filtering by collection is optional.
+    if not collection:
+      return "%s/%s" % (self.base_url, path)
+
+    collection_obj = self.get_collection(collection, cache=True)
+    if not collection_obj:
+      self.__log(make_red("could not find collection:", collection))
+      return
+    return "%s/%s?collection=%s" % (self.base_url, path, collection_obj.id)
+
   def get_board_group(self, board_group, collection):
     """
     Loads a board group.
@@ -3428,6 +4133,28 @@ class Guru:
     )
     return self.__get_and_get_all(url, max_pages=max_pages)
 
+  def iter_events(self, start="", end="", max_pages=None):
+    """
+    Like get_events() but this yields events one page at a time instead of
+    loading them all first. The next page is loaded in the background. By
+    default this keeps going until it runs out of pages, pass `max_pages`
+    to stop sooner.
+    """
+    team_id = self.get_team_id()
+    if not team_id:
+      self.__log(
+          make_red("couldn't find your Team ID, are you authenticated?"))
+      return
+
+    url = "%s/teams/%s/analytics?fromDate=%s&toDate=%s" % (
+        self.base_url,
+        team_id,
+        start,
+        end
+    )
+    for page in self.__iter_pages(url, max_pages=max_pages):
+      yield from page
+
   def get_shared_groups(self, board):
     board_obj = self.get_board(board)
     if not board_obj:
@@ -3509,9 +4236,20 @@ class Guru:
     response = self.__delete(url)
     return status_to_bool(response.status_code)
 
-  def move_card_to_collection(self, card, collection, timeout=0):
+  def move_card_to_collection(self, card, collection, timeout=0, wait=True):
     """
     Moves a card from one collection to another.
+
+    Args:
+            card (str or Card): The card's ID or slug, or a Card object.
+            collection (str or Collection): The collection's title or ID, or a Collection object.
+            timeout (int, optional): The number of seconds to wait for the move to finish. By
+                    default this is 0 so it doesn't wait.
+            wait (bool, optional): Set this to False to get a BulkOperation back right away instead
+                    of waiting. You can pass many of these to `wait_for_bulk_operations`. Defaults to True.
+
+    Returns:
+            bool: True if it was successful and False otherwise.
     """
     card_obj = self.get_card(card)
     if not card_obj:
@@ -3547,16 +4285,9 @@ class Guru:
     # we don't return the card but if you passed a Card object in, this'll update it.
     card_obj.collection = collection_obj
 
-    # if there's a timeout and the operation is being done async, we wait.
-    if timeout and response.status_code == 202:
-      # poll and wait for the bulk operation to finish.
-      bulk_op_id = response.json().get("id")
-      url = "%s/cards/bulkop/%s" % (self.base_url, bulk_op_id)
-      return self.__wait_for_bulkop(url, timeout)
-    else:
-      return status_to_bool(response.status_code)
+    return self.__finish_bulkop(response, "%s/cards/bulkop/%%s" % self.base_url, timeout, wait)
 
-  def move_board_to_collection(self, board, collection, timeout=0):
+  def move_board_to_collection(self, board, collection, timeout=0, wait=True):
     """
     Moves a board from one collection to another.
 
@@ -3571,6 +4302,8 @@ class Guru:
                     a board to a new collection then add it to a board group there. By default this is
                     0 so it doesn't wait. If you set a timeout of 10, we'll wait up to 10 seconds to
                     see if the move completes.
+            wait (bool, optional): Set this to False to get a BulkOperation back right away instead
+                    of waiting. You can pass many of these to `wait_for_bulk_operations`. Defaults to True.
 
     Returns:
             bool: True if it was successful and False otherwise. False could mean that there was
@@ -3607,28 +4340,51 @@ class Guru:
     url = "%s/boards/bulkop" % self.base_url
     response = self.__post(url, data)
 
+    return self.__finish_bulkop(response, "%s/boards/bulkop/%%s" % self.base_url, timeout, wait)
+
+  def __poll_bulkop(self, url):
+    """internal"""
+    response = self.__get(url)
+    return response.status_code, response.json() if response.status_code == 200 else None
+
+  def __finish_bulkop(self, response, url, timeout, wait):
+    """internal: waits for a bulk operation or returns its handle, depending on `wait`."""
+    is_async = response.status_code == 202
+    if not wait:
+      if is_async:
+        bulk_op_id = response.json().get("id")
+        return self.bulk_operations.track(url % bulk_op_id, id=bulk_op_id, timeout=timeout or None)
+      return BulkOperation.finished(status_to_bool(response.status_code))
+
     # if there's a timeout and the operation is being done async, we wait.
-    if timeout and response.status_code == 202:
+    if timeout and is_async:
       # poll and wait for the bulk operation to finish.
       bulk_op_id = response.json().get("id")
-      url = "%s/boards/bulkop/%s" % (self.base_url, bulk_op_id)
-      return self.__wait_for_bulkop(url, timeout)
+      return self.bulk_operations.track(url % bulk_op_id, id=bulk_op_id, timeout=timeout).result()
     else:
+      # todo: make this return a more detailed status since the operation can
+      #       succeed for some cards and fail for others.
       return status_to_bool(response.status_code)
 
-  def __wait_for_bulkop(self, url, timeout):
-    elapsed = 0
-    while True:
-      time.sleep(2)
-      response = self.__get(url)
-      if response.status_code == 200:
-        return True
+  def wait_for_bulk_operations(self, operations, timeout=None):
+    """
+    Waits for any number of bulk operations to finish. You get these operations by
+    passing `wait=False` to methods like `move_card_to_collection` or `restore_cards`,
+    which lets you start many operations and wait for them all together:
 
-      elapsed += 2
-      if elapsed >= timeout:
-        break
+    ```
+    ops = [g.move_card_to_collection(card, "Archive", wait=False) for card in cards]
+    results = g.wait_for_bulk_operations(ops, timeout=300)
+    ```
 
-    return False
+    Args:
+            operations (list of BulkOperation): The operations to wait for.
+            timeout (float, optional): The most seconds to wait. Defaults to no limit.
+
+    Returns:
+            list of bool: True for each operation that finished and False for each one that didn't.
+    """
+    return self.bulk_operations.wait(operations, timeout=timeout)
 
   def get_questions(self, type="INBOX", cache=False):
     url = "%s/tasks/questions?filter=%s" % (self.base_url, type)
@@ -3682,7 +4438,8 @@ class Guru:
         "Authorization": self.__get_basic_auth_value()
     }
 
-    status, file_size = download_file(url, filename, headers=headers)
+    status, file_size = download_file(
+        url, filename, headers=headers, session=self.session)
     return status_to_bool(status)
 
   def delete_knowledge_trigger(self, trigger_id):
@@ -1,11 +1,12 @@
 
-import markdown
 import copy
+import markdown
 import re
+import threading
 from urllib.parse import quote
 from bs4 import BeautifulSoup
 
-from guru.util import clean_slug, find_by_name_or_id, find_by_id, compare_datetime_string
+from guru.util import clean_slug, find_by_name_or_id, find_by_id, compare_datetime_string, LookupIndex
 
 
 def find_urls_in_doc(doc):
@@ -47,7 +48,7 @@ class Section:
     self.title = data.get("title")
     self.id = data.get("id")
     self.item_id = data.get("itemId")
-    self.items = [Card(i, guru=guru) for i in data.get("items") or []]
+    self.items = [make_card(i, guru=guru) for i in data.get("items") or []]
 
   def json(self):
     return {
@@ -125,6 +126,77 @@ class TeamStats:
     self.needs_verification_count = team_trust_score.get("needsVerificationCount", 0)
 
 
+class lazy_attribute:
+  """
+  An attribute of a data object that's built from the object's raw data (`self._data`)
+  the first time it's read. For example, a card's owner is only turned into a User
+  object if you use `card.owner`, so loading thousands of cards doesn't create
+  thousands of objects you never look at. These are set like normal attributes.
+
+  Objects only keep the parts of the raw data their lazy attributes need (see
+  `pick_keys`), not the whole dict they were made from.
+
+  The value is kept in a slot with the same name plus a leading underscore, so a
+  class that uses this needs `_<name>` in its `__slots__`. Subclasses inherit their
+  parent's lazy attributes and can add their own.
+  """
+
+  def __init__(self, build):
+    self.build = build
+    self.__doc__ = build.__doc__
+
+  def __set_name__(self, owner, name):
+    self.name = name
+    self.slot = getattr(owner, "_" + name)
+    if "_lazy_attributes" not in owner.__dict__:
+      # start with the lazy attributes of the base classes so a subclass resets those too.
+      inherited = {}
+      for base in reversed(owner.__mro__[1:]):
+        for attribute in base.__dict__.get("_lazy_attributes", []):
+          inherited[attribute.name] = attribute
+      owner._lazy_attributes = list(inherited.values())
+    # a subclass can redefine an attribute it inherited.
+    owner._lazy_attributes = [a for a in owner._lazy_attributes if a.name != name] + [self]
+
+  def __get__(self, obj, owner=None):
+    if obj is None:
+      return self
+    try:
+      return self.slot.__get__(obj, owner)
+    except AttributeError:
+      value = self.build(obj)
+      self.slot.__set__(obj, value)
+      return value
+
+  def __set__(self, obj, value):
+    self.slot.__set__(obj, value)
+
+  def reset(self, obj):
+    try:
+      self.slot.__delete__(obj)
+    except AttributeError:
+      pass
+
+
+def reset_lazy_attributes(obj):
+  """Clears the lazy attributes we already built, this is needed when an object is loaded again with new data."""
+  for attribute in type(obj)._lazy_attributes:
+    attribute.reset(obj)
+
+
+def pick_keys(data, keys):
+  """Returns a new dict with just these keys from `data`, this is the raw data an object keeps for its lazy attributes."""
+  return {key: data[key] for key in keys if key in data}
+
+
+def make_card(data, guru=None):
+  """Makes a Card object, going through the Guru object's identity map if it has one."""
+  identity_map = getattr(guru, "identity_map", None)
+  if identity_map is None:
+    return Card(data, guru=guru)
+  return identity_map.load(Card, data, guru=guru)
+
+
 class Folder:
   """
   The Folder object contains the folder's properties, like title and description,
@@ -143,7 +215,16 @@ class Folder:
   - `folders` is a list of Folder objects for each folder on the folder.
   """
 
+  __slots__ = (
+      "guru", "parent_folder", "last_modified", "title", "description", "slug", "id", "type",
+      "_data", "_collection", "__item_id", "__folder_items", "__has_items", "__items", "__cards",
+      "__folders", "__card_index", "__dict__", "__weakref__"
+  )
+
   def __init__(self, data, folder_items=[], guru=None, parent_folder=None):
+    if hasattr(self, "_data"):
+      reset_lazy_attributes(self)
+    self._data = pick_keys(data, ("collection",))
     self.guru = guru
     self.parent_folder = parent_folder
     self.last_modified = data.get("lastModified")
@@ -156,20 +237,21 @@ class Folder:
     self.__folder_items = folder_items
     self.__has_items = False
 
-    if data.get("collection"):
-      self.collection = Collection(data.get("collection"))
-    else:
-      self.collection = None
-
     # internal arrays to hold contents of the Folder.
     self.__items = []
     self.__cards = []
     self.__folders = []
+    self.__card_index = None
 
     # if folder_items were passed to Folders class, call __get_items to load them. Otherwise items will be lazy loaded when the .folders or .cards method is called.
     if self.__folder_items:
       self.__get_items()
 
+  @lazy_attribute
+  def collection(self):
+    data = self._data.get("collection")
+    return Collection(data) if data else None
+
   @property
   def url(self):
     if self.slug:
@@ -224,6 +306,7 @@ class Folder:
 
     Return: Nothing
     """
+    self.__card_index = None
     if action == "remove" and self.__has_items:
       self.__items.remove(obj)
       if isinstance(obj, Card):
@@ -262,9 +345,10 @@ class Folder:
         self.__items.append(folder)
         self.__folders.append(folder)
       else:
-        card = Card(item, guru=self.guru)
+        card = make_card(item, guru=self.guru)
         self.__items.append(card)
         self.__cards.append(card)
+    self.__card_index = None
 
   def get_card(self, card):
     """
@@ -276,10 +360,10 @@ class Folder:
     if isinstance(card, Card):
       card = card.id
 
-    # Check cards in the Folder
-    card_obj = find_by_name_or_id(self.__cards, card)
-    if card_obj:
-      return card_obj
+    # Check cards in the Folder, the index is rebuilt whenever the list of cards changes.
+    if self.__card_index is None:
+      self.__card_index = LookupIndex(self.__cards)
+    return self.__card_index.find(card)
 
   def get_parent(self):
     """
@@ -378,7 +462,7 @@ class Folder:
     """
     return self.guru.move_folder_to_folder(self, folder)
 
-  def move_to_collection(self, collection, timeout=0):
+  def move_to_collection(self, collection, timeout=0, wait=True):
     """
     Moves the folder to a different collection.
 
@@ -394,8 +478,10 @@ class Folder:
         maximum amount of time (in seconds) that you'll wait. By default this is zero which
         means this function call returns before the folder has actually been moved to its
         new collection.
+      wait (bool, optional): Set this to False to get a BulkOperation back right away instead
+        of waiting, so you can wait for many moves at once with `g.wait_for_bulk_operations`.
     """
-    self.guru.move_folder_to_collection(self, collection, timeout)
+    return self.guru.move_folder_to_collection(self, collection, timeout, wait=wait)
 
   def set_folder_item_order(self, *items):
     """
@@ -493,7 +579,16 @@ class Board:
     have all four items.
   """
 
-  def __init__(self, data, guru=None, home_board=None):
+  __slots__ = (
+      "guru", "home_board", "last_modified", "title", "description", "slug", "id", "type",
+      "_data", "_collection", "__item_id", "__items", "__cards", "__sections", "__all_items",
+      "__partial_cards", "__load_lock", "__dict__", "__weakref__"
+  )
+
+  def __init__(self, data, guru=None, home_board=None, lazy=False):
+    if hasattr(self, "_data"):
+      reset_lazy_attributes(self)
+    self._data = pick_keys(data, ("collection",))
     self.guru = guru
     self.home_board = home_board
     self.last_modified = data.get("lastModified")
@@ -504,74 +599,105 @@ class Board:
     self.__item_id = data.get("itemId")
     self.type = "board"
 
-    if data.get("collection"):
-      self.collection = Collection(data.get("collection"))
-    else:
-      self.collection = None
-
-    self.items = []
+    self.__items = []
     self.__cards = []
     self.__sections = []
     self.__all_items = []
+
+    # boards with more than 50 cards only have the id for the rest of them. for each
+    # of these partial cards we keep track of where it is in each list so we can swap
+    # in the full card without scanning the lists again.
+    self.__partial_cards = {}
+    self.__load_lock = threading.Lock()
     for item in data.get("items", []):
       if item.get("type") == "section":
         section = Section(item, guru=guru)
-        self.items.append(section)
+        self.__items.append(section)
         self.__sections.append(section)
         self.__all_items.append(section)
-        self.__all_items += section.items
-        self.__cards += section.items
+        for index, card in enumerate(section.items):
+          self.__track_card(card, section.items, index)
+          self.__append_card(self.__all_items, card)
+          self.__append_card(self.__cards, card)
       else:
-        card = Card(item, guru=guru)
-        self.items.append(card)
-        self.__all_items.append(card)
-        self.__cards.append(card)
+        card = make_card(item, guru=guru)
+        self.__append_card(self.__items, card)
+        self.__append_card(self.__all_items, card)
+        self.__append_card(self.__cards, card)
 
-    self.__load_all_cards()
+    # if it's lazy, the partial cards are loaded the first time someone uses the board's items.
+    if not lazy:
+      self.__load_all_cards()
+
+  def __track_card(self, card, item_list, index):
+    """internal"""
+    # partial cards only have an id, so if there's no title it's a partial card.
+    if not card.title:
+      self.__partial_cards.setdefault(id(card), (card, []))[1].append((item_list, index))
 
-  def __update_cards_in_list(self, item_list, lookup):
-    # we scan the list and replace any partial card with its full card from the lookup.
-    # we don't bother checking if something is a partial card because if it's in the
-    # lookup dict, that means it must've been a partial card.
-    for i in range(0, len(item_list)):
-      partial_item = item_list[i]
-      full_item = lookup.get(partial_item.id)
-      if full_item:
-        full_item = copy.copy(full_item)
-        item_list[i] = full_item
-        if partial_item.item_id:
-          full_item.item_id = partial_item.item_id
+  def __append_card(self, item_list, card):
+    """internal"""
+    self.__track_card(card, item_list, len(item_list))
+    item_list.append(card)
 
   def __load_all_cards(self):
-    # identify the partially-loaded cards.
-    # these come from boards that have more than 50 cards.
     # sometimes the API returns a 'lite' board that doesn't have items at all. these will
-    # naturally skip over most of this logic because their items list is missing or empty
-    # so we don't have any card IDs to try to load.
-    unloaded_card_ids = []
-    for card in self.__cards:
-      if not card.title:
-        unloaded_card_ids.append(card.id)
-
-    # if the board has < 50 cards this list will be empty and we can stop early.
-    if not unloaded_card_ids:
+    # naturally skip over this because they don't have any partial cards to load.
+    if not self.__partial_cards:
       return
 
-    # load the unloaded cards in batches of 50.
-    # our API does enforce a max of 50.
-    card_lookup = {}
-    for index in range(0, len(unloaded_card_ids), 50):
-      batch_ids = unloaded_card_ids[index:index + 50]
-      data = self.guru.get_cards(batch_ids)
-      for id in data:
-        card_lookup[id] = data[id]
-
-    # now that we have the full card objects, we update the entries in all the existing lists.
-    self.__update_cards_in_list(self.items, card_lookup)
-    self.__update_cards_in_list(self.__cards, card_lookup)
-    self.__update_cards_in_list(self.__all_items, card_lookup)
-    for section in self.__sections:
-      self.__update_cards_in_list(section.items, card_lookup)
+    # if another thread is already loading the cards, we wait for it to finish.
+    with self.__load_lock:
+      partial_cards = self.__partial_cards
+      if not partial_cards:
+        return
+      self.__swap_in_full_cards(partial_cards)
+
+      # this is only cleared once the cards are swapped in, so if loading them
+      # fails we try again the next time the board's items are used.
+      self.__partial_cards = {}
+
+  def __swap_in_full_cards(self, partial_cards):
+    """internal"""
+    # get_cards loads them in parallel batches of 50, which is the most our API allows per call.
+    card_lookup = self.guru.get_cards([card.id for card, _ in partial_cards.values()])
+
+    # each partial card is replaced by its own copy of the full card because the same
+    # card can be on a board more than once, each time with a different item id.
+    # with an identity map this updates the partial card object in place.
+    for partial_card, positions in partial_cards.values():
+      full_card = card_lookup.get(partial_card.id)
+      if not full_card:
+        continue
+      if partial_card.item_id:
+        full_card = self.__place_card(full_card, partial_card.item_id)
+      for item_list, index in positions:
+        item_list[index] = full_card
+
+  def __place_card(self, card, item_id):
+    """internal: returns the card for where it is on this board, going through the identity map if there is one."""
+    placed_card = copy.copy(card)
+    placed_card._data = dict(card._data)
+    placed_card.item_id = item_id
+    identity_map = getattr(self.guru, "identity_map", None)
+    if identity_map is None:
+      return placed_card
+    return identity_map.adopt(placed_card)
+
+  @lazy_attribute
+  def collection(self):
+    data = self._data.get("collection")
+    return Collection(data) if data else None
+
+  @property
+  def is_loaded(self):
+    """True if all of the board's cards have been loaded (lazy boards load them on first use)."""
+    return not self.__partial_cards
+
+  @property
+  def items(self):
+    self.__load_all_cards()
+    return self.__items
 
   @property
   def url(self):
@@ -599,14 +725,17 @@ class Board:
 
   @property
   def cards(self):
+    self.__load_all_cards()
     return tuple(self.__cards)
 
   @property
   def sections(self):
+    self.__load_all_cards()
     return tuple(self.__sections)
 
   @property
   def all_items(self):
+    self.__load_all_cards()
     return tuple(self.__all_items)
 
   def get_section(self, section):
@@ -766,7 +895,7 @@ class Board:
     """
     return self.guru.remove_shared_group(self, group)
 
-  def move_to_collection(self, collection, timeout=0):
+  def move_to_collection(self, collection, timeout=0, wait=True):
     """
     Moves the board to a different collection.
 
@@ -782,8 +911,10 @@ class Board:
         maximum amount of time (in seconds) that you'll wait. By default this is zero which
         means this function call returns before the board has actually been moved to its
         new collection.
+      wait (bool, optional): Set this to False to get a BulkOperation back right away instead
+        of waiting, so you can wait for many moves at once with `g.wait_for_bulk_operations`.
     """
-    self.guru.move_board_to_collection(self, collection, timeout)
+    return self.guru.move_board_to_collection(self, collection, timeout, wait=wait)
 
   def delete(self):
     """
@@ -1113,9 +1244,15 @@ class User:
     objects that come back have a list of groups for each user.
   """
 
+  __slots__ = (
+      "email", "first_name", "last_name", "image", "status", "billing_type", "access_type",
+      "_data", "_groups", "__dict__"
+  )
+
   def __init__(self, data):
     user_obj = data.get("user") or data or {}
     user_attr = data.get("userAttributes", {})
+    self._data = pick_keys(data, ("groups",))
     self.email = user_obj.get("email")
     self.first_name = user_obj.get("firstName")
     self.last_name = user_obj.get("lastName")
@@ -1123,7 +1260,10 @@ class User:
     self.status = user_obj.get("status")
     self.billing_type = user_attr.get("BILLING_TYPE")
     self.access_type = user_attr.get("ACCESS_TYPE")
-    self.groups = [Group(group) for group in data.get("groups", [])]
+
+  @lazy_attribute
+  def groups(self):
+    return [Group(group) for group in self._data.get("groups", [])]
 
   @property
   def full_name(self):
@@ -1170,6 +1310,8 @@ class User:
 
 
 class Tag:
+  __slots__ = ("id", "value", "category", "category_id", "__dict__")
+
   def __init__(self, data):
     self.id = data.get("id")
     self.value = data.get("value")
@@ -1214,6 +1356,13 @@ class Verifier:
         "userGroup") else None
 
 
+# the parts of a card's raw data that its lazy attributes are built from.
+CARD_LAZY_KEYS = (
+    "collection", "lastModifiedBy", "lastVerifiedBy", "owner", "originalOwner",
+    "verificationInitiator", "tags", "verifiers"
+)
+
+
 class Card:
   """
   The Card object is used to represent card data we get back from
@@ -1252,8 +1401,22 @@ class Card:
   comments, etc.
   """
 
+  __slots__ = (
+      "guru", "board_count", "copies", "favorites", "unverified_copies", "unverified_views", "views",
+      "type", "created_date", "id", "item_id", "last_modified_date", "last_verified_date",
+      "next_verification_date", "title", "share_status", "slug", "team_id", "verification_initiation_date",
+      "verification_interval", "verification_reason", "verification_state", "verification_type",
+      "version", "archived", "favorited",
+      "_data", "_collection", "_last_modified_by", "_last_verified_by", "_owner", "_original_owner",
+      "_tags", "_verification_initiator", "_verifiers",
+      "__content", "__doc", "__has_folders", "__folders", "__dict__", "__weakref__"
+  )
+
   def __init__(self, data, guru=None):
+    if hasattr(self, "_data"):
+      reset_lazy_attributes(self)
     analytics = data.get("cardInfo", {}).get("analytics", {})
+    self._data = pick_keys(data, CARD_LAZY_KEYS)
     self.guru = guru
     self.board_count = analytics.get("boards")
     self.copies = analytics.get("copies")
@@ -1262,36 +1425,23 @@ class Card:
     self.unverified_views = analytics.get("unverifiedViews")
     self.views = analytics.get("views")
     self.type = data.get("cardType") or "CARD"
-    self.collection = Collection(
-        data.get("collection")) if data.get("collection") else None
     self.__content = data.get("content", "")
     self.created_date = data.get("dateCreated")
     self.id = data.get("id")
     self.item_id = data.get("itemId")
     self.last_modified_date = data.get("lastModified")
-    self.last_modified_by = User(data.get("lastModifiedBy")) if data.get(
-        "lastModifiedBy") else None
-    self.last_verified_by = User(data.get("lastVerifiedBy")) if data.get(
-        "lastVerifiedBy") else None
     self.last_verified_date = data.get("lastVerified")
     self.next_verification_date = data.get("nextVerificationDate")
-    self.owner = User(data.get("owner")) if data.get("owner") else None
-    self.original_owner = User(data.get("originalOwner")) if data.get(
-        "originalOwner") else None
     self.title = data.get("preferredPhrase", "")
     self.share_status = data.get("shareStatus", "TEAM")
     self.slug = data.get("slug")
-    self.tags = [Tag(item) for item in data.get("tags", [])]
     self.team_id = data.get("teamId")
     self.verification_initiation_date = data.get(
         "verificationInitiationDate")
-    self.verification_initiator = User(data.get(
-        "verificationInitiator")) if data.get("verificationInitiator") else None
     self.verification_interval = data.get("verificationInterval")
     self.verification_reason = data.get("verificationReason")
     self.verification_state = data.get("verificationState")
     self.verification_type = data.get("verificationType")
-    self.verifiers = [Verifier(v) for v in data.get("verifiers") or []]
     self.version = data.get("version")
     self.archived = data.get("archived", False)
     self.favorited = data.get("favorited", False)
@@ -1301,6 +1451,45 @@ class Card:
     self.__has_folders = False
     self.__folders = []
 
+  # the nested objects are only created if you use them.
+  @lazy_attribute
+  def collection(self):
+    data = self._data.get("collection")
+    return Collection(data) if data else None
+
+  @lazy_attribute
+  def last_modified_by(self):
+    data = self._data.get("lastModifiedBy")
+    return User(data) if data else None
+
+  @lazy_attribute
+  def last_verified_by(self):
+    data = self._data.get("lastVerifiedBy")
+    return User(data) if data else None
+
+  @lazy_attribute
+  def owner(self):
+    data = self._data.get("owner")
+    return User(data) if data else None
+
+  @lazy_attribute
+  def original_owner(self):
+    data = self._data.get("originalOwner")
+    return User(data) if data else None
+
+  @lazy_attribute
+  def verification_initiator(self):
+    data = self._data.get("verificationInitiator")
+    return User(data) if data else None
+
+  @lazy_attribute
+  def tags(self):
+    return [Tag(item) for item in self._data.get("tags", [])]
+
+  @lazy_attribute
+  def verifiers(self):
+    return [Verifier(v) for v in self._data.get("verifiers") or []]
+
   @property
   def doc(self):
     """
@@ -1712,8 +1901,8 @@ class Card:
     """
     return self.guru.remove_card_from_board(self, board, self.collection)
 
-  def move_to_collection(self, collection, timeout=0):
-    return self.guru.move_card_to_collection(self, collection, timeout=timeout)
+  def move_to_collection(self, collection, timeout=0, wait=True):
+    return self.guru.move_card_to_collection(self, collection, timeout=timeout, wait=wait)
 
   def download_as_pdf(self, filename):
     return self.guru.download_card_as_pdf(self, filename)
@@ -0,0 +1,122 @@
+import re
+import threading
+
+# the upper bounds (in seconds) of the latency histogram's buckets.
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+
+ID_PATTERN = re.compile(r"^([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|[A-Za-z0-9_-]*[0-9][A-Za-z0-9_-]*)$")
+
+
+def url_template(url, base_url=""):
+  """
+  Turns a url into the endpoint it's for by removing the base url and the query
+  string and replacing IDs and slugs with placeholders, so calls to load different
+  cards are all counted under `/cards/{id}/extended`.
+  """
+  if base_url and url.startswith(base_url):
+    url = url[len(base_url):]
+  url = url.split("?")[0].split("#")[0]
+  return "/".join(["{id}" if ID_PATTERN.match(part) else part for part in url.split("/")])
+
+
+class RequestInfo:
+  """
+  This is what gets passed to the Guru object's request hooks. Hooks added
+  with `g.on_request()` are called before the call is made, so only the method,
+  url, and endpoint are set. Hooks added with `g.on_response()` are called after
+  the call is done (including any retries) and have everything else too.
+
+  Attributes:
+    method (str): The HTTP method, e.g. "GET".
+    url (str): The full url that was called.
+    endpoint (str): The url with IDs replaced by placeholders, e.g. "/cards/{id}/extended".
+    status_code (int): The response's status code, or None if the call raised an exception.
+    bytes (int): The size of the response body.
+    latency (float): The number of seconds the call took, including retries.
+    retries (int): The number of times the call was retried.
+    error (Exception): The exception the call raised, if it raised one.
+  """
+
+  def __init__(self, method, url, endpoint):
+    self.method = method
+    self.url = url
+    self.endpoint = endpoint
+    self.status_code = None
+    self.bytes = 0
+    self.latency = None
+    self.retries = 0
+    self.error = None
+
+  @property
+  def key(self):
+    return "%s %s" % (self.method, self.endpoint)
+
+
+class Metrics:
+  """
+  Counts calls per endpoint and keeps a histogram of how long they took.
+  The Guru object has one of these as `g.metrics` and it's included in
+  `g.stats()`. It's safe to share between threads.
+  """
+
+  def __init__(self, buckets=None):
+    self.buckets = list(buckets or LATENCY_BUCKETS)
+    self.__lock = threading.Lock()
+    self.__endpoints = {}
+
+  def record(self, info):
+    """Adds a finished call (a RequestInfo) to the counts."""
+    with self.__lock:
+      stats = self.__endpoints.get(info.key)
+      if stats is None:
+        stats = self.__endpoints[info.key] = {
+            "calls": 0,
+            "errors": 0,
+            "retries": 0,
+            "bytes": 0,
+            "total_time": 0.0,
+            "max_time": 0.0,
+            "statuses": {},
+            "histogram": [0] * (len(self.buckets) + 1)
+        }
+
+      stats["calls"] += 1
+      stats["retries"] += info.retries
+      stats["bytes"] += info.bytes
+      stats["total_time"] += info.latency
+      stats["max_time"] = max(stats["max_time"], info.latency)
+      if info.status_code is None or info.status_code >= 400:
+        stats["errors"] += 1
+      status = info.status_code or "error"
+      stats["statuses"][status] = stats["statuses"].get(status, 0) + 1
+
+      bucket = len(self.buckets)
+      for index, bound in enumerate(self.buckets):
+        if info.latency <= bound:
+          bucket = index
+          break
+      stats["histogram"][bucket] += 1
+
+  def reset(self):
+    with self.__lock:
+      self.__endpoints.clear()
+
+  def snapshot(self):
+    """
+    Returns a dict where the keys are endpoints, like "GET /cards/{id}/extended",
+    and the values are dicts of counts. The endpoints are sorted by the total time
+    spent calling them, so the ones that dominate your script's runtime come first.
+    The histogram maps each bucket's upper bound (in seconds) to the number of calls
+    that took that long or less, but more than the previous bucket's bound.
+    """
+    with self.__lock:
+      result = {}
+      for key, stats in sorted(self.__endpoints.items(), key=lambda item: -item[1]["total_time"]):
+        bounds = self.buckets + [float("inf")]
+        result[key] = dict(
+            stats,
+            statuses=dict(stats["statuses"]),
+            avg_time=stats["total_time"] / stats["calls"],
+            histogram={bound: count for bound, count in zip(bounds, stats["histogram"])}
+        )
+      return result
@@ -0,0 +1,150 @@
+import os
+import json
+import time
+import threading
+
+try:
+  import fcntl
+except ImportError:
+  fcntl = None
+
+
+class TokenBucket:
+  """
+  A token bucket that refills at `rate` tokens per second and holds at most
+  `capacity` tokens. Each call takes a token and if there are none left it
+  waits until one is available. It's safe to share between threads.
+  """
+
+  def __init__(self, rate, capacity=None):
+    self.rate = float(rate)
+    self.capacity = float(capacity or rate)
+    self.__tokens = self.capacity
+    self.__updated = time.monotonic()
+    self.__lock = threading.Lock()
+
+  def __refill(self, now):
+    """internal"""
+    self.__tokens = min(self.capacity, self.__tokens + (now - self.__updated) * self.rate)
+    self.__updated = now
+
+  def acquire(self, tokens=1):
+    """Takes tokens from the bucket, waiting if needed. Returns the number of seconds we waited."""
+    with self.__lock:
+      self.__refill(time.monotonic())
+      # we take the tokens now even if that puts us in debt, that way threads
+      # that are waiting get their turns in the order they asked.
+      self.__tokens -= tokens
+      wait = max(-self.__tokens / self.rate, 0)
+    if wait:
+      time.sleep(wait)
+    return wait
+
+  def pause(self, seconds):
+    """Empties the bucket so no calls are made for the next `seconds` seconds (e.g. after a 429)."""
+    with self.__lock:
+      self.__refill(time.monotonic())
+      self.__tokens = min(self.__tokens, -seconds * self.rate)
+
+
+class FileTokenBucket:
+  """
+  A token bucket whose state is kept in a file so scripts running in
+  separate processes on the same machine can share one budget. Access
+  to the file is serialized with an exclusive lock (this needs `fcntl`,
+  so it's not available on Windows).
+  """
+
+  def __init__(self, path, rate, capacity=None):
+    if not fcntl:
+      raise RuntimeError("FileTokenBucket needs fcntl, which isn't available on this platform")
+
+    self.path = path
+    self.rate = float(rate)
+    self.capacity = float(capacity or rate)
+    self.__lock = threading.Lock()
+
+  def __update(self, func):
+    """internal: calls func(tokens) -> tokens while holding the file lock and returns the new value."""
+    with self.__lock:
+      fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+      try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        raw = os.read(fd, 1024)
+        now = time.time()
+        try:
+          state = json.loads(raw.decode("utf-8"))
+          tokens = min(self.capacity, state["tokens"] + (now - state["updated"]) * self.rate)
+        except (ValueError, KeyError):
+          tokens = self.capacity
+
+        tokens = func(tokens)
+
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.ftruncate(fd, 0)
+        os.write(fd, json.dumps({"tokens": tokens, "updated": now}).encode("utf-8"))
+        return tokens
+      finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+  def acquire(self, tokens=1):
+    """Takes tokens from the bucket, waiting if needed. Returns the number of seconds we waited."""
+    remaining = self.__update(lambda available: available - tokens)
+    wait = max(-remaining / self.rate, 0)
+    if wait:
+      time.sleep(wait)
+    return wait
+
+  def pause(self, seconds):
+    """Empties the bucket so no process makes calls for the next `seconds` seconds."""
+    self.__update(lambda available: min(available, -seconds * self.rate))
+
+
+class RateLimiter:
+  """
+  Limits how fast the Guru object makes calls, with separate budgets for
+  reads and writes. Reads are GETs and POSTs that only load data (like card
+  searches), everything else is a write.
+
+  ```
+  import guru
+  g = guru.Guru(rate_limiter=guru.RateLimiter(reads_per_second=10, writes_per_second=2))
+  ```
+
+  One RateLimiter can be passed to several Guru objects (e.g. one per thread).
+  To share a budget between scripts running at the same time on one machine,
+  give each of them a `shared_path`, the scripts that use the same path share
+  the same budget:
+
+  ```
+  limiter = guru.RateLimiter(reads_per_second=10, writes_per_second=2, shared_path="/tmp/guru-limits")
+  ```
+
+  When a call gets a 429 response anyway, the limiter pauses the matching budget
+  for the Retry-After time (or the retry wait) so every thread and process backs
+  off together instead of each one finding out on its own.
+
+  Args:
+    reads_per_second (float, optional): The sustained rate of read calls. Defaults to 10.
+    writes_per_second (float, optional): The sustained rate of write calls. Defaults to 5.
+    burst (float, optional): How many calls can be made at once after being idle.
+      Defaults to one second's worth of calls.
+    shared_path (str, optional): A file path prefix used to share the budget across processes.
+  """
+
+  def __init__(self, reads_per_second=10, writes_per_second=5, burst=None, shared_path=None):
+    if shared_path:
+      self.reads = FileTokenBucket("%s.reads" % shared_path, reads_per_second, burst)
+      self.writes = FileTokenBucket("%s.writes" % shared_path, writes_per_second, burst)
+    else:
+      self.reads = TokenBucket(reads_per_second, burst)
+      self.writes = TokenBucket(writes_per_second, burst)
+
+  def acquire(self, is_read):
+    """Waits until a call can be made. Returns the number of seconds we waited."""
+    return (self.reads if is_read else self.writes).acquire()
+
+  def pause(self, is_read, seconds):
+    """Stops all calls of this kind for the given number of seconds."""
+    (self.reads if is_read else self.writes).pause(seconds)
@@ -0,0 +1,166 @@
+import threading
+
+from guru.data_objects import Tag
+
+
+class TagRegistry:
+  """
+  Keeps a local copy of your team's tag categories and tags, indexed by value
+  and ID, so looking up tags doesn't make an API call each time. The Guru object
+  has one of these as `g.tag_registry` and methods like `get_tag`, `add_tag_to_card`,
+  `merge_tags`, and `find_cards(tag=...)` use it:
+
+  ```
+  import guru
+  g = guru.Guru()
+
+  # this loads the tag categories once and resolves all three names.
+  tags = g.tag_registry.resolve(["onboarding", "case study", "faq"])
+  ```
+
+  The tags are loaded the first time you use the registry. If a tag isn't found
+  we reload them once, in case it was added since then, and when you add, delete,
+  or merge tags through the Guru object the registry is updated without reloading.
+
+  Args:
+    load (function): Called with no arguments to get the list of tag categories
+      from the API, each with its list of tags.
+  """
+
+  def __init__(self, load):
+    self.__load = load
+    self.__lock = threading.RLock()
+    self.__categories = None
+    self.__tags = []
+    self.__by_id = {}
+    self.__by_value = {}
+
+  @property
+  def is_loaded(self):
+    return self.__categories is not None
+
+  def load(self, categories=None):
+    """Loads the tag categories, or indexes the ones you pass in (the same JSON the API returns)."""
+    with self.__lock:
+      if categories is None:
+        categories = self.__load()
+
+      self.__categories = [
+          {"id": c.get("id"), "name": c.get("name"), "tags": []} for c in categories or []]
+      self.__tags = []
+      self.__by_id = {}
+      self.__by_value = {}
+      for category, data in zip(self.__categories, categories or []):
+        for tag_data in data.get("tags") or []:
+          self.__add(Tag(tag_data), category)
+
+  def __add(self, tag, category=None):
+    """internal"""
+    self.__tags.append(tag)
+    if tag.id:
+      self.__by_id[tag.id.lower()] = tag
+    if tag.value:
+      self.__by_value.setdefault(tag.value.lower(), tag)
+    if category:
+      category["tags"].append(tag)
+
+  def __find_category(self, category):
+    """internal"""
+    for c in self.__categories or []:
+      if (c["id"] or "").lower() == category.lower() or (c["name"] or "").lower() == category.lower():
+        return c
+
+  def __find(self, tag):
+    """internal"""
+    if isinstance(tag, Tag):
+      return tag
+    tag = (tag or "").strip().lower()
+    return self.__by_value.get(tag) or self.__by_id.get(tag)
+
+  def resolve(self, tags):
+    """
+    Finds many tags at once. The tag categories are loaded at most once (or
+    reloaded once, if some of the tags weren't found).
+
+    Args:
+      tags (list of str or Tag): Tag values (without the "#") or IDs.
+
+    Returns:
+      dict: The keys are the values you passed in and the values are Tag objects,
+        or None for tags that weren't found.
+    """
+    with self.__lock:
+      just_loaded = not self.is_loaded
+      if just_loaded:
+        self.load()
+
+      result = {tag: self.__find(tag) for tag in tags if tag}
+      if not just_loaded and None in result.values():
+        self.load()
+        result = {tag: self.__find(tag) for tag in result}
+      return result
+
+  def get(self, tag):
+    """Returns the Tag object for a tag value or ID, or None if it wasn't found."""
+    if not tag:
+      return
+    return self.resolve([tag])[tag]
+
+  def get_tags(self, category=None):
+    """Returns a list of all tags, or the tags in one category (by name or ID)."""
+    with self.__lock:
+      if not self.is_loaded:
+        self.load()
+      if not category:
+        return list(self.__tags)
+      category = self.__find_category(category)
+      return list(category["tags"]) if category else []
+
+  def get_category(self, category="Tags"):
+    """Returns the category's ID, name, and tags as a dict, or None if it wasn't found."""
+    with self.__lock:
+      if not self.is_loaded:
+        self.load()
+      return self.__find_category(category)
+
+  def get_categories(self):
+    with self.__lock:
+      if not self.is_loaded:
+        self.load()
+      return list(self.__categories)
+
+  def add(self, tag, category=None):
+    """Adds a tag we just created to the category (by name or ID) it was created in."""
+    with self.__lock:
+      if self.is_loaded and tag.id and tag.id.lower() not in self.__by_id:
+        self.__add(tag, self.__find_category(category or tag.category_id or ""))
+
+  def remove(self, tag):
+    """Removes a tag that was deleted or merged into another tag."""
+    with self.__lock:
+      tag = self.__find(tag)
+      if not tag or not self.is_loaded:
+        return
+
+      tag = self.__by_id.get((tag.id or "").lower(), tag)
+      self.__tags = [t for t in self.__tags if t is not tag]
+      self.__by_id.pop((tag.id or "").lower(), None)
+      for category in self.__categories:
+        category["tags"] = [t for t in category["tags"] if t is not tag]
+
+      # another tag in a different category can have the same value.
+      value = (tag.value or "").lower()
+      if self.__by_value.get(value) is tag:
+        del self.__by_value[value]
+        for t in self.__tags:
+          if (t.value or "").lower() == value:
+            self.__by_value[value] = t
+            break
+
+  def clear(self):
+    """Forgets the tags so they're loaded again the next time they're needed."""
+    with self.__lock:
+      self.__categories = None
+      self.__tags = []
+      self.__by_id = {}
+      self.__by_value = {}
@@ -0,0 +1,602 @@
+"""
+Tools for testing and benchmarking scripts that use the SDK without making
+calls to the real Guru API. FakeGuruServer is a local HTTP server that serves
+a generated dataset from the same endpoints the Guru object calls:
+
+```
+from guru.testing import FakeDataset, FakeGuruServer
+
+with FakeGuruServer(FakeDataset(cards=5000), latency=0.05) as server:
+  g = server.make_guru()
+  cards = g.find_cards()
+  print(g.stats())
+```
+
+The server runs on a background thread and handles calls concurrently, so it
+also works for measuring the threaded and async parts of the SDK. It's not a
+complete copy of the API, calls to endpoints it doesn't know about get a 404.
+"""
+
+import re
+import json
+import time
+import uuid
+import random
+import string
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from guru.core import Guru
+
+
+def make_slug(rand, length=8):
+  return "".join(rand.choice(string.ascii_letters + string.digits) for _ in range(length))
+
+
+def make_id(rand):
+  return str(uuid.UUID(int=rand.getrandbits(128), version=4))
+
+
+class FakeDataset:
+  """
+  A generated team with collections, groups, tags, cards, folders, boards,
+  members, and analytics events. The same arguments (including the seed)
+  always give you the same data.
+
+  Args:
+    cards (int, optional): The number of cards. Defaults to 500.
+    collections (int, optional): The number of collections. Defaults to 5.
+    folders (int, optional): The number of folders, cards are spread across them. Defaults to 25.
+    boards (int, optional): The number of boards, cards are spread across them. Defaults to 25.
+    members (int, optional): The number of users on the team. Defaults to 100.
+    tags (int, optional): The number of tags. Defaults to 50.
+    events (int, optional): The number of analytics events. Defaults to 1000.
+    content_size (int, optional): Roughly how many bytes of HTML each card has. Defaults to 2000.
+    seed (int, optional): The seed for the random generator. Defaults to 0.
+  """
+
+  def __init__(self, cards=500, collections=5, folders=25, boards=25, members=100,
+               tags=50, events=1000, content_size=2000, seed=0):
+    rand = random.Random(seed)
+    self.team_id = make_id(rand)
+
+    self.groups = [{
+        "id": make_id(rand),
+        "name": "Group %s" % i,
+        "groupIdentifier": "group-%s" % i,
+        "modifiable": True
+    } for i in range(max(collections, 1))]
+
+    self.collections = [{
+        "id": make_id(rand),
+        "name": "Collection %s" % i,
+        "slug": make_slug(rand),
+        "collectionType": "INTERNAL",
+        "color": "#009688",
+        "homeBoardSlug": make_slug(rand),
+        "collectionStats": {"stats": {"card-count": {"count": 0}}}
+    } for i in range(collections)]
+
+    self.tag_category = {
+        "id": make_id(rand),
+        "name": "Tags",
+        "tags": []
+    }
+    for i in range(tags):
+      self.tag_category["tags"].append({
+          "id": make_id(rand),
+          "value": "tag%s" % i,
+          "categoryName": "Tags",
+          "categoryId": self.tag_category["id"]
+      })
+
+    self.members = []
+    for i in range(members):
+      self.members.append({
+          "id": "user%s@example.com" % i,
+          "user": {
+              "email": "user%s@example.com" % i,
+              "firstName": "User",
+              "lastName": str(i),
+              "status": "ACTIVE"
+          },
+          "groups": [rand.choice(self.groups)] if self.groups else []
+      })
+
+    # every card's content is built from the same paragraph, with some images
+    # and links mixed in so the bundle and publisher code have work to do.
+    paragraph = "<p>%s</p>" % " ".join(
+        make_slug(rand, rand.randint(3, 10)).lower() for _ in range(120))
+    self.cards = {}
+    self.slugs = {}
+    for i in range(cards):
+      card_id = make_id(rand)
+      slug = make_slug(rand)
+      content = ['<h2>Card %s</h2>' % i]
+      while sum(len(c) for c in content) < content_size:
+        content.append(paragraph)
+        content.append('<p><img src="https://content.api.getguru.com/files/view/%s"></p>' % make_id(rand))
+        content.append('<p><a href="https://app.getguru.com/card/%s">related</a></p>' % make_slug(rand))
+      collection = self.collections[i % len(self.collections)] if self.collections else None
+      author = rand.choice(self.members)["user"] if self.members else None
+      self.cards[card_id] = {
+          "id": card_id,
+          "slug": "%s/Card-%s" % (slug, i),
+          "preferredPhrase": "Card %s" % i,
+          "content": "".join(content),
+          "cardType": "CARD",
+          "shareStatus": "TEAM",
+          "teamId": self.team_id,
+          "verificationState": rand.choice(["TRUSTED", "NEEDS_VERIFICATION"]),
+          "verificationInterval": 90,
+          "lastModified": "2021-03-01T00:00:00.000+0000",
+          "dateCreated": "2021-01-01T00:00:00.000+0000",
+          "collection": {"id": collection["id"], "name": collection["name"]} if collection else None,
+          "owner": author,
+          "originalOwner": author,
+          "lastModifiedBy": author,
+          "tags": rand.sample(self.tag_category["tags"], min(2, len(self.tag_category["tags"]))),
+          "verifiers": []
+      }
+      self.slugs[slug] = card_id
+
+    card_ids = list(self.cards)
+
+    self.folders = []
+    self.folder_items = {}
+    for i in range(folders):
+      collection = self.collections[i % len(self.collections)] if self.collections else None
+      folder = {
+          "id": make_id(rand),
+          "slug": make_slug(rand),
+          "title": "Folder %s" % i,
+          "description": "",
+          "collection": {"id": collection["id"], "name": collection["name"]} if collection else None,
+          "lastModified": "2021-03-01T00:00:00.000+0000"
+      }
+      self.folders.append(folder)
+      self.folder_items[folder["slug"]] = [
+          dict(self.cards[card_id], type="card", itemId=make_id(rand))
+          for card_id in card_ids[i::folders]
+      ]
+
+    # each collection's home folder lists the collection's folders.
+    self.home_folders = []
+    self.card_folders = {}
+    for collection in self.collections:
+      self.home_folders.append({
+          "id": make_id(rand),
+          "slug": collection["homeBoardSlug"],
+          "title": collection["name"],
+          "collection": {"id": collection["id"], "name": collection["name"]}
+      })
+      self.folder_items[collection["homeBoardSlug"]] = [
+          dict(folder, type="folder") for folder in self.folders
+          if (folder["collection"] or {}).get("id") == collection["id"]
+      ]
+    for folder in self.folders:
+      for item in self.folder_items[folder["slug"]]:
+        self.card_folders.setdefault(item["id"], []).append(folder)
+
+    self.boards = []
+    for i in range(boards):
+      collection = self.collections[i % len(self.collections)] if self.collections else None
+      self.boards.append({
+          "id": make_id(rand),
+          "slug": make_slug(rand),
+          "title": "Board %s" % i,
+          "description": "",
+          "collection": {"id": collection["id"], "name": collection["name"]} if collection else None,
+          "cards": card_ids[i::boards],
+          "lastModified": "2021-03-01T00:00:00.000+0000"
+      })
+
+    self.events = [{
+        "type": rand.choice(["card-view", "search", "card-copy"]),
+        "eventDate": "2021-03-01T00:00:00.000+0000",
+        "user": rand.choice(self.members)["user"]["email"] if self.members else None,
+        "properties": {"cardId": rand.choice(card_ids)} if card_ids else {}
+    } for _ in range(events)]
+
+  def find_card(self, card):
+    """Returns the card's data for an ID or slug, or None."""
+    if card in self.cards:
+      return self.cards[card]
+    card_id = self.slugs.get(card.split("/")[0])
+    if card_id:
+      return self.cards[card_id]
+
+  def find_by_id_or_slug(self, items, value):
+    for item in items:
+      if item["id"] == value or item["slug"] == value:
+        return item
+
+  def get_home_board(self, collection_id):
+    """Returns the collection's home board, which lists its boards (as 'lite' boards without items)."""
+    collection = self.find_by_id_or_slug(self.collections, collection_id)
+    if not collection:
+      return
+
+    return {
+        "id": collection["homeBoardSlug"],
+        "slug": collection["homeBoardSlug"],
+        "collection": {"id": collection["id"], "name": collection["name"]},
+        "items": [
+            dict({key: value for key, value in board.items() if key != "cards"}, type="board", itemId=board["id"])
+            for board in self.boards if (board["collection"] or {}).get("id") == collection["id"]
+        ]
+    }
+
+  def get_board(self, board):
+    """Returns the full board object like the API does, with partial cards past the first 50."""
+    board = self.find_by_id_or_slug(self.boards, board)
+    if not board:
+      return
+
+    items = []
+    for index, card_id in enumerate(board["cards"]):
+      if index < 50:
+        items.append(dict(self.cards[card_id], type="card", itemId=card_id))
+      else:
+        items.append({"id": card_id, "type": "card", "itemId": card_id})
+    result = {key: value for key, value in board.items() if key != "cards"}
+    result["items"] = items
+    return result
+
+
+class FakeGuruServer:
+  """
+  A local HTTP server that stands in for the Guru API. Use `make_guru()` to get
+  a Guru object that makes its calls to this server instead of the real API.
+
+  Lists are paginated with Link headers like the real API, so the SDK's paging
+  code is exercised, and you can add latency and rate limiting to see how
+  scripts behave with a slow or busy API. Content uploads, like `bundle.upload()`,
+  also go to this server and each one is recorded in `server.uploads`.
+
+  Args:
+    dataset (FakeDataset, optional): The data to serve. Defaults to a FakeDataset with default settings.
+    page_size (int, optional): The number of items on each page of paginated lists. Defaults to 50.
+    latency (float or tuple, optional): The number of seconds each call takes. This can be a number
+      or a (min, max) tuple, in which case each call waits a random amount in that range.
+    throttle_every (int, optional): If set, every Nth call gets a 429 response.
+    retry_after (float, optional): The Retry-After value sent with 429 responses. Defaults to 0.
+    bulkop_polls (int, optional): The number of times a bulk operation's status has to be checked
+      before it's done. Defaults to 1.
+    host (str, optional): The interface to listen on. Defaults to 127.0.0.1.
+    port (int, optional): The port to listen on. Defaults to 0, which picks a free port.
+  """
+
+  def __init__(self, dataset=None, page_size=50, latency=0, throttle_every=0, retry_after=0,
+               bulkop_polls=1, host="127.0.0.1", port=0):
+    self.dataset = dataset or FakeDataset()
+    self.page_size = page_size
+    self.latency = latency
+    self.throttle_every = throttle_every
+    self.retry_after = retry_after
+    self.bulkop_polls = bulkop_polls
+    self.calls = []
+    self.bulkops = {}
+    self.uploads = []
+    self.__lock = threading.Lock()
+    self.__rand = random.Random(0)
+    self.__server = ThreadingHTTPServer((host, port), make_handler(self))
+    self.__server.daemon_threads = True
+    self.__thread = None
+
+  @property
+  def url(self):
+    """The base url for API calls, this is what you'd set as a Guru object's base_url."""
+    host, port = self.__server.server_address[:2]
+    return "http://%s:%s/api/v1" % (host, port)
+
+  @property
+  def app_url(self):
+    """The base url for content uploads, this is what you'd set as a Guru object's app_url."""
+    host, port = self.__server.server_address[:2]
+    return "http://%s:%s/app" % (host, port)
+
+  def __enter__(self):
+    return self.start()
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.stop()
+
+  def start(self):
+    """Starts handling calls on a background thread."""
+    if not self.__thread:
+      self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+      self.__thread.start()
+    return self
+
+  def stop(self):
+    if self.__thread:
+      self.__server.shutdown()
+      self.__thread.join()
+      self.__thread = None
+    self.__server.server_close()
+
+  def make_guru(self, **kwargs):
+    """Returns a Guru object that makes its calls to this server. kwargs are passed to the Guru constructor."""
+    kwargs.setdefault("silent", True)
+    g = Guru(kwargs.pop("username", "user@example.com"), kwargs.pop("api_token", "fake-token"), **kwargs)
+    g.base_url = self.url
+    g.app_url = self.app_url
+    return g
+
+  def reset_calls(self):
+    with self.__lock:
+      self.calls = []
+
+  def get_call_count(self, path=None):
+    """Returns the number of calls made, optionally only counting calls whose path matches a regex."""
+    with self.__lock:
+      if path is None:
+        return len(self.calls)
+      return len([c for c in self.calls if re.search(path, c[1])])
+
+  def record_call(self, method, path):
+    """internal: records the call and returns True if it should be throttled."""
+    with self.__lock:
+      self.calls.append((method, path))
+      return bool(self.throttle_every) and len(self.calls) % self.throttle_every == 0
+
+  def wait(self):
+    """internal: sleeps for the configured latency."""
+    if isinstance(self.latency, (tuple, list)):
+      with self.__lock:
+        delay = self.__rand.uniform(*self.latency)
+    else:
+      delay = self.latency
+    if delay:
+      time.sleep(delay)
+
+  def new_id(self):
+    """internal"""
+    with self.__lock:
+      return make_id(self.__rand)
+
+  def start_bulkop(self):
+    """internal"""
+    bulkop_id = self.new_id()
+    with self.__lock:
+      self.bulkops[bulkop_id] = self.bulkop_polls
+    return bulkop_id
+
+  def poll_bulkop(self, bulkop_id):
+    """internal: returns True once the operation is done."""
+    with self.__lock:
+      if bulkop_id not in self.bulkops:
+        return None
+      self.bulkops[bulkop_id] -= 1
+      return self.bulkops[bulkop_id] <= 0
+
+  def paginate(self, items, path, query):
+    """internal: returns (page, link header) for a list of items."""
+    offset = int(query.get("token", ["0"])[0])
+    page = items[offset:offset + self.page_size]
+    link = None
+    if offset + self.page_size < len(items):
+      next_query = {key: values[0] for key, values in query.items()}
+      next_query["token"] = offset + self.page_size
+      link = "<%s%s?%s>; rel=\"next-page\"" % (self.url, path, urlencode(next_query))
+    return page, link
+
+  def search_cards(self, body):
+    """internal: a simplified /search/cardmgr that handles collection, tag, and title filters."""
+    body = body or {}
+    collection_ids = set(body.get("collectionIds") or [])
+    expressions = (body.get("query") or {}).get("nestedExpressions", [])
+
+    results = []
+    for card in self.dataset.cards.values():
+      if collection_ids and (card["collection"] or {}).get("id") not in collection_ids:
+        continue
+      matches = True
+      for expression in expressions:
+        if expression.get("type") == "title":
+          matches = matches and expression["value"].lower() in card["preferredPhrase"].lower()
+        elif expression.get("type") == "tag":
+          matches = matches and any(t["id"] in expression["ids"] for t in card["tags"])
+      if matches:
+        results.append(card)
+    return results
+
+  def upload_content(self, route, query, body):
+    """internal: keeps a record of each uploaded zip file in `uploads`."""
+    collection_id = query.get("collectionId", [None])[0]
+    if not self.dataset.find_by_id_or_slug(self.dataset.collections, collection_id):
+      return 404, {"description": "not found"}, {}
+
+    filename = re.search(rb'filename="([^"]*)"', body or b"")
+    upload = {
+        "id": self.new_id(),
+        "route": route,
+        "collection_id": collection_id,
+        "filename": filename.group(1).decode("utf-8") if filename else None,
+        "size": len(body or b"")
+    }
+    with self.__lock:
+      self.uploads.append(upload)
+    return 200, {"id": upload["id"], "collectionId": collection_id}, {}
+
+  def handle(self, method, path, query, body):
+    """internal: returns (status, data, headers) for a call."""
+    ds = self.dataset
+    team = "/teams/%s" % ds.team_id
+
+    if method == "GET":
+      if path == "/whoami":
+        return 200, {"team": {"id": ds.team_id}, "user": {"email": "user@example.com"}}, {}
+      if path == "/collections":
+        return 200, ds.collections, {}
+      match = re.match(r"^/collections/([^/]+)$", path)
+      if match:
+        return self.__found(ds.find_by_id_or_slug(ds.collections, match.group(1)))
+      if path == "/groups":
+        return 200, ds.groups, {}
+      if path == team + "/tagcategories":
+        return 200, [ds.tag_category], {}
+      if path == "/members":
+        search = query.get("search", [""])[0].lower()
+        members = [m for m in ds.members if search in m["user"]["email"].lower()]
+        return self.__page(members, path, query)
+      if path == team + "/analytics":
+        return self.__page(ds.events, path, query)
+      match = re.match(r"^/cards/([^/]+)(/extended)?$", path)
+      if match:
+        return self.__found(ds.find_card(match.group(1)))
+      match = re.match(r"^/cards/([^/]+)/folders$", path)
+      if match:
+        card = ds.find_card(match.group(1))
+        if not card:
+          return 404, {"description": "not found"}, {}
+        return self.__page(ds.card_folders.get(card["id"], []), path, query)
+      if path == "/folders":
+        collection = query.get("collection", [None])[0]
+        folders = [f for f in ds.folders if not collection or (f["collection"] or {}).get("id") == collection]
+        return self.__page(folders, path, query)
+      match = re.match(r"^/folders/([^/]+)$", path)
+      if match:
+        return self.__found(ds.find_by_id_or_slug(ds.folders + ds.home_folders, match.group(1)))
+      match = re.match(r"^/folders/([^/]+)/items$", path)
+      if match:
+        folder = ds.find_by_id_or_slug(ds.folders + ds.home_folders, match.group(1))
+        if not folder:
+          return 404, {"description": "not found"}, {}
+        return self.__page(ds.folder_items[folder["slug"]], path, query)
+      if path == "/boards":
+        collection = query.get("collection", [None])[0]
+        boards = [{key: value for key, value in b.items() if key != "cards"}
+                  for b in ds.boards if not collection or (b["collection"] or {}).get("id") == collection]
+        return 200, boards, {}
+      if path == "/boards/home":
+        return self.__found(ds.get_home_board(query.get("collection", [None])[0]))
+      match = re.match(r"^/boards/([^/]+)$", path)
+      if match:
+        return self.__found(ds.get_board(match.group(1)))
+      match = re.match(r"^(/cards|/folders|/boards|%s)/bulkop/([^/]+)$" % re.escape(team), path)
+      if match:
+        done = self.poll_bulkop(match.group(2))
+        if done is None:
+          return 404, {"description": "not found"}, {}
+        return (200, {"status": "COMPLETE"}, {}) if done else (202, {"status": "PENDING"}, {})
+
+    elif method == "POST":
+      if path == "/search/cardmgr":
+        return self.__page(self.search_cards(body), path, query)
+      if path == "/cards/bulk":
+        ids = (body or {}).get("ids", [])
+        return 200, {id: dict(ds.cards[id], status="OK") for id in ids if id in ds.cards}, {}
+      if re.match(r"^(/cards|/folders|/boards|%s)/bulkop$" % re.escape(team), path):
+        return 202, {"id": self.start_bulkop()}, {}
+      if path == team + "/tagcategories/tags":
+        tag = {
+            "id": self.new_id(),
+            "value": (body or {}).get("value"),
+            "categoryName": ds.tag_category["name"],
+            "categoryId": ds.tag_category["id"]
+        }
+        ds.tag_category["tags"].append(tag)
+        return 200, tag, {}
+      if path == "/attachments/upload":
+        attachment_id = self.new_id()
+        return 200, {
+            "link": "https://content.api.getguru.com/files/view/%s" % attachment_id,
+            "attachmentId": attachment_id,
+            "filename": "upload",
+            "mimeType": "application/octet-stream",
+            "size": len(body or b"")
+        }, {}
+      if path == "/cards":
+        card = dict(body or {}, id=self.new_id(), slug=self.new_id()[:8])
+        ds.cards[card["id"]] = card
+        return 200, card, {}
+      match = re.match(r"^/app/(contentupload|contentsyncupload)$", path)
+      if match:
+        return self.upload_content(match.group(1), query, body)
+
+    elif method in ("PUT", "PATCH"):
+      match = re.match(r"^/cards/([^/]+)$", path)
+      if match:
+        card = ds.find_card(match.group(1))
+        if not card:
+          return 404, {"description": "not found"}, {}
+        card.update({key: value for key, value in (body or {}).items() if key != "id"})
+        return 200, card, {}
+
+    return 404, {"description": "the fake server doesn't handle %s %s" % (method, path)}, {}
+
+  def __found(self, item):
+    """internal"""
+    if item is None:
+      return 404, {"description": "not found"}, {}
+    return 200, item, {}
+
+  def __page(self, items, path, query):
+    """internal"""
+    page, link = self.paginate(items, path, query)
+    return 200, page, {"Link": link} if link else {}
+
+
+def make_handler(server):
+  """internal: makes the request handler class for a FakeGuruServer."""
+
+  class FakeGuruHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # the headers and body are written separately, without this each response
+    # can be held up by the client's delayed ack.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+      pass
+
+    def __handle(self, method):
+      parsed = urlparse(self.path)
+      path = parsed.path
+      if path.startswith("/api/v1"):
+        path = path[len("/api/v1"):]
+      query = parse_qs(parsed.query)
+
+      length = int(self.headers.get("Content-Length") or 0)
+      raw_body = self.rfile.read(length) if length else b""
+      body = None
+      if raw_body and "json" in (self.headers.get("Content-Type") or ""):
+        body = json.loads(raw_body)
+      elif raw_body:
+        body = raw_body
+
+      throttled = server.record_call(method, path)
+      server.wait()
+      if throttled:
+        status, data, headers = 429, {"description": "too many requests"}, {"Retry-After": str(server.retry_after)}
+      else:
+        status, data, headers = server.handle(method, path, query, body)
+
+      content = json.dumps(data).encode("utf-8")
+      self.send_response(status)
+      self.send_header("Content-Type", "application/json")
+      self.send_header("Content-Length", str(len(content)))
+      for name, value in headers.items():
+        self.send_header(name, value)
+      self.end_headers()
+      self.wfile.write(content)
+
+    def do_GET(self):
+      self.__handle("GET")
+
+    def do_POST(self):
+      self.__handle("POST")
+
+    def do_PUT(self):
+      self.__handle("PUT")
+
+    def do_PATCH(self):
+      self.__handle("PATCH")
+
+    def do_DELETE(self):
+      self.__handle("DELETE")
+
+  return FakeGuruHandler
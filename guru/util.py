@@ -4,6 +4,7 @@ import os
 import sys
 import json
 import time
+import random
 import yaml
 import shutil
 import requests
@@ -11,7 +12,17 @@ import pytz
 import dateutil.parser
 
 from datetime import datetime
+from email.utils import parsedate_to_datetime
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+# orjson is optional, if it's installed we use it to parse and encode API
+# bodies because it's a lot faster than the json module for large responses.
+try:
+  import orjson
+except ImportError:
+  orjson = None
 
 if sys.version_info.major >= 3:
   from urllib.parse import urljoin
@@ -29,13 +40,154 @@ TRACKING_HEADERS = {
     "X-Amzn-Trace-Id": "GApp=sdk"
 }
 
+# the default size of the connection pool each Guru object keeps. pool_connections
+# is how many hosts we keep a pool for and pool_maxsize is how many keep-alive
+# connections we keep open for each of those hosts.
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+
+def make_session(pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE, pool_block=False):
+  """
+  Makes a requests Session whose connections are pooled and kept alive, so
+  making many calls to the same host doesn't open a new TCP/TLS connection
+  for every call.
+
+  Args:
+    pool_connections (int, optional): The number of hosts to keep a connection pool for.
+    pool_maxsize (int, optional): The maximum number of connections to keep open per host.
+    pool_block (bool, optional): If True, a thread that needs a connection when all
+      of a host's connections are in use waits for one to be free. This makes
+      pool_maxsize a hard per-host limit. If False (the default), extra connections
+      are opened and discarded after use.
+
+  Returns:
+    requests.Session: a session you can make calls with.
+  """
+  session = requests.Session()
+  adapter = HTTPAdapter(
+      pool_connections=pool_connections,
+      pool_maxsize=pool_maxsize,
+      pool_block=pool_block
+  )
+  session.mount("https://", adapter)
+  session.mount("http://", adapter)
+
+  # ask for compressed responses in every format urllib3 can decode, this
+  # includes brotli if the brotli package is installed.
+  session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+  return session
+
+
+def json_loads(content):
+  """Parses a JSON body (str or bytes), using orjson if it's installed."""
+  if orjson:
+    try:
+      return orjson.loads(content)
+    except ValueError:
+      # orjson is stricter than the json module (e.g. about integers
+      # bigger than 64 bits) so we give the json module a chance too.
+      pass
+  return json.loads(content)
+
+
+def json_dumps(value):
+  """Encodes a value as a JSON body (UTF-8 bytes), using orjson if it's installed."""
+  if orjson:
+    try:
+      return orjson.dumps(value)
+    except TypeError:
+      # orjson doesn't handle some things the json module does, like
+      # dicts with non-string keys.
+      pass
+  return json.dumps(value).encode("utf-8")
+
+
+def parse_retry_after(value):
+  """
+  Parses a Retry-After header, which can either be a number of seconds
+  or an HTTP date, and returns the number of seconds to wait (or None).
+  """
+  if not value:
+    return
+  try:
+    return max(float(value), 0)
+  except ValueError:
+    pass
+  try:
+    retry_at = parsedate_to_datetime(value)
+    return max((retry_at - datetime.now(retry_at.tzinfo)).total_seconds(), 0)
+  except (TypeError, ValueError):
+    return
+
+
+class RetryPolicy:
+  """
+  Describes how the Guru object retries calls that are rate limited (429)
+  or fail with a server error (5xx) or a connection error.
+
+  Waits use exponential backoff with full jitter: after the Nth failure we
+  wait a random amount of time between 0 and `backoff * 2^N` seconds, capped
+  at `max_backoff`. If the response has a Retry-After header we wait that
+  long instead. Once the total time spent waiting would go over `max_total_wait`
+  we stop retrying and return the last response.
 
-def load_html(url, cache=False, make_links_absolute=True, headers=None):
-  """Fetches HTML from the given URL and returns it as a BeautifulSoup document object."""
+  429s are retried for every call since the server didn't do anything with
+  the request. Server errors and connection errors are only retried for calls
+  that are safe to repeat (GETs, PUTs, DELETEs and POSTs that are really reads,
+  like searches).
+
+  ```
+  import guru
+  g = guru.Guru(retry=guru.RetryPolicy(max_retries=10, max_total_wait=600))
+  ```
+
+  Args:
+    max_retries (int, optional): The most times a single call is retried. Defaults to 5.
+    backoff (float, optional): The base number of seconds for the backoff. Defaults to 0.5.
+    max_backoff (float, optional): The longest we'll wait between two attempts. Defaults to 30.
+    max_total_wait (float, optional): The total number of seconds we're willing to spend
+      waiting on one call. Defaults to 120.
+    statuses (tuple of int, optional): The server error statuses that get retried.
+  """
+
+  def __init__(self, max_retries=5, backoff=0.5, max_backoff=30, max_total_wait=120, statuses=(500, 502, 503, 504)):
+    self.max_retries = max_retries
+    self.backoff = backoff
+    self.max_backoff = max_backoff
+    self.max_total_wait = max_total_wait
+    self.statuses = statuses
+
+  def should_retry(self, attempt, status_code=None, idempotent=True):
+    """Returns True if a call that failed `attempt` times so far should be made again."""
+    if attempt >= self.max_retries:
+      return False
+    if status_code == 429:
+      return True
+    # a status_code of None means there was a connection error.
+    if status_code is None or status_code in self.statuses:
+      return idempotent
+    return False
+
+  def get_wait(self, attempt, response=None):
+    """Returns the number of seconds to wait before making the next attempt."""
+    if response is not None:
+      retry_after = parse_retry_after(response.headers.get("Retry-After"))
+      if retry_after is not None:
+        return retry_after
+    return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+
+def load_html(url, cache=False, make_links_absolute=True, headers=None, session=None, return_headers=False):
+  """
+  Fetches HTML from the given URL and returns it as a BeautifulSoup document object.
+  With `return_headers=True` the response headers are returned too.
+  """
+  response_headers = {}
   if url.startswith("http"):
-    html, status_code = http_get(url, cache, headers)
+    html, status_code, response_headers = http_get(url, cache, headers, session=session, return_headers=True)
     if status_code >= 400:
-      return "", status_code
+      return ("", status_code, response_headers) if return_headers else ("", status_code)
   else:
     html = read_file(url)
     status_code = 200
@@ -54,11 +206,17 @@ def load_html(url, cache=False, make_links_absolute=True, headers=None):
       if src:
         image.attrs["src"] = urljoin(url, src)
 
+  if return_headers:
+    return doc, status_code, response_headers
   return doc, status_code
 
 
-def http_get(url, cache=False, headers=None):
-  """Makes an HTTP GET request and returns the body content."""
+def http_get(url, cache=False, headers=None, session=None, return_headers=False):
+  """
+  Makes an HTTP GET request and returns the body content. If a session is
+  provided (e.g. the Guru object's `session`) the call reuses its pooled connections.
+  With `return_headers=True` the response headers are returned too.
+  """
   if not headers:
     headers = {}
 
@@ -72,9 +230,9 @@ def http_get(url, cache=False, headers=None):
   if cache:
     cached_content = read_file(cached_file)
     if cached_content:
-      return cached_content, 200
+      return (cached_content, 200, {}) if return_headers else (cached_content, 200)
 
-  response = requests.get(url, headers=headers)
+  response = (session or requests).get(url, headers=headers)
 
   # todo: figure out a better way to handle this.
   #       this code was originally needed for gitlab's sync but causes issues in other ones.
@@ -82,11 +240,17 @@ def http_get(url, cache=False, headers=None):
   html = response.content.decode("utf-8")
   write_file(cached_file, html)
 
+  if return_headers:
+    return html, response.status_code, response.headers
   return html, response.status_code
 
 
-def http_post(url, data=None, cache=False, headers=None):
-  """Makes an HTTP POST request and returns the body content."""
+def http_post(url, data=None, cache=False, headers=None, session=None, return_headers=False):
+  """
+  Makes an HTTP POST request and returns the body content. If a session is
+  provided the call reuses its pooled connections. With `return_headers=True`
+  the response headers are returned too.
+  """
   if not headers:
     headers = {}
 
@@ -100,26 +264,32 @@ def http_post(url, data=None, cache=False, headers=None):
   if cache:
     cached_content = read_file(cached_file)
     if cached_content:
-      return cached_content, 200
+      return (cached_content, 200, {}) if return_headers else (cached_content, 200)
 
-  response = requests.post(url, json=data, headers=headers)
+  response = (session or requests).post(url, json=data, headers=headers)
   html = response.content.decode("utf-8")
   write_file(cached_file, html)
 
+  if return_headers:
+    return html, response.status_code, response.headers
   return html, response.status_code
 
 
-def download_file(url, filename, headers=None, cache=False):
-  """Downloads an image and saves it as the full filename you provide."""
+def download_file(url, filename, headers=None, cache=False, session=None, return_headers=False):
+  """
+  Downloads an image and saves it as the full filename you provide. If a session
+  is provided the call reuses its pooled connections. With `return_headers=True`
+  the response headers are returned too.
+  """
   if cache and os.path.isfile(filename):
-    return 200, os.path.getsize(filename)
+    return (200, os.path.getsize(filename), {}) if return_headers else (200, os.path.getsize(filename))
 
   # if you're making a request to a getguru.com url, include our tracking headers.
   if "getguru.com" in url:
     for header in TRACKING_HEADERS:
       headers[header] = TRACKING_HEADERS[header]
 
-  response = requests.get(url, headers=headers, allow_redirects=True)
+  response = (session or requests).get(url, headers=headers, allow_redirects=True)
   file_size = 0
   if response.status_code == 200:
     make_dir(filename)
@@ -132,6 +302,8 @@ def download_file(url, filename, headers=None, cache=False):
         response.raw.decode_content = True
         shutil.copyfileobj(response.raw, file_out)
 
+  if return_headers:
+    return response.status_code, file_size, response.headers
   return response.status_code, file_size
 
 
@@ -194,41 +366,114 @@ def to_yaml(data):
 
 
 def find_by_name_or_id(lst, name_or_id):
+  if isinstance(lst, LookupIndex):
+    return lst.find(name_or_id)
   if not lst:
     return
 
   # it says "name or id" but we really need to check the 'title' and 'slug' properties too.
   name_or_id = (name_or_id or "").strip()
+  lowered = name_or_id.lower()
   for obj in lst:
     # some objects call it 'name', some call it 'title'.
     # for cards it's preferredPhrase but we also give them a title property.
     # for tags it's called 'value'.
-    if hasattr(obj, "name") and obj.name.strip().lower() == name_or_id.lower():
+    if hasattr(obj, "name") and obj.name.strip().lower() == lowered:
       return obj
-    if hasattr(obj, "title") and obj.title.strip().lower() == name_or_id.lower():
+    if hasattr(obj, "title") and obj.title.strip().lower() == lowered:
       return obj
-    if hasattr(obj, "value") and obj.value.strip().lower() == name_or_id.lower():
+    if hasattr(obj, "value") and obj.value.strip().lower() == lowered:
       return obj
-    if obj.id.lower() == name_or_id.lower():
+    if obj.id.lower() == lowered:
       return obj
     if hasattr(obj, "slug") and obj.slug and obj.slug.startswith(name_or_id + "/"):
       return obj
 
 
 def find_by_email(lst, email):
-  def func(obj):
-    return (obj.email or "").strip().lower() == (email or "").strip().lower()
-  filtered = [x for x in lst if func(x)]
-  if filtered:
-    return filtered[0]
+  if isinstance(lst, LookupIndex):
+    return lst.find_by_email(email)
+  email = (email or "").strip().lower()
+  for obj in lst:
+    if (obj.email or "").strip().lower() == email:
+      return obj
 
 
 def find_by_id(lst, id):
-  def func(obj):
-    return (obj.id or "").strip().lower() == (id or "").strip().lower()
-  filtered = [x for x in lst if func(x)]
-  if filtered:
-    return filtered[0]
+  if isinstance(lst, LookupIndex):
+    return lst.find_by_id(id)
+  id = (id or "").strip().lower()
+  for obj in lst:
+    if (obj.id or "").strip().lower() == id:
+      return obj
+
+
+class LookupIndex:
+  """
+  Indexes a list of objects by name, ID, slug, and email so looking one up doesn't
+  scan the whole list. It finds the same object `find_by_name_or_id`, `find_by_email`,
+  and `find_by_id` would (the first match in the list) and those functions also
+  accept a LookupIndex in place of a list.
+
+  The index doesn't notice changes to the objects or the list, so it should be
+  rebuilt when the list is loaded again.
+  """
+
+  def __init__(self, objects):
+    self.objects = list(objects)
+    self.__names = {}
+    self.__ids = {}
+    self.__slugs = {}
+    self.__emails = {}
+
+    # each key maps to (position, object) for the first object that has it, that way
+    # if an object matches by name and another matches by ID, we return the earlier one.
+    for position, obj in enumerate(self.objects):
+      entry = (position, obj)
+      for attr in ("name", "title", "value"):
+        value = getattr(obj, attr, None)
+        if isinstance(value, str):
+          self.__names.setdefault(value.strip().lower(), entry)
+
+      if getattr(obj, "id", None):
+        self.__ids.setdefault(obj.id.strip().lower(), entry)
+
+      # a slug matches if the value is the slug up to a slash, e.g. "Tbbqo5pc" matches "Tbbqo5pc/Some-Card".
+      slug = getattr(obj, "slug", None)
+      if slug:
+        index = slug.find("/")
+        while index != -1:
+          self.__slugs.setdefault(slug[:index], entry)
+          index = slug.find("/", index + 1)
+
+      email = getattr(obj, "email", None)
+      if email:
+        self.__emails.setdefault(email.strip().lower(), entry)
+
+  def __len__(self):
+    return len(self.objects)
+
+  def __iter__(self):
+    return iter(self.objects)
+
+  def find(self, name_or_id):
+    """Returns the first object whose name, title, value, ID, or slug matches, or None."""
+    name_or_id = (name_or_id or "").strip()
+    lowered = name_or_id.lower()
+    matches = [match for match in (
+        self.__names.get(lowered), self.__ids.get(lowered), self.__slugs.get(name_or_id)) if match]
+    if matches:
+      return min(matches, key=lambda match: match[0])[1]
+
+  def find_by_email(self, email):
+    match = self.__emails.get((email or "").strip().lower())
+    if match:
+      return match[1]
+
+  def find_by_id(self, id):
+    match = self.__ids.get((id or "").strip().lower())
+    if match:
+      return match[1]
 
 
 def format_timestamp(timestamp):
@@ -28,6 +28,10 @@ pub)
     open htmlcov/index.html
   fi
   ;;
+bench)
+  shift
+  python -m benchmarks.run "$@"
+  ;;
 docs)
   pydoc-markdown --bootstrap mkdocs
   pydoc-markdown --bootstrap readthedocs
@@ -43,6 +47,7 @@ docs)
   echo "  e2e -- to run only end-to-end tests"
   echo "  pub -- to run only publishing tests"
   echo "  all -- to run unit, end-to-end, and publishing tests"
+  echo "  bench -- to run the benchmarks (e.g. sh run.sh bench --scale quick)"
   echo "  docs -- to generate documentation"
   echo ""
   echo "When running tests, use -v to open the coverage report in your browser."
@@ -0,0 +1,90 @@
+import json
+import time
+import asyncio
+import threading
+import unittest
+import responses
+from unittest.mock import patch
+
+from tests.util import get_calls
+
+from guru import Guru
+from guru.aio import AsyncGuru
+
+
+class TestAio(unittest.TestCase):
+  @responses.activate
+  def test_concurrent_reads(self):
+    for i in range(1, 4):
+      responses.add(responses.GET, "https://api.getguru.com/api/v1/cards/card%s/extended" % i, json={
+        "id": "card%s" % i,
+        "preferredPhrase": "Card %s" % i
+      })
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/groups", json=[{
+      "id": "1111",
+      "name": "Experts"
+    }])
+
+    async def main():
+      async with AsyncGuru("user@example.com", "abcd", silent=True, max_concurrency=2) as g:
+        cards = await asyncio.gather(*[g.get_card("card%s" % i) for i in range(1, 4)])
+        group = await g.get_group("experts")
+        return g, cards, group
+
+    g, cards, group = asyncio.run(main())
+
+    # results come back in the order they were requested and are tied to the sync client.
+    self.assertEqual([c.title for c in cards], ["Card 1", "Card 2", "Card 3"])
+    self.assertEqual(cards[0].guru, g.guru)
+    self.assertEqual(group.id, "1111")
+    self.assertEqual(len(get_calls()), 4)
+
+  def test_close_leaves_a_guru_object_we_were_given_open(self):
+    guru_obj = Guru("user@example.com", "abcd", silent=True)
+
+    async def main():
+      async with AsyncGuru(guru=guru_obj):
+        pass
+      async with AsyncGuru("user@example.com", "abcd", silent=True) as g:
+        pass
+      return g
+
+    with patch.object(Guru, "close") as close:
+      g = asyncio.run(main())
+
+    # only the Guru object AsyncGuru created is closed.
+    self.assertEqual(close.call_count, 1)
+    self.assertIsNot(g.guru, guru_obj)
+
+  @responses.activate
+  def test_get_cards_stays_within_max_concurrency(self):
+    lock = threading.Lock()
+    state = {"running": 0, "most": 0}
+
+    def load_batch(request):
+      with lock:
+        state["running"] += 1
+        state["most"] = max(state["most"], state["running"])
+      time.sleep(0.01)
+      with lock:
+        state["running"] -= 1
+      ids = json.loads(request.body)["ids"]
+      return (200, {}, json.dumps({id: {"id": id} for id in ids}))
+
+    responses.add_callback(responses.POST, "https://api.getguru.com/api/v1/cards/bulk", callback=load_batch)
+
+    async def main():
+      async with AsyncGuru("user@example.com", "abcd", silent=True, max_concurrency=2, identity_map=True) as g:
+        results = await asyncio.gather(*[
+          g.get_cards(["%s%04d" % (prefix, i) for i in range(120)]) for prefix in "abc"
+        ])
+        return g, results
+
+    g, results = asyncio.run(main())
+
+    # three calls of three batches each only ever had two requests in flight.
+    self.assertEqual([len(cards) for cards in results], [120, 120, 120])
+    self.assertEqual(len(responses.calls), 9)
+    self.assertEqual(state["most"], 2)
+    # other options are passed along to the Guru object.
+    self.assertIsNotNone(g.guru.identity_map)
@@ -0,0 +1,21 @@
+import os
+import json
+import tempfile
+import unittest
+
+from benchmarks import run
+
+
+class TestBenchmarks(unittest.TestCase):
+  def test_quick_run_and_compare(self):
+    path = os.path.join(tempfile.mkdtemp(), "results.json")
+    self.assertEqual(run.main(["--scale", "quick", "--no-memory", "--output", path]), 0)
+
+    with open(path) as file_in:
+      results = json.load(file_in)
+    self.assertEqual(sorted(results["results"]), sorted(name for name, func in run.BENCHMARKS))
+    self.assertEqual(results["results"]["board_load"]["requests"], 3)
+
+    # a run that made more calls than the baseline is a regression.
+    baseline = {"results": {"board_load": {"wall_time": 10, "requests": 2}}}
+    self.assertEqual(run.compare(results["results"], baseline, 1.25), [("board_load", "requests", 2, 3)])
@@ -1,13 +1,20 @@
 
+import os
 import json
+import time
 import yaml
+import tempfile
+import threading
+import zipfile
 import unittest
 import responses
 
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import guru
 
+from guru.bundle import BundleNode
+
 def use_guru(username="user@example.com", api_token="abcdabcd-abcd-abcd-abcd-abcdabcdabcd", silent=True, dry_run=False):
   def wrapper(func):
     def call_func(self):
@@ -690,6 +697,92 @@ class TestBundle(unittest.TestCase):
 <img src="resources/a3957e37ef2bcbe40ae4cfa69d8a2e5e.png"/>
 </p>""")
 
+  @use_guru()
+  def test_sync_with_download_workers(self, g):
+    sync = g.bundle("test_sync_with_download_workers")
+
+    node1 = sync.node(id="1", url="https://www.example.com/1", title="node 1", content="""<p>
+<img src="https://www.example.com/a.png"/>
+<a href="https://www.example.com/2">node 2</a>
+<a href="https://files.example.com/b.pdf">file</a>
+</p>""")
+    node2 = sync.node(id="2", url="https://www.example.com/2", title="node 2", content="""<p>
+<img src="https://www.example.com/a.png"/>
+<img src="https://www.example.com/missing.png"/>
+<img src="https://www.example.com/c.png"/>
+</p>""")
+
+    lock = threading.Lock()
+    calls = []
+    running = {"count": 0, "max": 0}
+
+    # b.pdf is rate limited the first time, missing.png doesn't exist.
+    def download(url, filename, bundle, node):
+      with lock:
+        calls.append((url, node.id))
+        running["count"] += 1
+        running["max"] = max(running["max"], running["count"])
+      time.sleep(0.05)
+      with lock:
+        running["count"] -= 1
+      if url.endswith("missing.png"):
+        return (404, 0)
+      if url.endswith("b.pdf") and len([c for c in calls if c[0] == url]) == 1:
+        return (429, 0)
+      return (200, 100)
+
+    result = sync.download_resources(download, workers=4, per_host=1, retry=guru.RetryPolicy(backoff=0))
+
+    # a.png is only downloaded once and each host has one download at a time.
+    self.assertEqual(sorted(calls), [
+      ("https://files.example.com/b.pdf", "1"),
+      ("https://files.example.com/b.pdf", "1"),
+      ("https://www.example.com/a.png", "1"),
+      ("https://www.example.com/c.png", "2"),
+      ("https://www.example.com/missing.png", "2")
+    ])
+    self.assertEqual(running["max"], 2)
+    self.assertEqual(list(result.values()), [True, True, False, True])
+    self.assertEqual(list(sync.resources), [
+      "ec6099cbbb84e6fe43b27bec116c35e0.png",
+      "59eef01920606f2789f7a095dffa734c.pdf",
+      "1a4b6000bc9867befce5c4a4cb736a5c.png"
+    ])
+
+    # zip() only tries the file that didn't download again.
+    sync.zip(download_func=download, download_workers=4)
+    self.assertEqual(calls[5:], [("https://www.example.com/missing.png", "2")])
+    self.assertEqual(read_html("/tmp/test_sync_with_download_workers/cards/2.html"), """<p>
+<img src="resources/ec6099cbbb84e6fe43b27bec116c35e0.png"/>
+<img src="https://www.example.com/missing.png"/>
+<img src="resources/1a4b6000bc9867befce5c4a4cb736a5c.png"/>
+</p>""")
+
+  @use_guru()
+  def test_download_resources_doesnt_wait_on_a_busy_host(self, g):
+    sync = g.bundle("test_download_resources_doesnt_wait_on_a_busy_host")
+    sync.node(id="1", url="https://www.example.com/1", title="node 1", content="""<p>
+<img src="https://www.example.com/a.png"/>
+<img src="https://www.example.com/b.png"/>
+<img src="https://www.example.com/c.png"/>
+<img src="https://files.example.com/d.png"/>
+</p>""")
+
+    lock = threading.Lock()
+    started = []
+
+    def download(url, filename, bundle, node):
+      with lock:
+        started.append(url)
+      time.sleep(0.05)
+      return (200, 100)
+
+    sync.download_resources(download, workers=2, per_host=1)
+
+    # the second worker downloads from the other host instead of waiting for www.example.com.
+    self.assertEqual(set(started[:2]), {"https://www.example.com/a.png", "https://files.example.com/d.png"})
+    self.assertEqual(started[2:], ["https://www.example.com/b.png", "https://www.example.com/c.png"])
+
   @use_guru()
   def test_sync_with_image_we_dont_download(self, g):
     sync = g.bundle("test_sync_with_image_we_dont_download")
@@ -789,6 +882,35 @@ class TestBundle(unittest.TestCase):
 <a href="cards/1">link to 1</a>
 </p>""")
 
+  @use_guru()
+  def test_sync_with_card_to_card_link_and_compare_links(self, g):
+    sync = g.bundle("test_sync_with_card_to_card_link_and_compare_links")
+    compared = []
+
+    # links with a query string only match using compare_links.
+    def compare_links(node, url):
+      compared.append((node.id, url))
+      return node.url == url.split("?")[0]
+
+    sync.node(id="1", url="https://www.example.com/1", title="node 1", content="""<p>
+<a href="https://www.example.com/2">link to 2</a>
+<a href="https://www.example.com/3?x=1">link to 3</a>
+</p>""")
+    sync.node(id="2", url="https://www.example.com/2", title="node 2", content="node 2")
+    sync.node(id="3", url="https://www.example.com/3", title="node 3", content="node 3")
+    sync.zip(compare_links=compare_links)
+
+    self.assertEqual(read_html("/tmp/test_sync_with_card_to_card_link_and_compare_links/cards/1.html"), """<p>
+<a href="cards/2">link to 2</a>
+<a href="cards/3">link to 3</a>
+</p>""")
+    # the first link is found in the index so compare_links is only used for the second one.
+    self.assertEqual(compared, [
+      ("1", "https://www.example.com/3?x=1"),
+      ("2", "https://www.example.com/3?x=1"),
+      ("3", "https://www.example.com/3?x=1")
+    ])
+
   @use_guru()
   def test_sync_with_complex_html(self, g):
     sync = g.bundle("test_sync_with_complex_html")
@@ -883,6 +1005,93 @@ class TestBundle(unittest.TestCase):
 <img src="resources/fc82d6ce26e49cd7415aec38ff402de7.png"/>
 </p>""")
 
+  @use_guru()
+  def test_sync_with_workers(self, g):
+    # build the same bundle twice, cleaning up the html serially and in worker processes.
+    def make_bundle(name):
+      sync = g.bundle(name)
+      html_file = "./tests/test_sync_with_local_files_node1.html"
+      sync.node(id="1", url=html_file, title="node 1", content=read_html(html_file))
+      for i in range(2, 6):
+        sync.node(id=str(i), url="https://www.example.com/%s" % i, title="node %s" % i, content="""<p>
+<a href="https://www.example.com/%s">next</a>
+<img src="//www.example.com/%s.png"/>
+</p>""" % (i + 1, i))
+      return sync
+
+    serial = make_bundle("test_sync_with_workers_serial")
+    serial.zip()
+    parallel = make_bundle("test_sync_with_workers_parallel")
+    parallel.zip(workers=2)
+
+    for i in range(1, 6):
+      self.assertEqual(
+        read_html("/tmp/test_sync_with_workers_parallel/cards/%s.html" % i),
+        read_html("/tmp/test_sync_with_workers_serial/cards/%s.html" % i)
+      )
+    self.assertEqual(read_html("/tmp/test_sync_with_workers_parallel/cards/2.html"), """<p>
+<a href="cards/3">next</a>
+<img src="https://www.example.com/2.png"/>
+</p>""")
+    self.assertEqual(parallel.resources, serial.resources)
+    self.assertEqual(list(parallel.resources), ["fc82d6ce26e49cd7415aec38ff402de7.png"])
+    self.assertEqual(
+      [e["message"] for e in parallel.events],
+      [e["message"] for e in serial.events]
+    )
+
+  @use_guru()
+  def test_sync_with_workers_copies_each_local_file_once(self, g):
+    sync = g.bundle("test_sync_with_workers_copies")
+    html_file = "./tests/test_sync_with_local_files_node1.html"
+    for i in range(1, 4):
+      sync.node(id=str(i), url=html_file, title="node %s" % i, content=read_html(html_file))
+
+    with patch("guru.bundle.copy_file", wraps=guru.bundle.copy_file) as copy_file:
+      sync.zip(workers=2)
+
+    # the image is copied before the workers start, not once per card.
+    self.assertEqual(
+      [c.args[0] for c in copy_file.call_args_list if c.args[0].startswith("tests/")],
+      ["tests/test_sync_with_local_files_test.png"])
+    self.assertEqual(list(sync.resources), ["fc82d6ce26e49cd7415aec38ff402de7.png"])
+    for i in range(1, 4):
+      self.assertIn("resources/", read_html("/tmp/test_sync_with_workers_copies/cards/%s.html" % i))
+
+  @use_guru()
+  def test_sync_with_stream(self, g):
+    def make_bundle(name):
+      sync = g.bundle(name, clear=True)
+      html_file = "./tests/test_sync_with_local_files_node1.html"
+      node1 = sync.node(id="1", url=html_file, title="node 1", content=read_html(html_file))
+      node2 = sync.node(id="2", url="https://www.example.com/2", title="node 2", content="<p>card 2</p>")
+      node2.add_to(sync.node(id="3", title="folder"))
+      return sync
+
+    def read_zip(filename):
+      with zipfile.ZipFile(filename) as zip_file:
+        return {name: zip_file.read(name) for name in zip_file.namelist()}
+
+    make_bundle("test_sync_with_stream_files").zip()
+    make_bundle("test_sync_with_stream").zip(stream=True, keep_files=False)
+
+    files = read_zip("/tmp/collection_test_sync_with_stream.zip")
+    self.assertEqual(sorted(files), [
+      "cards/1.html",
+      "cards/1.yaml",
+      "cards/2.html",
+      "cards/2.yaml",
+      "collection.yaml",
+      "folders/3.yaml",
+      "resources/fc82d6ce26e49cd7415aec38ff402de7.png"
+    ])
+    self.assertEqual(files, read_zip("/tmp/collection_test_sync_with_stream_files.zip"))
+
+    # with keep_files=False, only the resources and the log are written to the folder.
+    with self.assertRaises(FileNotFoundError):
+      read_html("/tmp/test_sync_with_stream/cards/1.html")
+    self.assertTrue(os.path.isfile("/tmp/test_sync_with_stream/log.csv"))
+
   @use_guru()
   def test_sync_with_tags_and_board_descriptions(self, g):
     sync = g.bundle("test_sync_with_tags_and_board_descriptions")
@@ -1425,6 +1634,33 @@ class TestBundle(unittest.TestCase):
     with self.assertRaises(FileNotFoundError):
       read_html("/tmp/test_removing_a_node/cards/2.yaml")
 
+  @use_guru()
+  def test_node_lookups(self, g):
+    bundle = g.bundle("test_node_lookups")
+    node1 = bundle.node(id="a/1", title="node 1")
+    node2 = bundle.node(id=2, title="node 2")
+
+    self.assertIs(bundle.node(id="a_1"), node1)
+    self.assertIs(bundle.node(id="2", content="updated"), node2)
+    self.assertEqual(node2.content, "updated")
+    self.assertTrue(bundle.has_node("a/1"))
+    self.assertTrue(bundle.has_node(2))
+    self.assertFalse(bundle.has_node("3"))
+
+    node1.remove()
+    self.assertFalse(bundle.has_node("a_1"))
+    self.assertIsNot(bundle.node(id="a_1"), node1)
+
+    # replacing the list keeps lookups working, and if two nodes have the same
+    # ID, removing the first one makes lookups find the second one.
+    other_node2 = BundleNode("2", bundle)
+    bundle.nodes = [node2, other_node2]
+    self.assertFalse(bundle.has_node("a_1"))
+    self.assertIs(bundle.node(id="2"), node2)
+    bundle.remove_node(node2)
+    self.assertIs(bundle.node(id="2"), other_node2)
+    self.assertEqual(bundle.nodes, [other_node2])
+
   @use_guru()
   def test_handling_a_table_inside_a_list(self, g):
     bundle = g.bundle("test_handling_a_table_inside_a_list")
@@ -1711,3 +1947,24 @@ it's multiple lines
     bundle.zip()
 
     self.assertEqual(read_html("/tmp/test_removing_empty_lists_and_list_items/cards/1.html"), new_html)
+
+  @use_guru()
+  @responses.activate
+  def test_http_get_retries_429s_with_retry_after(self, g):
+    # http_get caches what it loads in ./cache, so we run this in a temporary directory.
+    self.addCleanup(os.chdir, os.getcwd())
+    os.chdir(tempfile.mkdtemp())
+
+    bundle = g.bundle("test_http_get_retries_429s_with_retry_after")
+    responses.add(responses.GET, "https://www.example.com/page", status=429, headers={"Retry-After": "0"})
+    responses.add(responses.GET, "https://www.example.com/page", body="page content")
+    responses.add(responses.GET, "https://www.example.com/limited", status=429, headers={"Retry-After": "0"})
+
+    self.assertEqual(bundle.http_get("https://www.example.com/page"), "page content")
+    self.assertEqual(
+      [e.get("wait") for e in bundle.events if e["message"] == "got a 429 response"], [0])
+
+    # the retry policy decides when we stop trying.
+    bundle.http_get("https://www.example.com/limited", retry=guru.RetryPolicy(max_retries=2))
+    self.assertEqual(len([c for c in responses.calls if c.request.url.endswith("/limited")]), 3)
+    self.assertEqual(bundle.events[-1]["message"], "http_get response")
@@ -118,3 +118,148 @@ class TestCore(unittest.TestCase):
       "method": "GET",
       "url": "https://api.getguru.com/api/v1/teams/abcd/analytics?token=1"
     }])
+
+  @responses.activate
+  def test_connection_pooling(self):
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/groups", json=[])
+    responses.add(responses.GET, "https://www.example.com/test", body="test")
+
+    with guru.Guru("user@example.com", "abcd", silent=True, pool_maxsize=4, pool_block=True) as g:
+      adapter = g.session.get_adapter("https://api.getguru.com")
+      self.assertEqual(adapter._pool_maxsize, 4)
+      self.assertEqual(adapter._pool_block, True)
+
+      # both calls go through the same session, but only the guru call sends our credentials.
+      g.get_groups()
+      g.bundle("pooling").http_get("https://www.example.com/test")
+
+    self.assertIn("Authorization", responses.calls[0].request.headers)
+    self.assertNotIn("Authorization", responses.calls[1].request.headers)
+
+  @responses.activate
+  def test_retries_resume_pagination(self):
+    g = guru.Guru("user@example.com", "abcd", silent=True, retry=guru.RetryPolicy(backoff=0))
+
+    # the second page fails twice (once rate limited, once with a server error) before it loads.
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/members?search=", json=[{}, {}], headers={
+      "Link": "< https://api.getguru.com/api/v1/members?token=1>"
+    })
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/members?token=1", status=429, headers={
+      "Retry-After": "0"
+    })
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/members?token=1", status=503)
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/members?token=1", json=[{}])
+
+    self.assertEqual(len(g.get_members()), 3)
+    self.assertEqual([c["url"] for c in get_calls()], [
+      "https://api.getguru.com/api/v1/members?search=",
+      "https://api.getguru.com/api/v1/members?token=1",
+      "https://api.getguru.com/api/v1/members?token=1",
+      "https://api.getguru.com/api/v1/members?token=1"
+    ])
+
+  @responses.activate
+  def test_retries_give_up_and_keep_loaded_pages(self):
+    g = guru.Guru("user@example.com", "abcd", silent=True, retry=guru.RetryPolicy(max_retries=2, backoff=0))
+
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/members?search=", json=[{}, {}], headers={
+      "Link": "< https://api.getguru.com/api/v1/members?token=1>"
+    })
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/members?token=1", status=500)
+
+    with self.assertRaises(guru.PaginationError) as context:
+      g.get_members()
+
+    self.assertEqual(len(context.exception.results), 2)
+    self.assertEqual(context.exception.url, "https://api.getguru.com/api/v1/members?token=1")
+    self.assertEqual(len(get_calls()), 4)
+
+  @responses.activate
+  def test_posts_are_only_retried_when_rate_limited(self):
+    g = guru.Guru("user@example.com", "abcd", silent=True, retry=guru.RetryPolicy(backoff=0))
+
+    responses.add(responses.POST, "https://api.getguru.com/api/v1/cards/1111/unverify", status=500)
+    self.assertFalse(g.unverify_card(guru.Card({"id": "1111"})))
+    self.assertEqual(len(get_calls()), 1)
+
+  @use_guru()
+  @responses.activate
+  def test_iter_members_yields_page_by_page(self, g):
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/members?search=", json=[
+      {"user": {"email": "a@example.com"}}, {"user": {"email": "b@example.com"}}
+    ], headers={
+      "Link": "< https://api.getguru.com/api/v1/members?token=1>"
+    })
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/members?token=1", json=[
+      {"user": {"email": "c@example.com"}}
+    ])
+
+    users = g.iter_members()
+    first = next(users)
+    self.assertEqual(first.email, "a@example.com")
+    self.assertEqual([u.email for u in users], ["b@example.com", "c@example.com"])
+    self.assertEqual(len(get_calls()), 2)
+
+  @use_guru()
+  @responses.activate
+  def test_iter_cards_posts_the_same_query_as_find_cards(self, g):
+    responses.add(responses.POST, "https://api.getguru.com/api/v1/search/cardmgr", match_querystring=True, json=[
+      {"id": "1111"}, {"id": "2222"}
+    ], headers={
+      "Link": "< https://api.getguru.com/api/v1/search/cardmgr?token=1>"
+    })
+    responses.add(responses.POST, "https://api.getguru.com/api/v1/search/cardmgr?token=1", json=[
+      {"id": "3333"}
+    ])
+
+    cards = list(g.iter_cards(title="test"))
+    self.assertEqual([c.id for c in cards], ["1111", "2222", "3333"])
+
+    calls = get_calls()
+    self.assertEqual(len(calls), 2)
+    self.assertEqual(calls[0]["body"], calls[1]["body"])
+    self.assertEqual(calls[0]["body"]["query"]["nestedExpressions"], [{
+      "type": "title",
+      "value": "test",
+      "op": "CONTAINS"
+    }])
+
+  @use_guru()
+  @responses.activate
+  def test_iter_events_stops_at_max_pages(self, g):
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/whoami", json={"team": {"id": "1234"}})
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/teams/1234/analytics?fromDate=&toDate=", json=[
+      {}, {}
+    ], headers={
+      "Link": "< https://api.getguru.com/api/v1/teams/1234/analytics?token=1>"
+    })
+
+    self.assertEqual(len(list(g.iter_events(max_pages=1))), 2)
+    self.assertEqual(len(get_calls()), 2)
+
+  @responses.activate
+  def test_request_hooks_and_stats(self):
+    g = guru.Guru("user@example.com", "abcd", silent=True, retry=guru.RetryPolicy(backoff=0))
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/cards/Tbbqo5pc/extended", status=503)
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/cards/Tbbqo5pc/extended", json={"id": "1111"})
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/cards/abcd1234-abcd-abcd-abcd-abcdabcdabcd/extended", json={"id": "2222"})
+
+    before = []
+    after = []
+    g.on_request(lambda info: before.append(info.key))
+    g.on_response(lambda info: after.append((info.key, info.status_code, info.retries, info.bytes)))
+
+    g.get_card("Tbbqo5pc")
+    g.get_card("abcd1234-abcd-abcd-abcd-abcdabcdabcd")
+
+    self.assertEqual(before, ["GET /cards/{id}/extended"] * 2)
+    self.assertEqual(after, [
+      ("GET /cards/{id}/extended", 200, 1, 14),
+      ("GET /cards/{id}/extended", 200, 0, 14)
+    ])
+
+    stats = g.stats()["endpoints"]["GET /cards/{id}/extended"]
+    self.assertEqual(stats["calls"], 2)
+    self.assertEqual(stats["retries"], 1)
+    self.assertEqual(stats["statuses"], {200: 2})
+    self.assertEqual(sum(stats["histogram"].values()), 2)
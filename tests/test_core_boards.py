@@ -1,8 +1,9 @@
-
 import json
 import yaml
 import time
+import threading
 import unittest
+import requests
 import responses
 
 from unittest.mock import Mock, patch
@@ -130,8 +131,13 @@ class TestCore(unittest.TestCase):
     responses.add(responses.GET, "https://api.getguru.com/api/v1/boards/1234", json={
       "items": board_items
     })
-    responses.add(responses.POST, "https://api.getguru.com/api/v1/cards/bulk", json=first_batch)
-    responses.add(responses.POST, "https://api.getguru.com/api/v1/cards/bulk", json=second_batch)
+    # the two batches are loaded in parallel so we can't rely on the order of the calls.
+    def bulk_callback(request):
+      ids = json.loads(request.body)["ids"]
+      batch = first_batch if ids[0] in first_batch else second_batch
+      return (200, {}, json.dumps(batch))
+
+    responses.add_callback(responses.POST, "https://api.getguru.com/api/v1/cards/bulk", callback=bulk_callback)
 
     board = g.get_board("test")
 
@@ -140,7 +146,9 @@ class TestCore(unittest.TestCase):
     self.assertEqual(board.cards[75].title, "card 75")
     self.assertEqual(board.cards[105].title, "card 105")
 
-    self.assertEqual(get_calls(), [{
+    calls = get_calls()
+    calls[2:] = sorted(calls[2:], key=lambda call: len(call["body"]["ids"]), reverse=True)
+    self.assertEqual(calls, [{
       "method": "GET",
       "url": "https://api.getguru.com/api/v1/boards"
     }, {
@@ -160,6 +168,89 @@ class TestCore(unittest.TestCase):
       }
     }])
 
+  @use_guru()
+  @responses.activate
+  def test_get_lazy_board(self, g):
+    board_items = [{"type": "fact", "preferredPhrase": "card %s" % i, "id": str(i)} for i in range(50)]
+    board_items.append({
+      "type": "section",
+      "id": "section",
+      "items": [{"type": "fact", "id": "50", "itemId": "item50"}]
+    })
+    board_items.append({"type": "fact", "id": "50", "itemId": "item50b"})
+
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/boards/abcdabcd-abcd-abcd-abcd-abcdabcdabcd", json={
+      "items": board_items
+    })
+    responses.add(responses.POST, "https://api.getguru.com/api/v1/cards/bulk", json={
+      "50": {"id": "50", "preferredPhrase": "card 50"}
+    })
+
+    board = g.get_board("abcdabcd-abcd-abcd-abcd-abcdabcdabcd", lazy=True)
+    self.assertFalse(board.is_loaded)
+    self.assertEqual(len(responses.calls), 1)
+
+    # the card is on the board twice so each copy keeps its own item id.
+    self.assertEqual(len(board.cards), 52)
+    self.assertTrue(board.is_loaded)
+    self.assertEqual(board.sections[0].items[0].title, "card 50")
+    self.assertEqual(board.sections[0].items[0].item_id, "item50")
+    self.assertEqual(board.items[-1].title, "card 50")
+    self.assertEqual(board.items[-1].item_id, "item50b")
+    self.assertIs(board.cards[50], board.all_items[51])
+    self.assertEqual(get_calls()[1]["body"], {"ids": ["50"]})
+
+  @responses.activate
+  def test_get_lazy_board_when_loading_cards_fails(self):
+    g = guru.Guru("user@example.com", "abcd", silent=True, retry=False)
+    board_items = [{"type": "fact", "preferredPhrase": "card %s" % i, "id": str(i)} for i in range(50)]
+    board_items.append({"type": "fact", "id": "50", "itemId": "item50"})
+
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/boards/abcdabcd-abcd-abcd-abcd-abcdabcdabcd", json={
+      "items": board_items
+    })
+    responses.add(responses.POST, "https://api.getguru.com/api/v1/cards/bulk",
+                  body=requests.exceptions.ConnectionError("connection refused"))
+    responses.add(responses.POST, "https://api.getguru.com/api/v1/cards/bulk", json={
+      "50": {"id": "50", "preferredPhrase": "card 50"}
+    })
+
+    board = g.get_board("abcdabcd-abcd-abcd-abcd-abcdabcdabcd", lazy=True)
+    with self.assertRaises(requests.exceptions.ConnectionError):
+      board.cards
+
+    # the board still has a partial card so the next read tries again.
+    self.assertFalse(board.is_loaded)
+    self.assertEqual(board.cards[-1].title, "card 50")
+    self.assertTrue(board.is_loaded)
+
+  @use_guru()
+  @responses.activate
+  def test_get_lazy_board_from_two_threads(self, g):
+    board_items = [{"type": "fact", "preferredPhrase": "card %s" % i, "id": str(i)} for i in range(50)]
+    board_items.append({"type": "fact", "id": "50", "itemId": "item50"})
+
+    def bulk(request):
+      time.sleep(0.2)
+      return (200, {}, json.dumps({"50": {"id": "50", "preferredPhrase": "card 50"}}))
+
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/boards/abcdabcd-abcd-abcd-abcd-abcdabcdabcd", json={
+      "items": board_items
+    })
+    responses.add_callback(responses.POST, "https://api.getguru.com/api/v1/cards/bulk", callback=bulk)
+
+    board = g.get_board("abcdabcd-abcd-abcd-abcd-abcdabcdabcd", lazy=True)
+    titles = []
+    threads = [threading.Thread(target=lambda: titles.append(board.cards[-1].title)) for _ in range(2)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+
+    # the second thread waits for the first one's load instead of seeing a partial card.
+    self.assertEqual(titles, ["card 50", "card 50"])
+    self.assertEqual(len(get_calls()), 2)
+
   @use_guru()
   @responses.activate
   def test_make_board(self, g):
@@ -1450,9 +1541,11 @@ class TestCore(unittest.TestCase):
     }, status=202)
     responses.add(responses.GET, "https://api.getguru.com/api/v1/boards/bulkop/2222", status=204)
 
-    with patch("time.sleep", Mock(return_value=None)):
-      board = g.get_board("11111111-1111-1111-1111-111111111111")
-      board.move_to_collection("General", timeout=3)
+    # poll after 0.1s, then again at the 0.3s timeout.
+    g.bulk_operations.min_interval = 0.1
+    g.bulk_operations.backoff = 2
+    board = g.get_board("11111111-1111-1111-1111-111111111111")
+    self.assertFalse(board.move_to_collection("General", timeout=0.3))
 
     self.assertEqual(get_calls(), [{
       "method": "GET",
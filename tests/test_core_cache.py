@@ -1,8 +1,14 @@
 
+import gc
+import os
 import json
+import time
 import yaml
+import tempfile
+import threading
 import unittest
 import responses
+from unittest.mock import patch
 
 from tests.util import use_guru, get_calls
 
@@ -30,7 +36,9 @@ class TestCoreCache(unittest.TestCase):
       "url": "https://api.getguru.com/api/v1/groups"
     }])
 
-    # if we use cache=True this won't make another call.
+    # calls without the cache don't store anything, so the first cache=True call
+    # makes a request and the second one is served from the cache.
+    g.get_group("group name", cache=True)
     g.get_group("group name", cache=True)
     self.assertEqual(get_calls(), [{
       "method": "GET",
@@ -38,6 +46,9 @@ class TestCoreCache(unittest.TestCase):
     }, {
       "method": "GET",
       "url": "https://api.getguru.com/api/v1/groups"
+    }, {
+      "method": "GET",
+      "url": "https://api.getguru.com/api/v1/groups"
     }])
 
   @use_guru()
@@ -103,3 +114,263 @@ class TestCoreCache(unittest.TestCase):
         "user@example.com"
       ]
     }])
+
+  @responses.activate
+  def test_cache_evicts_and_reports_stats(self):
+    g = guru.Guru("user@example.com", "abcd", silent=True, response_cache=guru.ResponseCache(max_entries=2))
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/groups", json=[])
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/collections", json=[])
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/members?search=", json=[])
+
+    g.get_groups(cache=True)
+    g.get_collections(cache=True)
+    g.get_members(cache=True)
+
+    # groups were the least recently used entry so they were evicted to make room for members.
+    self.assertNotIn("https://api.getguru.com/api/v1/groups", g.response_cache)
+    self.assertIn("https://api.getguru.com/api/v1/members?search=", g.response_cache)
+    self.assertEqual(g.response_cache.stats()["evictions"], 1)
+    self.assertEqual(g.response_cache.stats()["entries"], 2)
+
+  @responses.activate
+  def test_cache_ttls(self):
+    cache = guru.ResponseCache(default_ttl=None, ttls=[(r"/groups$", 0)])
+    g = guru.Guru("user@example.com", "abcd", silent=True, response_cache=cache)
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/groups", json=[])
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/collections", json=[])
+
+    # groups expire immediately so the second call isn't served from the cache.
+    g.get_groups(cache=True)
+    g.get_groups(cache=True)
+    g.get_collections(cache=True)
+    g.get_collections(cache=True)
+
+    self.assertEqual(len(get_calls()), 3)
+    self.assertEqual(cache.stats()["hits"], 1)
+    self.assertEqual(cache.stats()["expirations"], 1)
+
+  @responses.activate
+  def test_cache_stores_parsed_json_and_not_errors(self):
+    g = guru.Guru("user@example.com", "abcd", silent=True)
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/boards/11111111", status=404)
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/boards", json=[])
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/groups", json=[{"id": "1111", "name": "Experts"}])
+
+    g.get_board("11111111", cache=True)
+    g.get_groups(cache=True)
+
+    self.assertNotIn("https://api.getguru.com/api/v1/boards/11111111", g.response_cache)
+    cached = g.response_cache.get("https://api.getguru.com/api/v1/groups")
+    self.assertIsInstance(cached, guru.CachedResponse)
+    self.assertEqual(cached.json(), [{"id": "1111", "name": "Experts"}])
+
+  @responses.activate
+  def test_cache_only_stores_when_asked_and_hands_out_copies(self):
+    g = guru.Guru("user@example.com", "abcd", silent=True)
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/groups", json=[{"id": "1111", "name": "Experts"}])
+
+    g.get_groups()
+    self.assertNotIn("https://api.getguru.com/api/v1/groups", g.response_cache)
+
+    # changing the data we got back doesn't change what's in the cache.
+    g.get_groups(cache=True)[0].name = "edited"
+    g.response_cache.get("https://api.getguru.com/api/v1/groups").json()[0]["name"] = "edited"
+    self.assertEqual(g.get_groups(cache=True)[0].name, "Experts")
+    self.assertEqual(len(get_calls()), 2)
+
+  @responses.activate
+  def test_uncached_paged_loads_arent_encoded(self):
+    g = guru.Guru("user@example.com", "abcd", silent=True)
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/members?search=", json=[{
+      "user": {"email": "user@example.com"}
+    }])
+
+    with patch("guru.cache.json_dumps", wraps=guru.cache.json_dumps) as json_dumps:
+      members = g.get_members()
+      self.assertEqual(json_dumps.call_count, 0)
+      g.get_members(cache=True)
+      self.assertEqual(json_dumps.call_count, 1)
+
+    self.assertEqual([m.email for m in members], ["user@example.com"])
+    self.assertEqual(g.get_members(cache=True)[0].email, "user@example.com")
+    self.assertEqual(len(get_calls()), 2)
+
+  @responses.activate
+  def test_disk_cache_revalidates_with_etags(self):
+    path = os.path.join(tempfile.mkdtemp(), "cache.sqlite")
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/collections",
+                  json=[{"id": "1234", "name": "General"}], headers={"ETag": "\"v1\""})
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/collections", status=304)
+
+    with guru.Guru("user@example.com", "abcd", silent=True, disk_cache=path) as g:
+      g.get_collections()
+
+    # a new Guru object, like the next run of a script, sends the etag and reuses the data.
+    with guru.Guru("user@example.com", "abcd", silent=True, disk_cache=path) as g:
+      collections = g.get_collections()
+
+    self.assertEqual([c.name for c in collections], ["General"])
+    self.assertEqual(len(responses.calls), 2)
+    self.assertNotIn("If-None-Match", responses.calls[0].request.headers)
+    self.assertEqual(responses.calls[1].request.headers["If-None-Match"], "\"v1\"")
+
+  @responses.activate
+  def test_disk_cache_uses_ttl_without_validators(self):
+    path = os.path.join(tempfile.mkdtemp(), "cache.sqlite")
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/groups", json=[{"id": "1111", "name": "Experts"}])
+
+    with guru.Guru("user@example.com", "abcd", silent=True, disk_cache=path) as g:
+      g.get_groups(cache=True)
+    with guru.Guru("user@example.com", "abcd", silent=True, disk_cache=path) as g:
+      groups = g.get_groups(cache=True)
+    # different credentials don't share entries.
+    with guru.Guru("other@example.com", "efgh", silent=True, disk_cache=path) as g:
+      g.get_groups(cache=True)
+
+    self.assertEqual([group.name for group in groups], ["Experts"])
+    self.assertEqual(len(get_calls()), 2)
+    self.assertEqual(len(guru.DiskCache(path)), 2)
+
+  @responses.activate
+  def test_disk_cache_writes_and_evicts(self):
+    path = os.path.join(tempfile.mkdtemp(), "cache.sqlite")
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/groups", json=[{"id": "1111", "name": "Experts"}])
+
+    # a response we can't revalidate is only stored when you ask for cached data.
+    with guru.Guru("user@example.com", "abcd", silent=True, disk_cache=path) as g:
+      g.get_groups()
+    self.assertEqual(len(guru.DiskCache(path)), 0)
+
+    # once there are too many entries the ones used longest ago are removed.
+    cache = guru.DiskCache(path, max_entries=2)
+    response = guru.CachedResponse(200, {}, [{"id": "1111"}])
+    for url in ["/a", "/b", "/a", "/c"]:
+      cache.set("identity", url, response)
+    self.assertEqual(len(cache), 2)
+    self.assertIsNone(cache.get("identity", "/b"))
+    self.assertEqual(cache.get("identity", "/a").data, [{"id": "1111"}])
+    cache.delete("identity", "/a")
+    cache.set("identity", "/d", response)
+    self.assertEqual(len(cache), 2)
+    self.assertIsNotNone(cache.get("identity", "/c"))
+
+  @responses.activate
+  def test_concurrent_gets_share_one_call(self):
+    g = guru.Guru("user@example.com", "abcd", silent=True)
+
+    def whoami(request):
+      time.sleep(0.2)
+      return (200, {}, json.dumps({"team": {"id": "1234"}}))
+
+    responses.add_callback(responses.GET, "https://api.getguru.com/api/v1/whoami", callback=whoami)
+
+    team_ids = []
+    threads = [threading.Thread(target=lambda: team_ids.append(g.get_team_id())) for _ in range(5)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+
+    self.assertEqual(team_ids, ["1234"] * 5)
+    self.assertEqual(len(get_calls()), 1)
+
+  @responses.activate
+  def test_identity_map(self):
+    g = guru.Guru("user@example.com", "abcd", silent=True, identity_map=True)
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/cards/1111/extended", json={
+      "id": "1111", "preferredPhrase": "old title", "version": 1
+    })
+    responses.add(responses.POST, "https://api.getguru.com/api/v1/search/cardmgr", json=[{
+      "id": "1111", "preferredPhrase": "old title", "version": 1
+    }])
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/cards/1111/extended", json={
+      "id": "1111", "preferredPhrase": "new title", "version": 2
+    })
+
+    card = g.get_card("1111")
+    card.title = "edited"
+
+    # the same version gives us back the same object, as it is.
+    self.assertIs(g.find_cards()[0], card)
+    self.assertEqual(card.title, "edited")
+
+    # a new version updates the object we already have.
+    self.assertIs(g.get_card("1111"), card)
+    self.assertEqual(card.title, "new title")
+    self.assertEqual(g.identity_map.refreshes, 1)
+
+    # it doesn't keep objects alive.
+    del card
+    gc.collect()
+    self.assertIsNone(g.identity_map.get(guru.Card, "1111"))
+
+  def test_identity_map_can_be_shared(self):
+    # an IdentityMap you pass in is used even while it's empty.
+    identity_map = guru.IdentityMap()
+    g1 = guru.Guru("user@example.com", "abcd", silent=True, identity_map=identity_map)
+    g2 = guru.Guru("user@example.com", "abcd", silent=True, identity_map=identity_map)
+    self.assertIs(g1.identity_map, identity_map)
+    self.assertIs(g2.identity_map, identity_map)
+    self.assertIsNone(guru.Guru("user@example.com", "abcd", silent=True).identity_map)
+
+  @responses.activate
+  def test_identity_map_with_board_cards(self):
+    g = guru.Guru("user@example.com", "abcd", silent=True, identity_map=True)
+    card_data = {"id": "1111", "preferredPhrase": "card", "version": 1}
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/cards/1111/extended", json=card_data)
+    for last_modified in ["1", "2"]:
+      responses.add(responses.GET, "https://api.getguru.com/api/v1/boards/abcd1234", json={
+        "id": "abcd1234",
+        "lastModified": last_modified,
+        "items": [
+          dict(card_data, type="fact", itemId="i1"),
+          {"type": "section", "id": "s1", "items": [dict(card_data, type="fact", itemId="i2")]}
+        ]
+      })
+
+    card = g.get_card("1111")
+    board = g.get_board("abcd1234")
+    first, second = board.cards
+    first.note = "checked"
+
+    # each place the card appears is its own object so it keeps its own item id.
+    self.assertIsNot(first, card)
+    self.assertIsNot(first, second)
+    self.assertEqual([c.lite_json()["itemId"] for c in board.cards], ["i1", "i2"])
+    self.assertIs(g.identity_map.get(guru.Card, "1111", "i2"), second)
+
+    # a newer version of the board reuses the same board and card objects.
+    self.assertIs(g.get_board("abcd1234"), board)
+    self.assertEqual(board.last_modified, "2")
+    self.assertIs(board.cards[0], first)
+    self.assertIs(board.cards[1], second)
+    self.assertEqual(first.note, "checked")
+
+  def test_identity_map_keeps_full_data_over_partial_data(self):
+    identity_map = guru.IdentityMap()
+    card = identity_map.load(guru.Card, {"id": "1111", "preferredPhrase": "card", "version": 1})
+    self.assertIs(identity_map.load(guru.Card, {"id": "1111"}), card)
+    self.assertEqual(card.title, "card")
+    self.assertEqual(identity_map.refreshes, 0)
+
+  @responses.activate
+  def test_identity_map_with_a_lazy_board(self):
+    g = guru.Guru("user@example.com", "abcd", silent=True, identity_map=True)
+    board_items = [{"type": "fact", "preferredPhrase": "card %s" % i, "id": str(i), "version": 1} for i in range(50)]
+    board_items.append({"type": "fact", "id": "50", "itemId": "item50"})
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/boards/abcd1234", json={
+      "id": "abcd1234", "lastModified": "1", "items": board_items
+    })
+    responses.add(responses.POST, "https://api.getguru.com/api/v1/cards/bulk", json={
+      "50": {"id": "50", "preferredPhrase": "card 50", "version": 3, "owner": {"email": "owner@example.com"}}
+    })
+
+    board = g.get_board("abcd1234", lazy=True)
+    partial_card = g.identity_map.get(guru.Card, "50", "item50")
+
+    # the partial card is filled in where it is instead of being replaced.
+    self.assertIs(board.cards[-1], partial_card)
+    self.assertEqual(partial_card.title, "card 50")
+    self.assertEqual(partial_card.item_id, "item50")
+    self.assertEqual(partial_card.owner.email, "owner@example.com")
+    self.assertIsNot(partial_card, g.identity_map.get(guru.Card, "50"))
@@ -9,6 +9,7 @@ from unittest.mock import Mock, patch
 from tests.util import use_guru, get_calls
 
 import guru
+from guru.data_objects import lazy_attribute
 
 
 def read_file(filename):
@@ -1462,6 +1463,55 @@ this card has a <a href="https://www.example.com">guru markdown block</a>.
       }
     }])
 
+  @use_guru()
+  @responses.activate
+  def test_restore_cards_without_waiting(self, g):
+    responses.add(responses.POST, "https://api.getguru.com/api/v1/cards/bulkop", json={
+      "id": "2222"
+    }, status=202)
+    responses.add(responses.POST, "https://api.getguru.com/api/v1/cards/bulkop", json={
+      "id": "3333"
+    }, status=202)
+    responses.add(responses.POST, "https://api.getguru.com/api/v1/cards/bulkop", status=200)
+    # the first operation is still running the first time we check.
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/cards/bulkop/2222", status=204)
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/cards/bulkop/2222", json={})
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/cards/bulkop/3333", json={})
+
+    g.bulk_operations.min_interval = 0.05
+    progress = []
+    op1 = g.restore_cards("1111", wait=False)
+    op1.on_progress(lambda op: progress.append(op.polls))
+    op2 = g.restore_cards("2222", wait=False)
+    op3 = g.restore_cards("3333", wait=False)
+
+    self.assertIsInstance(op1, guru.BulkOperation)
+    self.assertEqual([op1.id, op2.id, op3.id], ["2222", "3333", None])
+    self.assertTrue(op3.done())
+    self.assertEqual(g.wait_for_bulk_operations([op1, op2, op3], timeout=5), [True, True, True])
+    self.assertEqual(progress, [1, 2])
+    self.assertEqual(op1.polls, 2)
+    self.assertEqual(op2.polls, 1)
+    self.assertEqual(len(g.bulk_operations), 0)
+
+  @use_guru()
+  @responses.activate
+  def test_restore_cards_without_waiting_gives_up(self, g):
+    responses.add(responses.POST, "https://api.getguru.com/api/v1/cards/bulkop", json={
+      "id": "2222"
+    }, status=202)
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/cards/bulkop/2222", status=204)
+
+    # an operation that never finishes is only checked max_polls times.
+    g.bulk_operations.min_interval = 0.01
+    g.bulk_operations.max_polls = 3
+    op = g.restore_cards("1111", wait=False)
+
+    self.assertFalse(op.result(timeout=5))
+    self.assertEqual(op.polls, 3)
+    self.assertIsNotNone(op.deadline)
+    self.assertEqual(len(g.bulk_operations), 0)
+
   @use_guru()
   @responses.activate
   def test_move_card_to_collection_and_wait(self, g):
@@ -1503,3 +1553,88 @@ this card has a <a href="https://www.example.com">guru markdown block</a>.
       "method": "GET",
       "url": "https://api.getguru.com/api/v1/cards/bulkop/2222"
     }])
+
+  @use_guru()
+  @responses.activate
+  def test_get_cards_in_batches(self, g):
+    def bulk_callback(request):
+      ids = json.loads(request.body)["ids"]
+      if "bad" in ids:
+        return (400, {}, "")
+      return (200, {}, json.dumps({id: {"id": id, "status": "OK"} for id in ids if id != "missing"}))
+
+    responses.add_callback(responses.POST, "https://api.getguru.com/api/v1/cards/bulk", callback=bulk_callback)
+
+    card_ids = ["card%s" % i for i in range(120)] + ["missing", "bad", "card0"]
+    cards, statuses = g.get_cards(card_ids, max_workers=4, return_statuses=True)
+
+    # the 120 good ids (and the duplicate) make 3 batches and the batch with the bad
+    # id keeps getting split in half until the bad id is on its own.
+    self.assertEqual(list(cards.keys()), ["card%s" % i for i in range(120)])
+    self.assertEqual(cards["card5"].guru, g)
+    self.assertEqual(statuses["card5"], "OK")
+    self.assertEqual(statuses["missing"], "NOT_FOUND")
+    self.assertEqual(statuses["bad"], "FAILED")
+    self.assertEqual(max(len(call["body"]["ids"]) for call in get_calls()), 50)
+
+  @use_guru()
+  @responses.activate
+  def test_get_cards_batch_not_split_on_auth_error(self, g):
+    responses.add(responses.POST, "https://api.getguru.com/api/v1/cards/bulk", status=403)
+
+    card_ids = ["card%s" % i for i in range(50)]
+    cards, statuses = g.get_cards(card_ids, return_statuses=True)
+
+    # a 403 would fail for any batch so we don't split it up.
+    self.assertEqual(cards, {})
+    self.assertEqual(set(statuses.values()), {"FAILED"})
+    self.assertEqual(len(statuses), 50)
+    self.assertEqual(len(get_calls()), 1)
+
+  def test_card_nested_objects_are_lazy(self):
+    card = guru.Card({
+      "id": "1111",
+      "preferredPhrase": "test",
+      "owner": {"email": "owner@example.com"},
+      "tags": [{"id": "t1", "value": "tag1"}],
+      "collection": {"id": "c1", "name": "General"}
+    })
+
+    self.assertFalse(hasattr(card, "_owner"))
+    # only the raw data the lazy attributes need is kept.
+    self.assertEqual(set(card._data), {"owner", "tags", "collection"})
+    self.assertEqual(card.owner.email, "owner@example.com")
+    self.assertIs(card.owner, card.owner)
+    self.assertIsNone(card.last_verified_by)
+    self.assertEqual(card.json()["tags"][0]["value"], "tag1")
+
+    # lazy attributes can be set and are rebuilt when the card gets new data.
+    card.collection = None
+    self.assertIsNone(card.collection)
+    card.__init__({"id": "1111", "collection": {"id": "c2", "name": "Other"}})
+    self.assertEqual(card.collection.name, "Other")
+    self.assertEqual(card.tags, [])
+
+    # you can still keep your own attributes on a card.
+    card.note = "checked"
+    self.assertEqual(card.note, "checked")
+    self.assertEqual(card.__dict__, {"note": "checked"})
+
+  def test_subclasses_keep_lazy_attributes(self):
+    class MyCard(guru.Card):
+      __slots__ = ("_owner_email",)
+
+      @lazy_attribute
+      def owner_email(self):
+        return self.owner.email
+
+    card = MyCard({"id": "1111", "owner": {"email": "owner@example.com"}})
+    self.assertEqual(card.owner_email, "owner@example.com")
+    self.assertEqual(
+        [a.name for a in MyCard._lazy_attributes],
+        [a.name for a in guru.Card._lazy_attributes] + ["owner_email"])
+
+    # both the inherited attribute and the new one are reset when the card is loaded again.
+    card.__init__({"id": "1111", "owner": {"email": "new@example.com"}})
+    self.assertEqual(card.owner.email, "new@example.com")
+    self.assertEqual(card.owner_email, "new@example.com")
@@ -647,3 +647,28 @@ class TestCore(unittest.TestCase):
 
     self.assertEqual(collection, collection2)
     self.assertEqual(group, group2)
+
+  @use_guru()
+  @responses.activate
+  def test_get_group_reuses_index(self, g):
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/groups", json=[
+      {"id": "1111", "name": "Experts"},
+      {"id": "2222", "name": "Engineering"}
+    ])
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/groups", json=[
+      {"id": "3333", "name": "Experts"}
+    ])
+
+    experts = g.get_group("experts", cache=True)
+    self.assertEqual(experts.id, "1111")
+    self.assertIs(g.get_group("EXPERTS", cache=True), experts)
+    self.assertEqual(g.get_group("2222", cache=True).name, "Engineering")
+    self.assertEqual(len(responses.calls), 1)
+
+    # the index is kept on the cached response, so it goes away with the cache entry.
+    cached = g.response_cache.get("https://api.getguru.com/api/v1/groups")
+    self.assertIs(cached.index.find("experts"), experts)
+
+    # loading the list again builds a new index.
+    self.assertEqual(g.get_group("experts").id, "3333")
+    self.assertIs(g.response_cache.get("https://api.getguru.com/api/v1/groups"), cached)
@@ -0,0 +1,59 @@
+import os
+import time
+import tempfile
+import unittest
+import responses
+
+import guru
+
+from tests.util import get_calls
+
+
+class TestRateLimit(unittest.TestCase):
+  def test_token_bucket(self):
+    bucket = guru.TokenBucket(rate=20, capacity=2)
+
+    # the first two are free because of the burst capacity, the third one waits.
+    self.assertEqual(bucket.acquire(), 0)
+    self.assertEqual(bucket.acquire(), 0)
+    self.assertAlmostEqual(bucket.acquire(), 0.05, delta=0.02)
+
+  def test_file_token_bucket_is_shared(self):
+    path = os.path.join(tempfile.mkdtemp(), "bucket")
+    bucket1 = guru.FileTokenBucket(path, rate=20, capacity=1)
+    bucket2 = guru.FileTokenBucket(path, rate=20, capacity=1)
+
+    # the second bucket sees that the first one used the only token.
+    self.assertEqual(bucket1.acquire(), 0)
+    self.assertGreater(bucket2.acquire(), 0)
+
+  @responses.activate
+  def test_reads_and_writes_have_separate_budgets(self):
+    limiter = guru.RateLimiter(reads_per_second=1000, writes_per_second=10, burst=1)
+    g = guru.Guru("user@example.com", "abcd", silent=True, rate_limiter=limiter)
+
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/groups", json=[])
+    responses.add(responses.PUT, "https://api.getguru.com/api/v1/cards/1111/verify")
+
+    start = time.time()
+    g.get_groups()
+    g.get_groups()
+    self.assertLess(time.time() - start, 0.05)
+
+    start = time.time()
+    g.verify_card(guru.Card({"id": "1111"}))
+    g.verify_card(guru.Card({"id": "1111"}))
+    self.assertGreater(time.time() - start, 0.05)
+
+  @responses.activate
+  def test_429_pauses_the_limiter(self):
+    limiter = guru.RateLimiter(reads_per_second=1000)
+    g = guru.Guru("user@example.com", "abcd", silent=True, rate_limiter=limiter)
+
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/groups", status=429, headers={"Retry-After": "0.1"})
+    responses.add(responses.GET, "https://api.getguru.com/api/v1/groups", json=[])
+
+    start = time.time()
+    g.get_groups()
+    self.assertGreater(time.time() - start, 0.09)
+    self.assertEqual(len(get_calls()), 2)
@@ -0,0 +1,53 @@
+import unittest
+
+import guru
+
+from guru.testing import FakeDataset, FakeGuruServer
+
+
+class TestFakeGuruServer(unittest.TestCase):
+  def test_paginated_search(self):
+    with FakeGuruServer(FakeDataset(cards=120), page_size=50) as server:
+      g = server.make_guru()
+      cards = g.find_cards()
+
+      self.assertEqual(len(cards), 120)
+      self.assertEqual(len(set(c.id for c in cards)), 120)
+      self.assertEqual(server.get_call_count("/search/cardmgr"), 3)
+
+  def test_cards_folders_and_boards(self):
+    with FakeGuruServer(FakeDataset(cards=120, folders=2, boards=1)) as server:
+      g = server.make_guru()
+      card_id = list(server.dataset.cards)[0]
+
+      self.assertEqual(g.get_card(card_id).title, "Card 0")
+      self.assertEqual(len(g.get_folders()[0].cards), 60)
+
+      # boards with more than 50 cards come back with partial cards that are loaded from /cards/bulk.
+      board = g.get_board(server.dataset.boards[0]["id"])
+      self.assertEqual(len(board.cards), 120)
+      self.assertTrue(all(card.title for card in board.cards))
+      self.assertEqual(server.get_call_count("/cards/bulk"), 2)
+
+  def test_throttling(self):
+    with FakeGuruServer(FakeDataset(cards=10), throttle_every=2) as server:
+      g = server.make_guru(retry=guru.RetryPolicy(backoff=0))
+      self.assertEqual(len(g.get_tags()), 50)
+      self.assertEqual(g.stats()["endpoints"]["GET /teams/{id}/tagcategories"]["retries"], 1)
+
+  def test_content_upload(self):
+    with FakeGuruServer(FakeDataset(cards=10)) as server:
+      g = server.make_guru()
+      collection_id = server.dataset.collections[0]["id"]
+
+      bundle = g.bundle("test_fake_server_content_upload", clear=True)
+      bundle.node(id="1", title="card 1", content="<p>card 1</p>")
+      bundle.zip()
+      bundle.upload(collection_id=collection_id)
+      bundle.upload(collection_id=collection_id, is_sync=True)
+
+      # both upload routes go to the fake server, not the real API.
+      self.assertEqual([u["route"] for u in server.uploads], ["contentupload", "contentsyncupload"])
+      self.assertEqual(server.uploads[0]["collection_id"], collection_id)
+      self.assertEqual(server.uploads[0]["filename"], "collection_test_fake_server_content_upload.zip")
+      self.assertEqual(server.get_call_count("^/app/"), 2)
@@ -188,3 +188,39 @@ class TestUtil(unittest.TestCase):
       "method": "POST",
       "url": "https://www.example.com/http_post"
     }])
+
+  def test_json_codec(self):
+    body = guru.util.json_dumps({"title": "café", "items": [1, 2.5, None, True]})
+    self.assertIsInstance(body, bytes)
+    self.assertEqual(guru.util.json_loads(body), {"title": "café", "items": [1, 2.5, None, True]})
+
+    # these are things orjson doesn't handle, so they fall back to the json module.
+    self.assertEqual(guru.util.json_loads(guru.util.json_dumps({1: "a"})), {"1": "a"})
+    self.assertEqual(guru.util.json_loads("[%d]" % 2**70), [2**70])
+
+  @use_guru()
+  @responses.activate
+  def test_compression_and_json_bodies(self, g):
+    responses.add(responses.PUT, "https://api.getguru.com/api/v1/cards/1111", json={"id": "1111"})
+    g.save_card(guru.Card({"id": "1111", "preferredPhrase": "test", "content": ""}))
+
+    headers = responses.calls[0].request.headers
+    self.assertIn("gzip", headers["Accept-Encoding"])
+    self.assertEqual(headers["Content-Type"], "application/json")
+    self.assertEqual(json.loads(responses.calls[0].request.body)["preferredPhrase"], "test")
+
+  def test_lookup_index(self):
+    cards = [
+      guru.Card({"id": "AAAA", "preferredPhrase": "First", "slug": "abc123/First"}),
+      guru.Card({"id": "BBBB", "preferredPhrase": " aaaa ", "slug": "def456/Second"}),
+      guru.Card({"id": "CCCC", "preferredPhrase": "First"})
+    ]
+    users = [guru.data_objects.User({"email": "User@Example.com"})]
+    index = guru.LookupIndex(cards)
+
+    # these should match what the linear scan finds.
+    for value in ["first", " FIRST ", "cccc", "def456", "aaaa", "abc123/First", "missing", ""]:
+      self.assertIs(index.find(value), guru.util.find_by_name_or_id(cards, value))
+    self.assertIs(index.find("aaaa"), cards[0])
+    self.assertIs(guru.util.find_by_id(index, "bbbb"), cards[1])
+    self.assertIs(guru.util.find_by_email(guru.LookupIndex(users), "user@example.com "), users[0])